@@ -0,0 +1,303 @@
+# benchmarks/carga.py
+"""
+Carga com vários usuários simultâneos no app (streamlit-app.py), via
+``streamlit.testing.v1.AppTest``: cada usuário é uma sessão própria que
+percorre uma sequência roteirizada de filtros nas visualizações de
+"Explorar Mapas" e "Realizar Consultas".  Cada usuário roda num processo
+próprio: o ``AppTest`` depende do ``Runtime`` do Streamlit, único por
+processo, e a compilação do script não é segura entre threads.  Os
+processos compartilham o que o app compartilha entre workers do servidor
+(cache de camadas em disco, depósito mapeado em memória), aquecidos antes
+das medições; ``cache_resource``/``cache_data`` valem só dentro de cada um.
+
+Por nível de concorrência e por visualização: latência do rerun (p50, p95,
+p99, média) dos passos que deram certo, passos com erro (exceção no roteiro
+ou no app), bytes do mapa enviado ao navegador; por nível: pico de RSS
+(soma e maior dos processos) e duração.  O resultado sai em JSON para
+acompanhar a evolução entre versões.
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.carga [--usuarios 1 5 20] [--passos 10] [--saida carga.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime, timezone
+
+import numpy as np
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP = "streamlit-app.py"
+TIMEOUT = 600            # s – primeiro rerun constrói as camadas
+
+# cada usuário num processo novo (o AppTest troca o ``__main__`` e usa o
+# Runtime do processo); o resultado volta em JSON no arquivo argv[5]
+_FILHO = """
+import json, sys
+from benchmarks.carga import _usuario
+amostras, pico = _usuario(sys.argv[1], json.loads(sys.argv[2]), int(sys.argv[3]),
+                          int(sys.argv[4]))
+with open(sys.argv[5], "w") as f:
+    json.dump({"amostras": amostras, "rss_pico_mb": pico}, f)
+"""
+
+
+# ---------------------------------------------------------------------------------
+# Roteiros: cada visualização sabe chegar à sua tela e sortear um filtro
+# ---------------------------------------------------------------------------------
+
+def _pagina(at, pagina):
+    if at.sidebar.radio[0].value != pagina:
+        at.sidebar.radio[0].set_value(pagina).run()
+
+
+def _visao(at, visao):
+    _pagina(at, "Explorar Mapas")
+    if at.selectbox(key="view_exp").value != visao:
+        at.selectbox(key="view_exp").set_value(visao).run()
+
+
+def _alguns(rng, opcoes):
+    """Subconjunto aleatório (em ordem aleatória) das opções não vazias."""
+    opcoes = [o for o in opcoes if o]
+    return rng.sample(opcoes, rng.randint(0, len(opcoes)))
+
+
+def _escolha(rng, opcoes):
+    return rng.choice([o for o in opcoes if o])
+
+
+def _emocao(at, rng):
+    _visao(at, "Emoção individual")
+    sb = at.selectbox(key="emo_sel")
+    sb.set_value(_escolha(rng, sb.options))
+
+
+def _modal(at, rng):
+    _visao(at, "Modal + Valência")
+    sb, ms = at.selectbox(key="mdl_sel"), at.multiselect(key="val_modal")
+    sb.set_value(rng.choice(sb.options))
+    ms.set_value(_alguns(rng, ms.options))
+
+
+def _cenario(at, rng):
+    _visao(at, "Cenário")
+    sb = at.selectbox(key="cnr_sel")
+    sb.set_value(_escolha(rng, sb.options))
+
+
+def _vias(at, rng):
+    _visao(at, "Valência nas vias")
+    ms = at.multiselect(key="val_via")
+    ms.set_value(_alguns(rng, ms.options) or [_escolha(rng, ms.options)])
+
+
+def _botao(at, rotulo):
+    return next(b for b in at.button if b.label == rotulo)
+
+
+def _faixa(at, rng):
+    _pagina(at, "Realizar Consultas")
+    sb, ms = at.selectbox(key="faixa_q"), at.multiselect(key="val_pt1")
+    sb.set_value(_escolha(rng, sb.options))
+    ms.set_value(_alguns(rng, ms.options))
+    _botao(at, "Filtrar pontos").click()
+
+
+def _genero(at, rng):
+    _pagina(at, "Realizar Consultas")
+    sb, ms = at.selectbox(key="gen_q"), at.multiselect(key="val_pt2")
+    sb.set_value(_escolha(rng, sb.options))
+    ms.set_value(_alguns(rng, ms.options))
+    _botao(at, "Filtrar por gênero").click()
+
+
+def _linhas(at, rng):
+    _pagina(at, "Realizar Consultas")
+    ms = at.multiselect(key="val_ln")
+    ms.set_value(_alguns(rng, ms.options) or [_escolha(rng, ms.options)])
+    _botao(at, "Filtrar vias").click()
+
+
+ROTEIROS = {
+    "explorar/emocao": _emocao,
+    "explorar/modal_valencia": _modal,
+    "explorar/cenario": _cenario,
+    "explorar/vias_valencia": _vias,
+    "consultas/faixa": _faixa,
+    "consultas/genero": _genero,
+    "consultas/vias": _linhas,
+}
+
+
+# ---------------------------------------------------------------------------------
+# Medições
+# ---------------------------------------------------------------------------------
+
+def _payload(at) -> int:
+    """Bytes dos mapas (iframes / componentes) na árvore de elementos."""
+    total = 0
+    for e in at.main:
+        proto = getattr(e, "proto", None)
+        if e.type in ("iframe", "component_instance") and proto is not None:
+            total += proto.ByteSize()
+    return total
+
+
+def _rss_pico_mb() -> float:
+    """Pico de RSS deste processo (ru_maxrss: KiB no Linux, bytes no macOS)."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** (2 if sys.platform == "darwin" else 1)
+
+
+def _passo(amostras, visao, acao):
+    """Roda ``acao()`` e anota (visão, latência | None, bytes, erro)."""
+    try:
+        t = time.perf_counter()
+        at = acao()
+        lat = time.perf_counter() - t
+    except Exception:
+        traceback.print_exc(limit=3, file=sys.stderr)
+        amostras.append((visao, None, 0, True))
+        return None
+    erro = len(at.exception) > 0
+    amostras.append((visao, None if erro else lat, _payload(at), erro))
+    return at
+
+
+def _usuario(app, visoes, passos, seed):
+    """Sessão de um usuário (em ``_FILHO``): amostras e pico de RSS."""
+    rng = random.Random(seed)
+    amostras = []
+    at = _passo(amostras, "inicial",
+                lambda: AppTest.from_file(app, default_timeout=TIMEOUT).run())
+    for i in range(passos):
+        visao = visoes[(seed + i) % len(visoes)]
+        if at is None:       # sessão perdida: os passos restantes contam como erro
+            amostras.append((visao, None, 0, True))
+            continue
+
+        def _rodar():
+            ROTEIROS[visao](at, rng)
+            return at.run()
+        _passo(amostras, visao, _rodar)
+    return amostras, _rss_pico_mb()
+
+
+def _resumo(amostras) -> dict:
+    out = {}
+    for visao in dict.fromkeys(v for v, *_ in amostras):
+        da_visao = [a for a in amostras if a[0] == visao]
+        ok = [(t, p) for _, t, p, erro in da_visao if not erro]
+        lat = np.array([t for t, _ in ok]) * 1e3
+        pay = np.array([p for _, p in ok])
+        out[visao] = {
+            "n": len(ok),
+            "erros": len(da_visao) - len(ok),
+            "p50_ms": float(np.percentile(lat, 50)) if len(ok) else None,
+            "p95_ms": float(np.percentile(lat, 95)) if len(ok) else None,
+            "p99_ms": float(np.percentile(lat, 99)) if len(ok) else None,
+            "media_ms": float(lat.mean()) if len(ok) else None,
+            "payload_bytes_mediana": int(np.median(pay)) if len(ok) else None,
+            "payload_bytes_max": int(pay.max()) if len(ok) else None,
+        }
+    return out
+
+
+def _perdida(visoes, passos, seed):
+    """Amostras de uma sessão cujo processo morreu: tudo conta como erro."""
+    return [("inicial", None, 0, True)] + \
+        [(visoes[(seed + i) % len(visoes)], None, 0, True) for i in range(passos)]
+
+
+def _nivel(app, usuarios, visoes, passos, seed) -> dict:
+    amostras, picos = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        saidas = [os.path.join(tmp, f"{u}.json") for u in range(usuarios)]
+        t = time.perf_counter()
+        filhos = [subprocess.Popen([sys.executable, "-c", _FILHO, app, json.dumps(visoes),
+                                    str(passos), str(seed + u), saida])
+                  for u, saida in enumerate(saidas)]
+        for p in filhos:
+            p.wait()
+        duracao = time.perf_counter() - t
+        for u, (p, saida) in enumerate(zip(filhos, saidas)):
+            try:
+                with open(saida) as f:
+                    res = json.load(f)
+                amostras += [tuple(a) for a in res["amostras"]]
+                picos.append(res["rss_pico_mb"])
+            except (OSError, ValueError):
+                print(f"usuário {u}: processo saiu com código {p.returncode}", file=sys.stderr)
+                amostras += _perdida(visoes, passos, seed + u)
+    ok = sum(not erro for *_, erro in amostras)
+    return {"usuarios": usuarios, "passos": passos, "duracao_s": duracao,
+            "reruns_por_s": ok / duracao, "erros": len(amostras) - ok,
+            "rss_pico_mb": float(sum(picos)), "rss_pico_mb_processo": max(picos, default=None),
+            "visoes": _resumo(amostras)}
+
+
+def _meta(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit, "python": platform.python_version(),
+            "streamlit": st.__version__, "app": args.app, "seed": args.seed,
+            "visoes": args.visoes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--usuarios", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--passos", type=int, default=10, help="reruns por usuário")
+    parser.add_argument("--visoes", nargs="+", default=list(ROTEIROS), choices=list(ROTEIROS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--saida", help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args()
+    app = os.path.abspath(args.app)
+
+    # aquece o que os processos compartilham (cache de camadas em disco,
+    # depósito mapeado) fora das medições
+    AppTest.from_file(app, default_timeout=TIMEOUT).run()
+
+    resultado = {"meta": _meta(args), "niveis": []}
+    for usuarios in args.usuarios:
+        nivel = _nivel(app, usuarios, args.visoes, args.passos, args.seed)
+        resultado["niveis"].append(nivel)
+        print(f"{usuarios:>4} usuários  {nivel['duracao_s']:7.1f} s  "
+              f"RSS pico {nivel['rss_pico_mb']:7.0f} MB (soma)"
+              + (f"  {nivel['erros']} erros" if nivel["erros"] else ""), file=sys.stderr)
+        for visao, r in nivel["visoes"].items():
+            if not r["n"]:
+                print(f"      {visao:<26}{r['erros']} erros", file=sys.stderr)
+                continue
+            print(f"      {visao:<26}p50 {r['p50_ms']:8.0f}  p95 {r['p95_ms']:8.0f}  "
+                  f"p99 {r['p99_ms']:8.0f} ms  {r['payload_bytes_mediana'] / 1e6:6.2f} MB"
+                  + (f"  {r['erros']} erros" if r["erros"] else ""), file=sys.stderr)
+
+    # tabela legível no stderr, JSON no stdout ou em --saida
+    texto = json.dumps(resultado, indent=1, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w") as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
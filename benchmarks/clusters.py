@@ -0,0 +1,40 @@
+# benchmarks/clusters.py
+"""
+Agrupamento hierárquico (clusters.ClustersEmoji): tempo de construção,
+tempo de uma consulta filtrada e número de marcadores enviados por zoom
+com os pontos replicados (×1, ×10, ×100).
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.clusters [--fatores 1 10 100]
+"""
+import argparse
+import time
+
+from benchmarks.densidade import _fato
+from clusters import ClustersEmoji
+from emoc_index import indice_emocoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fatores", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    hier = None
+    for fator in args.fatores:
+        fato = _fato(fator)
+        t = time.perf_counter()
+        hier = ClustersEmoji(fato, indice_emocoes(fato))
+        montagem = time.perf_counter() - t
+        t = time.perf_counter()
+        hier.grupos(hier.zmin, valencia=["Negativo"])
+        consulta = time.perf_counter() - t
+        por_zoom = "  ".join(f"z{z}: {len(hier.grupos(z)['n'])}"
+                             for z in range(hier.zmin, hier.zmax + 1))
+        print(f"{len(fato):>8} pontos  montagem {montagem:6.2f} s  "
+              f"consulta {consulta * 1e3:6.1f} ms  marcadores {por_zoom}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/compartilhado.py
+"""
+Memória de N processos servidores com as mesmas camadas de entrada:
+cópia própria em cada processo (pickle, como o ``cache_data``) vs. depósito
+Arrow mapeado em memória (compartilhado.py).  Os processos ficam vivos ao
+mesmo tempo e o PSS (páginas compartilhadas divididas entre quem as usa,
+``/proc/<pid>/smaps_rollup``) de cada um é somado.  Os pontos de emoção
+são replicados (×fator) para aproximar um volume de produção.
+
+O tempo de carga da cópia é o que o ``cache_data`` pagava em toda chamada
+(cada rerun de cada sessão); o depósito é aberto uma vez por processo.  A
+geometria (objetos shapely) é sempre própria de cada processo, então o
+ganho de PSS vem só das colunas de atributos.
+
+Só Linux.  Uso (na raiz do repositório):
+
+    python -m benchmarks.compartilhado [--processos 1 4 8] [--fator 50]
+"""
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from compartilhado import deposito
+from esquema import compactar
+from ingestao import ler_camada
+from ruas import ler_ways
+
+DATA_PATH = "dados"
+FILES = {
+    "emoji": "emoji_emoc.csv",
+    "modais": "modais.csv",
+    "cenarios": "cenarios.geojson",
+    "participantes": "participantes.csv",
+    "emoc": "emocoes_coletadas.geojson",
+    "pts_cenarios": "pts_cenarios.geojson",
+    "vertices": "ways_vertices_pgr.geojson",
+}
+
+# o processo filho carrega, avisa e espera o pai medir antes de sair
+# (imports fora da medição; "nada" dá a base de um processo sem camadas)
+_FILHO = """
+import pickle, sys, time
+import compartilhado
+t = time.perf_counter()
+if sys.argv[1] == "pickle":
+    with open(sys.argv[2], "rb") as f:
+        dados = pickle.load(f)
+elif sys.argv[1] == "mmap":
+    dados = compartilhado.abrir(sys.argv[2])
+print(time.perf_counter() - t, flush=True)
+sys.stdin.read()
+"""
+
+
+def _camadas(fator):
+    raw = {k: compactar(ler_camada(f"{DATA_PATH}/{f}"), k) for k, f in FILES.items()}
+    raw["ways"] = compactar(ler_ways(DATA_PATH), "ways")
+    if fator > 1:
+        raw["emoc"] = pd.concat([raw["emoc"]] * fator, ignore_index=True)
+    return raw
+
+
+def _pss_mb(pid) -> float:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for linha in f:
+            if linha.startswith("Pss:"):
+                return int(linha.split()[1]) / 1024
+    return float("nan")
+
+
+def _rodar(modo, caminho, n):
+    """(PSS somado em MB, tempo médio de carga em s) com ``n`` processos vivos."""
+    filhos = [subprocess.Popen([sys.executable, "-c", _FILHO, modo, caminho],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+              for _ in range(n)]
+    try:
+        tempos = [float(p.stdout.readline()) for p in filhos]
+        pss = sum(_pss_mb(p.pid) for p in filhos)
+    finally:
+        for p in filhos:
+            p.communicate("")
+    return pss, sum(tempos) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processos", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--fator", type=int, default=50, help="réplicas dos pontos de emoção")
+    args = parser.parse_args()
+
+    raw = _camadas(args.fator)
+    print(f"{len(raw['emoc'])} pontos de emoção", file=sys.stderr)
+    with tempfile.TemporaryDirectory() as tmp:
+        arq = os.path.join(tmp, "camadas.pkl")
+        with open(arq, "wb") as f:
+            pickle.dump(raw, f, protocol=pickle.HIGHEST_PROTOCOL)
+        deposito("bench", lambda: raw, raiz=tmp)
+        pasta = os.path.join(tmp, "bench")
+
+        # PSS acima da base (mesmos imports, sem camadas), somado nos processos
+        print(f"{'processos':>10}{'pickle PSS (MB)':>17}{'mmap PSS (MB)':>15}"
+              f"{'pickle (ms)':>13}{'mmap (ms)':>11}")
+        for n in args.processos:
+            base, _ = _rodar("nada", pasta, n)
+            pss_p, t_p = _rodar("pickle", arq, n)
+            pss_m, t_m = _rodar("mmap", pasta, n)
+            print(f"{n:>10}{pss_p - base:>17.1f}{pss_m - base:>15.1f}"
+                  f"{t_p * 1e3:>13.0f}{t_m * 1e3:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/densidade.py
+"""
+Mapa de calor: ``plugins.HeatMap`` com todas as coordenadas vs. grade KDE
+pré-calculada (densidade.DensidadeKDE, PNG em ImageOverlay).  Os pontos
+são replicados com ruído (×1, ×10, ×100) para mostrar como cada caminho
+escala com o volume de dados.
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.densidade [--fatores 1 10 100]
+"""
+import argparse
+import time
+
+import folium
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from folium import plugins
+
+from build_layers import emoc_fato
+from densidade import DensidadeKDE
+from emoc_index import indice_emocoes
+from ingestao import ler_camada
+
+DATA_PATH = "dados"
+
+
+def _fato(fator, seed=0):
+    raw = {k: ler_camada(f"{DATA_PATH}/{f}") for k, f in (
+        ("emoc", "emocoes_coletadas.geojson"), ("emoji", "emoji_emoc.csv"),
+        ("modais", "modais.csv"), ("cenarios", "cenarios.geojson"),
+        ("participantes", "participantes.csv"))}
+    fato = emoc_fato(raw)
+    fato = fato[fato["cod_emoji"].notna()]
+    if fator == 1:
+        return fato.reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    rep = pd.concat([fato] * fator, ignore_index=True)
+    # ~50 m de ruído em graus
+    xy = np.column_stack([rep.geometry.x, rep.geometry.y]) + rng.normal(0, 5e-4, (len(rep), 2))
+    return rep.set_geometry(gpd.points_from_xy(xy[:, 0], xy[:, 1], crs=rep.crs))
+
+
+def _html(add):
+    m = folium.Map([-25.44, -49.27], zoom_start=14)
+    add(m)
+    return len(m.get_root().render().encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fatores", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print(f"{'pontos':>8}{'HeatMap (MB)':>14}{'KDE (MB)':>10}{'KDE frio (ms)':>15}"
+          f"{'KDE cache (ms)':>16}")
+    for fator in args.fatores:
+        fato = _fato(fator)
+        heat = np.column_stack([fato.geometry.y, fato.geometry.x]).tolist()
+        n_heat = _html(lambda m: plugins.HeatMap(heat, radius=20, blur=15).add_to(m))
+
+        kde = DensidadeKDE(fato, indice_emocoes(fato))
+        filtros = {"valencia": ["Negativo"]}
+        t = time.perf_counter()
+        kde.png(**filtros)
+        frio = time.perf_counter() - t
+        t = time.perf_counter()
+        kde.png(**filtros)
+        quente = time.perf_counter() - t
+        n_kde = _html(lambda m: kde.camada(filtros).add_to(m))
+        print(f"{len(fato):>8}{n_heat / 1e6:>14.2f}{n_kde / 1e6:>10.3f}"
+              f"{frio * 1e3:>15.1f}{quente * 1e3:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# benchmarks/hexbin.py
+"""
+Agregação hexagonal (hexbin.agregar_hex) vs. marcadores individuais
+(EmojiMarkers): tempo de agregação, número de células e tamanho do HTML
+com os pontos replicados (×1, ×10, ×100).
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.hexbin [--fatores 1 10 100]
+"""
+import argparse
+import time
+
+import folium
+
+from benchmarks.densidade import _fato
+from hexbin import agregar_hex
+from map_functions import DEFAULT_ICON_REPO, _add_points, _hexagonos
+
+
+def _html(add):
+    m = folium.Map([-25.44, -49.27], zoom_start=14)
+    add(m)
+    return len(m.get_root().render().encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fatores", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    print(f"{'pontos':>8}{'agregação (ms)':>16}{'células':>9}{'marcadores (MB)':>17}{'hexágonos (MB)':>16}")
+    for fator in args.fatores:
+        fato = _fato(fator)
+        t = time.perf_counter()
+        hexes = agregar_hex(fato)
+        agrega = time.perf_counter() - t
+        n_marc = _html(lambda m: _add_points(fato, "bench", m, DEFAULT_ICON_REPO, calor=False))
+        n_hex = _html(lambda m: _hexagonos({"emoc_hex": hexes}, fato, {}, "bench", m))
+        print(f"{len(fato):>8}{agrega * 1e3:>16.1f}{len(hexes):>9}{n_marc / 1e6:>17.2f}{n_hex / 1e6:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/ingestao.py
+"""
+Tempo de leitura de ``dados/`` a frio: GeoJSON/CSV vs. GeoParquet
+(gerado por ``python -m ingestao``).  Cada formato é lido num processo
+novo, para não aproveitar caches de import/CRS do outro.
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.ingestao [--pasta dados]
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+_LEITOR = """
+import json, sys, time
+t0 = time.perf_counter()
+import ingestao
+t1 = time.perf_counter()
+tempos = {{}}
+for p in sys.argv[2:]:
+    t = time.perf_counter()
+    ingestao.{func}(p)
+    tempos[p] = time.perf_counter() - t
+print(json.dumps({{"import": t1 - t0, "total": time.perf_counter() - t1, "camadas": tempos}}))
+"""
+
+
+def _rodar(func, caminhos):
+    out = subprocess.run([sys.executable, "-c", _LEITOR.format(func=func), func, *caminhos],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pasta", default="dados")
+    args = parser.parse_args()
+
+    import ingestao
+    origens = sorted(glob.glob(os.path.join(args.pasta, "*.geojson")) +
+                     glob.glob(os.path.join(args.pasta, "*.csv")))
+    if not all(os.path.exists(ingestao.caminho_parquet(p)) for p in origens):
+        ingestao.converter_pasta(args.pasta)
+    parquets = [ingestao.caminho_parquet(p) for p in origens]
+
+    texto = _rodar("_ler_origem", origens)
+    binario = _rodar("ler_geoparquet", parquets)
+
+    print(f"{'camada':<28}{'GeoJSON/CSV (ms)':>18}{'Parquet (ms)':>14}")
+    for o, b in zip(origens, parquets):
+        print(f"{os.path.basename(o):<28}{texto['camadas'][o] * 1e3:>18.1f}"
+              f"{binario['camadas'][b] * 1e3:>14.1f}")
+    print(f"{'total':<28}{texto['total'] * 1e3:>18.1f}{binario['total'] * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/markers.py
+"""
+Compara o caminho antigo de marcadores (iterrows + folium.Marker/CustomIcon
+por ponto) com o renderizador vetorizado ``map_functions._add_points``.
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.markers [--repeat 5]
+"""
+import argparse
+import time
+
+import folium
+import geopandas as gpd
+import pandas as pd
+from folium import plugins
+
+from map_functions import DEFAULT_ICON_REPO, _add_points
+
+DATA_PATH = "dados"
+
+
+def _add_points_iterrows(gdf, name, mapa, icon_repo=DEFAULT_ICON_REPO, tooltip_col=None):
+    """Implementação original, mantida aqui apenas como referência."""
+    layer = folium.FeatureGroup(name=name)
+    heat = []
+    for _, r in gdf.iterrows():
+        y, x = r.geometry.y, r.geometry.x
+        icon = folium.features.CustomIcon(f"{icon_repo}{int(r.cod_emoji)}.png", icon_size=(20, 20))
+        folium.Marker([y, x], icon=icon, tooltip=r[tooltip_col] if tooltip_col else None).add_to(layer)
+        heat.append([y, x])
+    layer.add_to(mapa)
+    plugins.HeatMap(heat, name=f"Heat {name}", radius=20, blur=15).add_to(mapa)
+
+
+def _pontos():
+    emoc = gpd.read_file(f"{DATA_PATH}/emocoes_coletadas.geojson")
+    emoji = pd.read_csv(f"{DATA_PATH}/emoji_emoc.csv")
+    pts = emoc.merge(emoji[["cod_emoji", "valencia"]], on="cod_emoji")
+    return pts[pts["cod_emoji"].notna()]
+
+
+def _medir(func, pts, repeat):
+    build, render, size = [], [], 0
+    for _ in range(repeat):
+        m = folium.Map([-25.44, -49.27], zoom_start=14)
+        t0 = time.perf_counter()
+        func(pts, "bench", m, DEFAULT_ICON_REPO, tooltip_col="valencia")
+        t1 = time.perf_counter()
+        html = m.get_root().render()
+        t2 = time.perf_counter()
+        build.append(t1 - t0)
+        render.append(t2 - t1)
+        size = len(html.encode())
+    return min(build), min(render), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pts = _pontos()
+    print(f"{len(pts)} pontos, melhor de {args.repeat} execuções")
+    print(f"{'caminho':<12}{'montagem (s)':>14}{'render (s)':>12}{'HTML (MB)':>12}")
+    for nome, func in (("iterrows", _add_points_iterrows), ("vetorizado", _add_points)):
+        b, r, n = _medir(func, pts, args.repeat)
+        print(f"{nome:<12}{b:>14.3f}{r:>12.3f}{n / 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
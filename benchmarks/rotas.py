@@ -0,0 +1,78 @@
+# benchmarks/rotas.py
+"""
+Consultas ponto a ponto em pares origem/destino aleatórios: A* no grafo
+CSR (routing.GrafoRuas) vs. Contraction Hierarchies (contraction.py),
+para cada perfil de custo.  Confere também que os custos coincidem.
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.rotas [--pares 500] [--seed 0]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from build_layers import build_layers
+from contraction import HierarquiaContracao
+from ingestao import ler_camada
+from routing import PERFIS, GrafoRuas
+from ruas import ler_ways
+
+DATA_PATH = "dados"
+
+
+def _grafo():
+    raw = {k: ler_camada(f"{DATA_PATH}/{f}") for k, f in (
+        ("emoc", "emocoes_coletadas.geojson"), ("emoji", "emoji_emoc.csv"),
+        ("vertices", "ways_vertices_pgr.geojson"))}
+    raw["ways"] = ler_ways(DATA_PATH)
+    vlc = build_layers(raw)["emoc_count_ways_vlc"]
+    return GrafoRuas(raw["ways"], raw["vertices"], vlc)
+
+
+def _pares(grafo, n, seed):
+    # só nós com arestas; vértices isolados não têm rota
+    ativos = np.flatnonzero(np.diff(grafo.indptr) > 0)
+    rng = np.random.default_rng(seed)
+    return rng.choice(ativos, size=(n, 2))
+
+
+def _percentis(ts):
+    ts = np.array(ts) * 1e6
+    return np.median(ts), np.percentile(ts, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pares", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    grafo = _grafo()
+    pares = _pares(grafo, args.pares, args.seed)
+    print(f"grafo: {grafo.n} nós, {len(grafo.indices) // 2} arestas; {len(pares)} pares")
+    print(f"{'perfil':<16}{'pré-proc (s)':>13}{'A* p50/p95 (µs)':>20}{'CH p50/p95 (µs)':>20}")
+    for perfil in PERFIS:
+        t = time.perf_counter()
+        ch = HierarquiaContracao.construir(grafo, perfil)
+        prep = time.perf_counter() - t
+
+        t_astar, t_ch = [], []
+        for o, d in pares.tolist():
+            t0 = time.perf_counter()
+            a = grafo.rota(o, d, perfil)
+            t1 = time.perf_counter()
+            c = ch.rota(o, d)
+            t2 = time.perf_counter()
+            t_astar.append(t1 - t0)
+            t_ch.append(t2 - t1)
+            if (a is None) != (c is None) or (a and abs(a["custo"] - c["custo"]) > 1e-6 * max(1, a["custo"])):
+                raise SystemExit(f"divergência {perfil} {o}->{d}: {a and a['custo']} vs {c and c['custo']}")
+        a50, a95 = _percentis(t_astar)
+        c50, c95 = _percentis(t_ch)
+        print(f"{perfil:<16}{prep:>13.2f}{a50:>10.0f}/{a95:<9.0f}{c50:>10.0f}/{c95:<9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/tiles.py
+"""
+HTML enviado ao navegador com os pontos embutidos (EmojiMarkers) vs. com a
+camada de tiles vetoriais (vector_tiles.py), e o custo de gerar a pirâmide.
+Para os tiles, mede também os bytes de uma vista de 1280×720 px em cada
+zoom (o que o navegador baixa de fato).
+
+Uso (na raiz do repositório):
+
+    python -m benchmarks.tiles [--pasta /tmp/tiles_bench]
+"""
+import argparse
+import glob
+import os
+import shutil
+import time
+
+import folium
+import numpy as np
+
+import vector_tiles as vt
+from build_layers import emoc_fato
+from ingestao import ler_camada
+from map_functions import DEFAULT_ICON_REPO, emoc_modal
+
+DATA_PATH = "dados"
+VISTA = (1280, 720)
+
+
+def _dados():
+    raw = {k: ler_camada(f"{DATA_PATH}/{f}") for k, f in (
+        ("emoc", "emocoes_coletadas.geojson"), ("emoji", "emoji_emoc.csv"),
+        ("modais", "modais.csv"), ("cenarios", "cenarios.geojson"),
+        ("participantes", "participantes.csv"))}
+    return {"emoc_fato": emoc_fato(raw)}
+
+
+def _html(data):
+    m = folium.Map([-25.44, -49.27], zoom_start=14)
+    emoc_modal(data, "", [], m, DEFAULT_ICON_REPO)
+    return len(m.get_root().render().encode())
+
+
+def _bytes_vista(pasta, z, centro):
+    """Soma dos tiles que cobrem uma vista ``VISTA`` centrada em ``centro``."""
+    cx, cy = vt._tile_xy(np.array([centro[0]]), np.array([centro[1]]), z)
+    nx, ny = VISTA[0] // 256 // 2 + 1, VISTA[1] // 256 // 2 + 1
+    total = 0
+    for x in range(int(cx[0]) - nx, int(cx[0]) + nx + 1):
+        for y in range(int(cy[0]) - ny, int(cy[0]) + ny + 1):
+            f = os.path.join(pasta, "pontos", str(z), str(x), f"{y}.pbf")
+            if os.path.exists(f):
+                total += os.path.getsize(f)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pasta", default="/tmp/tiles_bench")
+    args = parser.parse_args()
+    shutil.rmtree(args.pasta, ignore_errors=True)
+
+    data = _dados()
+    n = int(data["emoc_fato"]["cod_emoji"].notna().sum())
+    inline = _html(data)
+
+    t = time.perf_counter()
+    data["tiles"] = vt.gerar_tiles(data, DEFAULT_ICON_REPO, pasta=args.pasta)
+    gerar = time.perf_counter() - t
+    t = time.perf_counter()
+    vt.gerar_tiles(data, DEFAULT_ICON_REPO, pasta=args.pasta)
+    sem_mudanca = time.perf_counter() - t
+    com_tiles = _html(data)
+
+    arquivos = glob.glob(os.path.join(args.pasta, "pontos", "*", "*", "*.pbf"))
+    print(f"{n} pontos")
+    print(f"HTML com pontos embutidos: {inline / 1e6:.2f} MB")
+    print(f"HTML com tiles vetoriais:  {com_tiles / 1e6:.2f} MB")
+    print(f"pirâmide: {len(arquivos)} tiles, {sum(map(os.path.getsize, arquivos)) / 1e6:.2f} MB, "
+          f"gerada em {gerar:.2f} s ({sem_mudanca * 1e3:.0f} ms sem mudança)")
+
+    merc = data["emoc_fato"].dropna(subset=["cod_emoji"]).to_crs(3857).geometry
+    centro = (float(merc.x.median()), float(merc.y.median()))
+    print(f"{'zoom':<6}{'vista (kB)':>12}")
+    for z in range(vt.ZMIN, vt.ZMAX + 1):
+        print(f"{z:<6}{_bytes_vista(args.pasta, z, centro) / 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
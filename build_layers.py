@@ -1,10 +1,27 @@
 # build_layers.py
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 
+from emoc_index import indice_emocoes
+from esquema import compactar_layers
+from hexbin import agregar_hex, somar_hex
+from rastreio import marco, rastrear
+from snapping import SnapRuas, SnapVertices
+
 EPSG_METRIC = 32722      # UTM zona 22 S  (m)
 EPSG_LATLON = 4326       # WGS-84
+DIST_SNAP   = 100        # m – raio do snapping ponto ➜ rua
+DIST_HUB    = 500        # m – raio ponto ➜ ponto médio da rua
+
+VALENCIAS = ['Negativo', 'Neutro', 'Positivo']
+
+# nomes devolvidos por build_layers / atualizar_layers (registro preguiçoso do app)
+CAMADAS = ('ruas_cenarios', 'snap_ruas', 'emoc_colec_ruas', 'ponto_medio', 'knn',
+           'emoc_colec_hub', 'contagem_emoji_rua', 'contagem_pivot', 'emoc_count_ways_vlc',
+           'emoc_ways_vlc_rua', 'emoc_fato', 'emoc_indice', 'emoc_hex')
 
+@rastrear()
 def build_layers(raw: dict) -> dict:
     """
     Constrói todos os GeoDataFrames equivalentes às views SQL
@@ -13,7 +30,9 @@ def build_layers(raw: dict) -> dict:
         raw = {
             'ways'      : GeoDataFrame (ruas OSM),
             'emoc'      : GeoDataFrame (pontos coletados),
-            'emoji'     : GeoDataFrame (tabela emoji com valência)
+            'emoji'     : GeoDataFrame (tabela emoji com valência),
+            # opcionais – dimensões da tabela fato (passo 9)
+            'modais', 'cenarios', 'participantes'
         }
     """
     gdfs = {}
@@ -23,20 +42,18 @@ def build_layers(raw: dict) -> dict:
     # ----------------------------------------------------------
     ruas_cenarios = raw['ways'][raw['ways']['bool_cenario']].copy()
     gdfs['ruas_cenarios'] = ruas_cenarios
+    marco("1 ruas_cenarios", len(ruas_cenarios))
 
     # ----------------------------------------------------------
     # 2) Pontos ➜ rua mais próxima (≤100 m)
     # ----------------------------------------------------------
-    ruas_u = ruas_cenarios.to_crs(EPSG_METRIC)
-    pts_u  = raw['emoc'].to_crs(EPSG_METRIC)
-
-    sjoin = gpd.sjoin_nearest(
-        pts_u, ruas_u[['osm_id', 'name', 'cod_cenario', 'geometry']],
-        how='left', distance_col='dist',
-        max_distance=100
-    )
-    sjoin = sjoin.rename(columns={'index_right':'idx_rua'})
+    #    STRtree persistente sobre as ruas projetadas (ver snapping.py);
+    #    novos lotes de pontos reaproveitam o mesmo índice
+    snap = SnapRuas(ruas_cenarios, max_distance=DIST_SNAP, epsg=EPSG_METRIC)
+    gdfs['snap_ruas'] = snap
+    sjoin = snap.sjoin(raw['emoc'], ['osm_id', 'name', 'cod_cenario'])
     gdfs['emoc_colec_ruas'] = sjoin.to_crs(EPSG_LATLON)
+    marco("2 snapping", len(sjoin))
 
     # ----------------------------------------------------------
     # 3) Ponto médio (centroide) de cada rua
@@ -44,19 +61,15 @@ def build_layers(raw: dict) -> dict:
     ponto_medio = ruas_cenarios.copy()
     ponto_medio['geometry'] = ruas_cenarios.geometry.centroid
     gdfs['ponto_medio'] = ponto_medio
+    marco("3 ponto_medio", len(ponto_medio))
 
     # ----------------------------------------------------------
     # 4) Ponto médio ↔ emoção mais próxima (≤500 m)
     #    (equivalente ao WITH knn…)
     # ----------------------------------------------------------
-    hubs_u   = ponto_medio.to_crs(EPSG_METRIC)
-    knn_tmp  = gpd.sjoin_nearest(
-        sjoin, hubs_u[['osm_id', 'geometry']],
-        how='left', distance_col='dist_hub',
-        max_distance=500
-    )[['fid', 'osm_id_right']].drop_duplicates('fid')
-    knn_tmp = knn_tmp.rename(columns={'osm_id_right':'hub_ruas'})
+    knn_tmp = _knn_hub(sjoin, ponto_medio)
     gdfs['knn'] = knn_tmp
+    marco("4 knn_hub", len(knn_tmp))
 
     # ----------------------------------------------------------
     # 5) emoc_colec_hub  (pontos + hub_ruas)
@@ -65,6 +78,7 @@ def build_layers(raw: dict) -> dict:
         knn_tmp, left_on='fid', right_on='fid', how='left'
     )
     gdfs['emoc_colec_hub'] = emoc_colec_hub
+    marco("5 emoc_colec_hub", len(emoc_colec_hub))
 
     # ----------------------------------------------------------
     # 6) Contagem de emoções por rua  (teste_contagem e emojis N)
@@ -79,25 +93,173 @@ def build_layers(raw: dict) -> dict:
     pivot = cnt.pivot(index='osm_id', columns='cod_emoji', values='qta_emoji').fillna(0).astype(int)
     pivot = pivot.reset_index()
     gdfs['contagem_pivot'] = pivot
+    marco("6 contagens", len(cnt))
 
     # ----------------------------------------------------------
     # 7) Valência prevalente por rua
     # ----------------------------------------------------------
     #  primeiro agregamos por valência
-    emo = raw['emoji'][['cod_emoji', 'valencia']]
-    tmp = cnt.merge(emo, on='cod_emoji')
-    sum_vlc = (tmp.pivot_table(index='osm_id',
-                               columns='valencia',
-                               values='qta_emoji',
-                               aggfunc='sum',
-                               fill_value=0)
-                 .reset_index())
-    sum_vlc['vlc_maior'] = sum_vlc[['Negativo', 'Neutro', 'Positivo']].max(axis=1)
-    sum_vlc['vlc_maior_text'] = sum_vlc[['Negativo', 'Neutro', 'Positivo']].idxmax(axis=1)
+    sum_vlc = _soma_valencia(cnt, raw['emoji']).reset_index()
+    _vlc_maior(sum_vlc)
     gdfs['emoc_count_ways_vlc'] = sum_vlc
+    marco("7 valencia", len(sum_vlc))
 
     # 8) Junta na camada de linhas
     vias_vlc = ruas_cenarios.merge(sum_vlc, on='osm_id', how='left')
     gdfs['emoc_ways_vlc_rua'] = vias_vlc
+    marco("8 vias_vlc", len(vias_vlc))
+
+    # ----------------------------------------------------------
+    # 9) Tabela fato: pontos + todas as dimensões já anexadas
+    # ----------------------------------------------------------
+    gdfs['emoc_fato'] = emoc_fato(raw)
+    marco("9 emoc_fato", len(gdfs['emoc_fato']))
+
+    # ----------------------------------------------------------
+    # 10) Índice invertido (máscaras) sobre as dimensões da fato
+    # ----------------------------------------------------------
+    gdfs['emoc_indice'] = indice_emocoes(gdfs['emoc_fato'])
+    marco("10 indice")
+
+    # ----------------------------------------------------------
+    # 11) Agregação hexagonal multirresolução (contagens por emoji e
+    #     valência + valência prevalente por célula)
+    # ----------------------------------------------------------
+    gdfs['emoc_hex'] = agregar_hex(gdfs['emoc_fato'])
+    marco("11 hexagonos", len(gdfs['emoc_hex']))
+
+    # ----------------------------------------------------------
+    # 12) Tipos compactos (esquema.py): category, int8/16/32, float32
+    # ----------------------------------------------------------
+    return compactar_layers(gdfs)
+
+
+@rastrear()
+def atualizar_layers(gdfs: dict, raw: dict) -> dict:
+    """
+    Modo incremental de :func:`build_layers` para coleta contínua.
+
+    ``gdfs`` é a saída de uma construção anterior (com ``snap_ruas``) e
+    ``raw`` as mesmas entradas com ``raw['emoc']`` acrescido de novos
+    pontos.  Só os fids ainda não vistos são encaixados nas ruas; as
+    contagens por rua/emoji e as somas de valência são somadas no lugar e
+    ``vlc_maior`` / ``vlc_maior_text`` recalculados apenas para os
+    ``osm_id`` afetados.  Supõe ruas inalteradas e pontos antigos intactos.
+    """
+    novos = raw['emoc'][~raw['emoc']['fid'].isin(gdfs['emoc_colec_ruas']['fid'])]
+    if novos.empty:
+        return gdfs
+    gdfs = dict(gdfs)
+
+    # 2) snapping só do delta, reaproveitando o STRtree
+    sjoin = gdfs['snap_ruas'].sjoin(novos, ['osm_id', 'name', 'cod_cenario'])
+    ruas_d = sjoin.to_crs(EPSG_LATLON)
+    gdfs['emoc_colec_ruas'] = pd.concat([gdfs['emoc_colec_ruas'], ruas_d], ignore_index=True)
+
+    # 4-5) hub das novas emoções
+    knn_d = _knn_hub(sjoin, gdfs['ponto_medio'])
+    gdfs['knn'] = pd.concat([gdfs['knn'], knn_d], ignore_index=True)
+    hub_d = ruas_d.merge(knn_d, on='fid', how='left')
+    gdfs['emoc_colec_hub'] = pd.concat([gdfs['emoc_colec_hub'], hub_d], ignore_index=True)
+
+    # 6) contagens: soma do delta
+    cnt_d = hub_d.groupby(['osm_id', 'cod_emoji']).size().rename('qta_emoji')
+    afetados = cnt_d.index.unique('osm_id')
+    cnt = (gdfs['contagem_emoji_rua'].set_index(['osm_id', 'cod_emoji'])['qta_emoji']
+           .add(cnt_d, fill_value=0).astype(int).reset_index())
+    gdfs['contagem_emoji_rua'] = cnt
+
+    pivot = gdfs['contagem_pivot'].set_index('osm_id')
+    pivot = pivot.add(cnt_d.unstack(fill_value=0), fill_value=0).fillna(0).astype(int)
+    gdfs['contagem_pivot'] = pivot.reset_index()
+
+    # 7) valência: soma do delta e vlc_maior só nos osm_id afetados
+    sum_vlc = gdfs['emoc_count_ways_vlc'].set_index('osm_id')
+    delta = _soma_valencia(cnt_d.reset_index(), raw['emoji'])
+    sum_vlc = sum_vlc.reindex(sum_vlc.index.union(delta.index))
+    sum_vlc.loc[delta.index, VALENCIAS] = (
+        sum_vlc.loc[delta.index, VALENCIAS].fillna(0) + delta[VALENCIAS]).astype(int)
+    afet = sum_vlc.loc[afetados].copy()
+    _vlc_maior(afet)
+    sum_vlc.loc[afetados, ['vlc_maior', 'vlc_maior_text']] = afet[['vlc_maior', 'vlc_maior_text']]
+    sum_vlc[VALENCIAS + ['vlc_maior']] = sum_vlc[VALENCIAS + ['vlc_maior']].astype(int)
+    gdfs['emoc_count_ways_vlc'] = sum_vlc.reset_index()
+
+    # 8) linhas: só as ruas afetadas recebem os novos valores
+    vias = gdfs['emoc_ways_vlc_rua'].copy()
+    sel = vias['osm_id'].isin(afetados)
+    cols = VALENCIAS + ['vlc_maior', 'vlc_maior_text']
+    vias.loc[sel, cols] = sum_vlc.loc[vias.loc[sel, 'osm_id'], cols].to_numpy()
+    gdfs['emoc_ways_vlc_rua'] = vias
+
+    # 9-10) fato + índice
+    fato_d = emoc_fato({**raw, 'emoc': novos})
+    fato = pd.concat([gdfs['emoc_fato'], fato_d], ignore_index=True)
+    for _, cols_dim in DIMENSOES.values():
+        for c in cols_dim:
+            if c in fato:
+                fato[c] = fato[c].astype('category')
+    gdfs['emoc_fato'] = fato
+    gdfs['emoc_indice'] = indice_emocoes(fato)
+
+    # 11) hexágonos: contagens do delta somadas às células existentes
+    gdfs['emoc_hex'] = somar_hex(gdfs['emoc_hex'], agregar_hex(fato_d))
+    return compactar_layers(gdfs)
+
 
-    return gdfs
+def _knn_hub(pts_u, ponto_medio):
+    """fid ➜ osm_id do ponto médio de rua mais próximo (≤ DIST_HUB), via KD-tree."""
+    hubs = SnapVertices.de_geometrias(ponto_medio, epsg=EPSG_METRIC)
+    _, idx = hubs.consultar(pts_u, max_distance=DIST_HUB)
+    osm = ponto_medio['osm_id'].to_numpy()
+    hub = pd.Series(osm[np.maximum(idx, 0)], index=pts_u.index).where(idx >= 0)
+    knn = pd.DataFrame({'fid': pts_u['fid'].values, 'hub_ruas': hub.values})
+    return knn.drop_duplicates('fid')
+
+
+def _soma_valencia(cnt, emoji):
+    """Soma de qta_emoji por osm_id × valência (colunas VALENCIAS)."""
+    tmp = cnt.merge(emoji[['cod_emoji', 'valencia']], on='cod_emoji')
+    return (tmp.pivot_table(index='osm_id',
+                            columns='valencia',
+                            values='qta_emoji',
+                            aggfunc='sum',
+                            fill_value=0)
+               .reindex(columns=pd.Index(VALENCIAS, name='valencia'), fill_value=0))
+
+
+def _vlc_maior(sum_vlc):
+    """(Re)calcula vlc_maior / vlc_maior_text nas linhas de ``sum_vlc``."""
+    sum_vlc['vlc_maior'] = sum_vlc[VALENCIAS].max(axis=1)
+    sum_vlc['vlc_maior_text'] = sum_vlc[VALENCIAS].idxmax(axis=1)
+
+
+# Atributos de dimensão anexados a cada ponto: tabela ➜ (chave, colunas)
+DIMENSOES = {
+    'emoji'        : ('cod_emoji',   ['emocao', 'valencia']),
+    'modais'       : ('cod_modal',   ['nome']),
+    'cenarios'     : ('cod_cenario', ['referencia']),
+    'participantes': ('cod_part',    ['faixa_etaria', 'genero']),
+}
+
+
+def emoc_fato(raw: dict) -> gpd.GeoDataFrame:
+    """
+    Desnormaliza os pontos coletados com as tabelas de dimensão
+    (emoji, modais, cenários, participantes) num único GeoDataFrame,
+    com os atributos repetidos em dtype ``category``.  As consultas de
+    ``map_functions`` apenas filtram esta tabela, sem ``merge`` por rerun.
+    Como nos ``merge`` internos que ela substitui, pontos cuja chave não
+    existe numa dimensão (ex.: ``cod_emoji`` vazio) ficam de fora.
+    """
+    fato = raw['emoc'].copy()
+    casados = np.ones(len(fato), dtype=bool)
+    for tab, (chave, cols) in DIMENSOES.items():
+        if tab not in raw:
+            continue
+        # lookup por índice (map) em vez de merge: sem cópias intermediárias
+        dim = pd.DataFrame(raw[tab]).drop_duplicates(chave).set_index(chave)
+        casados &= fato[chave].isin(dim.index).to_numpy()
+        for c in cols:
+            fato[c] = fato[chave].map(dim[c]).astype('category')
+    return fato[casados].reset_index(drop=True)
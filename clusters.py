@@ -0,0 +1,104 @@
+# clusters.py
+import numpy as np
+import shapely
+from scipy.spatial import cKDTree
+
+from emoc_index import selecao
+from esquema import COORD_DTYPE
+
+# ---------------------------------------------------------------------------------
+# Agrupamento hierárquico de marcadores no estilo supercluster.
+# A hierarquia é montada uma vez sobre todos os pontos de ``emoc_fato``
+# (do zoom mais alto para o mais baixo, cada nível agrupa os grupos do
+# nível de cima num raio fixo em pixels); um filtro só mascara os membros e
+# reagrega contagens por emoji, sem refazer a hierarquia.
+# ---------------------------------------------------------------------------------
+
+RAIO_PX = 40             # px – raio de agrupamento em cada zoom
+EXTENT = 256             # px – lado de um tile do Leaflet
+ZOOM_MIN, ZOOM_MAX = 14, 16   # níveis agrupados; acima de ZOOM_MAX, pontos soltos
+
+
+def _mercator(lon, lat):
+    """lon/lat ➜ Web Mercator normalizado em [0, 1] (y para baixo)."""
+    x = lon / 360.0 + 0.5
+    s = np.sin(np.deg2rad(lat))
+    y = 0.5 - 0.25 * np.log((1 + s) / (1 - s)) / np.pi
+    return np.column_stack([x, np.clip(y, 0, 1)])
+
+
+def _agrupar(xy, peso, raio):
+    """
+    Um nível: percorre os itens na ordem e funde os vizinhos ainda livres
+    a menos de ``raio``.  Devolve (pai de cada item, centro, peso) dos grupos.
+    """
+    arvore = cKDTree(xy)
+    pai = np.full(len(xy), -1, dtype=np.int64)
+    centros, pesos = [], []
+    # só os itens ainda livres disparam consulta: uma por grupo formado
+    for i in range(len(xy)):
+        if pai[i] >= 0:
+            continue
+        viz = np.asarray(arvore.query_ball_point(xy[i], raio), dtype=np.int64)
+        livres = viz[pai[viz] < 0]
+        pai[livres] = len(centros)
+        w = peso[livres]
+        centros.append((xy[livres] * w[:, None]).sum(axis=0) / w.sum())
+        pesos.append(w.sum())
+    return pai, np.array(centros).reshape(-1, 2), np.array(pesos)
+
+
+class ClustersEmoji:
+    """
+    ``rotulos[z]`` é, para cada linha de ``emoc_fato``, o grupo a que ela
+    pertence no zoom ``z`` (``-1`` para linhas sem emoji/geometria).
+    ``grupos(z, **filtros)`` agrega só as linhas que passam nos filtros.
+    """
+
+    def __init__(self, fato, indice=None, raio_px=RAIO_PX, zmin=ZOOM_MIN, zmax=ZOOM_MAX):
+        self._dados = {"emoc_fato": fato}
+        if indice is not None:
+            self._dados["emoc_indice"] = indice
+        self.zmin, self.zmax = zmin, zmax
+        geom = fato.geometry
+        # get_coordinates pula None e vazias: a máscara tem de excluir as duas
+        validos = (fato["cod_emoji"].notna() & geom.notna() & ~geom.is_empty).to_numpy()
+        self._validos = validos
+        ll = shapely.get_coordinates(geom.values[validos])
+        self.lat = np.full(len(fato), np.nan, dtype=COORD_DTYPE)
+        self.lon = np.full(len(fato), np.nan, dtype=COORD_DTYPE)
+        self.lon[validos], self.lat[validos] = ll[:, 0], ll[:, 1]
+        self.cod = np.zeros(len(fato), dtype=np.int16)
+        self.cod[validos] = fato["cod_emoji"].to_numpy()[validos].astype(np.int16)
+        self.cods = np.unique(self.cod[validos])
+
+        self.rotulos = {}
+        xy, peso = _mercator(ll[:, 0], ll[:, 1]), np.ones(len(ll))
+        rotulo = np.arange(len(ll))
+        for z in range(zmax, zmin - 1, -1):
+            pai, xy, peso = _agrupar(xy, peso, raio_px / (EXTENT * 2 ** z))
+            rotulo = pai[rotulo]
+            r = np.full(len(fato), -1, dtype=np.int32)
+            r[validos] = rotulo
+            self.rotulos[z] = r
+
+    def grupos(self, z, **filtros) -> dict:
+        """
+        Grupos não vazios da seleção no zoom ``z``: ``lat``/``lon`` (média
+        dos membros selecionados), ``n``, ``cod`` (emoji dominante),
+        ``contagens`` (n_grupos × ``self.cods``) e ``primeiro`` (posição em
+        ``emoc_fato`` de um membro, para o tooltip de pontos isolados).
+        """
+        z = min(max(z, self.zmin), self.zmax)
+        sel = np.flatnonzero(selecao(self._dados, **filtros) & self._validos)
+        rot = self.rotulos[z][sel]
+        ids, primeiro, inv = np.unique(rot, return_index=True, return_inverse=True)
+        n = np.bincount(inv, minlength=len(ids))
+        lat = np.bincount(inv, self.lat[sel], len(ids)) / np.maximum(n, 1)
+        lon = np.bincount(inv, self.lon[sel], len(ids)) / np.maximum(n, 1)
+        ci = np.searchsorted(self.cods, self.cod[sel])
+        cont = np.bincount(inv * len(self.cods) + ci,
+                           minlength=len(ids) * len(self.cods)).reshape(len(ids), len(self.cods))
+        dominante = self.cods[cont.argmax(axis=1)] if len(ids) else np.array([], dtype=np.int64)
+        return {"lat": lat, "lon": lon, "n": n, "cod": dominante,
+                "contagens": cont, "primeiro": sel[primeiro]}
@@ -0,0 +1,136 @@
+# compartilhado.py
+import json
+import os
+import shutil
+
+import geopandas as gpd
+import pandas as pd
+import pyarrow as pa
+import shapely
+
+# ---------------------------------------------------------------------------------
+# Depósito somente-leitura das camadas de entrada em Arrow IPC, mapeado em
+# memória (mmap).  O primeiro processo grava ``<pasta>/<chave>/<camada>.arrow``
+# (sem compressão); os demais – outras sessões, outros processos do
+# Streamlit atrás de um balanceador – só mapeiam os arquivos: as colunas
+# numéricas e de texto apontam para as páginas do arquivo, compartilhadas
+# pelo cache de páginas do SO, em vez de uma cópia por sessão/processo.
+# A geometria vai como WKB e é decodificada uma vez por processo.
+# ---------------------------------------------------------------------------------
+
+STORE_DIR = "dados/.cache/compartilhado"
+MANIFESTO = "manifesto.json"
+
+
+def _coords_pontos(geom):
+    """Colunas ``x, y[, z]`` se ``geom`` só tem pontos (todos 2D ou todos 3D)."""
+    if not len(geom) or (shapely.get_type_id(geom) != 0).any() or shapely.is_empty(geom).any():
+        return None
+    z = shapely.has_z(geom)
+    if z.any() and not z.all():
+        return None
+    return dict(zip("xyz", shapely.get_coordinates(geom, include_z=bool(z.all())).T))
+
+
+def _tabela(df) -> pa.Table:
+    geo = None
+    if isinstance(df, gpd.GeoDataFrame):
+        col = df.geometry.name
+        crs = df.crs.to_epsg() or df.crs.to_wkt() if df.crs else None
+        geom, posicao = df.geometry.values, df.columns.get_loc(col)
+        df = pd.DataFrame(df).drop(columns=col)
+        coords = _coords_pontos(geom)
+        if coords:
+            # pontos como x/y(/z): reconstruídos direto do mmap, sem um
+            # ``bytes`` de WKB por linha (que o pymalloc não devolve ao SO)
+            geo = {"coluna": col, "crs": crs, "posicao": posicao, "formato": "".join(coords)}
+            for eixo, valores in coords.items():
+                df[f"{col}.{eixo}"] = valores
+        else:
+            geo = {"coluna": col, "crs": crs, "posicao": posicao, "formato": "wkb"}
+            df[col] = shapely.to_wkb(geom)
+    tab = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(tab.schema.metadata or {})
+    meta[b"geo_emoc"] = json.dumps(geo).encode()
+    return tab.replace_schema_metadata(meta)
+
+
+def publicar(gdfs: dict, pasta: str) -> str:
+    """
+    Grava as tabelas de ``gdfs`` em ``pasta`` (troca atômica).  Se outro
+    processo publicou a mesma pasta antes, mantém a dele.
+    """
+    if os.path.exists(os.path.join(pasta, MANIFESTO)):
+        return pasta
+    tmp = f"{pasta}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    nomes = []
+    for nome, df in gdfs.items():
+        if not isinstance(df, pd.DataFrame):
+            continue
+        tab = _tabela(df)
+        with pa.OSFile(os.path.join(tmp, f"{nome}.arrow"), "wb") as sink:
+            with pa.ipc.new_file(sink, tab.schema) as escritor:
+                escritor.write_table(tab)
+        nomes.append(nome)
+    with open(os.path.join(tmp, MANIFESTO), "w", encoding="utf-8") as f:
+        json.dump({"camadas": nomes}, f)
+    try:
+        os.replace(tmp, pasta)
+    except OSError:          # pasta já publicada por outro processo
+        shutil.rmtree(tmp, ignore_errors=True)
+    return pasta
+
+
+def _ler(caminho):
+    """Tabela mapeada (zero cópia) ➜ (Geo)DataFrame somente-leitura."""
+    tab = pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+    geo = json.loads((tab.schema.metadata or {}).get(b"geo_emoc", b"null"))
+    # split_blocks: cada coluna vira um bloco próprio, sem consolidar
+    # (que copiaria); colunas numéricas sem nulos ficam sobre o mmap.
+    # O pool do sistema evita as arenas do mimalloc (~10 MB por processo)
+    # para as poucas cópias que sobram (categorias, textos com nulos).
+    df = tab.to_pandas(split_blocks=True, memory_pool=pa.system_memory_pool())
+    if geo is None:
+        return df
+    col = geo["coluna"]
+    if geo["formato"] == "wkb":
+        geom = shapely.from_wkb(df.pop(col).to_numpy())
+    else:
+        geom = shapely.points(*(df.pop(f"{col}.{eixo}").to_numpy() for eixo in geo["formato"]))
+    df.insert(geo["posicao"], col, gpd.GeoSeries(geom, index=df.index, crs=geo["crs"]))
+    return gpd.GeoDataFrame(df, geometry=col)
+
+
+def abrir(pasta: str) -> dict:
+    """Mapeia todas as camadas publicadas em ``pasta``."""
+    with open(os.path.join(pasta, MANIFESTO), encoding="utf-8") as f:
+        nomes = json.load(f)["camadas"]
+    return {nome: _ler(os.path.join(pasta, f"{nome}.arrow")) for nome in nomes}
+
+
+def _limpar(raiz, manter):
+    for d in os.listdir(raiz):
+        p = os.path.join(raiz, d)
+        # ``*.tmp<pid>`` pode ser a publicação em curso de outro processo
+        if p != manter and ".tmp" not in d and os.path.isdir(p):
+            shutil.rmtree(p, ignore_errors=True)
+
+
+def deposito(chave: str, carregar, raiz=STORE_DIR) -> dict:
+    """
+    Camadas da ``chave`` (ex.: hash dos arquivos de origem) a partir do
+    depósito; na primeira vez chama ``carregar()`` e publica o resultado.
+    Sem permissão de escrita devolve ``carregar()`` diretamente.
+    """
+    pasta = os.path.join(raiz, chave)
+    if not os.path.exists(os.path.join(pasta, MANIFESTO)):
+        gdfs = carregar()
+        try:
+            os.makedirs(raiz, exist_ok=True)
+            publicar(gdfs, pasta)
+            _limpar(raiz, manter=pasta)
+        except OSError:
+            return gdfs
+    return abrir(pasta)
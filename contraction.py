@@ -0,0 +1,267 @@
+# contraction.py
+import contextlib
+import hashlib
+import heapq
+import os
+import re
+
+import numpy as np
+
+from routing import PERFIS
+
+# ---------------------------------------------------------------------------------
+# Contraction Hierarchies sobre o GrafoRuas (routing.py), uma por perfil de
+# custo.  O pré-processamento contrai os nós em ordem de importância criando
+# atalhos; a consulta é um Dijkstra bidirecional só "para cima" na hierarquia,
+# que visita poucas dezenas de nós em vez da rede inteira.
+# ---------------------------------------------------------------------------------
+
+CH_DIR = "dados/.cache/ch"
+LIMITE_TESTEMUNHA = 60      # nós assentados por busca de testemunha
+
+
+def _testemunha(adj, origem, excluido, alvos, limite, max_nos=LIMITE_TESTEMUNHA):
+    """Dijkstra limitado a partir de ``origem`` sem passar por ``excluido``."""
+    dist = {origem: 0.0}
+    fila = [(0.0, origem)]
+    assentados = 0
+    while fila and assentados < max_nos:
+        d, u = heapq.heappop(fila)
+        if d > limite:
+            break
+        if d > dist[u]:
+            continue
+        assentados += 1
+        for v, (w, _, _) in adj[u].items():
+            if v == excluido:
+                continue
+            nd = d + w
+            if nd < dist.get(v, float("inf")):
+                dist[v] = nd
+                heapq.heappush(fila, (nd, v))
+    return {a: dist.get(a, float("inf")) for a in alvos}
+
+
+class HierarquiaContracao:
+    """
+    CH de um perfil: arestas (``eu``, ``ev``) com peso ``ew``; ``evia`` é o nó
+    contraído de um atalho (-1 se aresta original) e ``earesta`` o índice da
+    rua original (-1 se atalho).  ``rank`` é a ordem de contração.
+    """
+
+    def __init__(self, n, rank, eu, ev, ew, evia, earesta, comp_aresta):
+        self.n = n
+        self.rank = rank
+        self.eu, self.ev, self.ew = eu, ev, ew
+        self.evia, self.earesta = evia, earesta
+        self.comp_aresta = comp_aresta
+        self._montar()
+
+    # ----------------------------------------------------------
+    # pré-processamento
+    # ----------------------------------------------------------
+    @classmethod
+    def construir(cls, grafo, perfil="emocional"):
+        pesos = grafo.pesos(perfil)
+        n = grafo.n
+        adj = [dict() for _ in range(n)]
+        for u in range(n):
+            for k in range(grafo.indptr[u], grafo.indptr[u + 1]):
+                v, w = int(grafo.indices[k]), float(pesos[k])
+                if v != u and w < adj[u].get(v, (float("inf"),))[0]:
+                    adj[u][v] = (w, -1, int(grafo.aresta[k]))
+
+        contraido = np.zeros(n, dtype=bool)
+        nivel = np.zeros(n, dtype=np.int64)
+        arestas = {}
+
+        def atalhos(v):
+            viz = list(adj[v])
+            novos = []
+            for i, u in enumerate(viz):
+                alvos = viz[i + 1:]
+                if not alvos:
+                    continue
+                wu = adj[v][u][0]
+                lim = wu + max(adj[v][x][0] for x in alvos)
+                wit = _testemunha(adj, u, v, alvos, lim)
+                for x in alvos:
+                    via = wu + adj[v][x][0]
+                    if wit[x] > via:
+                        novos.append((u, x, via))
+            return viz, novos
+
+        def prioridade(v):
+            viz, novos = atalhos(v)
+            return len(novos) - len(viz) + nivel[v]
+
+        fila = [(prioridade(v), v) for v in range(n)]
+        heapq.heapify(fila)
+        rank = np.zeros(n, dtype=np.int64)
+        ordem = 0
+        while fila:
+            _, v = heapq.heappop(fila)
+            if contraido[v]:
+                continue
+            p = prioridade(v)
+            if fila and p > fila[0][0]:
+                heapq.heappush(fila, (p, v))        # atualização preguiçosa
+                continue
+            viz, novos = atalhos(v)
+            for u in viz:
+                w, via, ar = adj[v][u]
+                arestas[(v, u)] = (w, via, ar)
+                nivel[u] = max(nivel[u], nivel[v] + 1)
+                del adj[u][v]
+            for u, x, w in novos:
+                if w < adj[u].get(x, (float("inf"),))[0]:
+                    adj[u][x] = (w, v, -1)
+                    adj[x][u] = (w, v, -1)
+            contraido[v] = True
+            rank[v] = ordem
+            ordem += 1
+
+        chaves = list(arestas)
+        vals = [arestas[c] for c in chaves]
+        return cls(
+            n, rank,
+            np.array([c[0] for c in chaves], dtype=np.int64),
+            np.array([c[1] for c in chaves], dtype=np.int64),
+            np.array([v[0] for v in vals], dtype=float),
+            np.array([v[1] for v in vals], dtype=np.int64),
+            np.array([v[2] for v in vals], dtype=np.int64),
+            grafo.comp_aresta,
+        )
+
+    # ----------------------------------------------------------
+    # estrutura de consulta
+    # ----------------------------------------------------------
+    def _montar(self):
+        # grafo "para cima": cada aresta guardada a partir do nó de menor rank
+        ordem = np.argsort(self.eu, kind="stable")
+        self._indptr = np.searchsorted(self.eu[ordem], np.arange(self.n + 1)).tolist()
+        self._ev = self.ev[ordem].tolist()
+        self._ew = self.ew[ordem].tolist()
+        # (menor, maior) ➜ (via, aresta) para desempacotar atalhos
+        self._desc = {}
+        for u, v, via, ar in zip(self.eu.tolist(), self.ev.tolist(),
+                                 self.evia.tolist(), self.earesta.tolist()):
+            self._desc[(min(u, v), max(u, v))] = (via, ar)
+
+    def _busca(self, origem, destino):
+        inf = float("inf")
+        indptr, ev, ew = self._indptr, self._ev, self._ew
+        dist = ({origem: 0.0}, {destino: 0.0})
+        pai = ({origem: None}, {destino: None})
+        filas = ([(0.0, origem)], [(0.0, destino)])
+        melhor, meio = inf, None
+        while filas[0] or filas[1]:
+            for lado in (0, 1):
+                fila = filas[lado]
+                if not fila:
+                    continue
+                d, u = heapq.heappop(fila)
+                if d > dist[lado].get(u, inf):
+                    continue
+                if d >= melhor:
+                    fila.clear()
+                    continue
+                outro = dist[1 - lado].get(u)
+                if outro is not None and d + outro < melhor:
+                    melhor, meio = d + outro, u
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = ev[k]
+                    nd = d + ew[k]
+                    if nd < dist[lado].get(v, inf):
+                        dist[lado][v] = nd
+                        pai[lado][v] = u
+                        heapq.heappush(fila, (nd, v))
+        return melhor, meio, pai
+
+    def _desempacotar(self, u, v, nos, arestas):
+        via, ar = self._desc[(min(u, v), max(u, v))]
+        if via < 0:
+            arestas.append(ar)
+            nos.append(v)
+            return
+        self._desempacotar(u, via, nos, arestas)
+        self._desempacotar(via, v, nos, arestas)
+
+    def rota(self, origem: int, destino: int):
+        """Mesmo formato de ``GrafoRuas.rota``: nos, arestas, custo, comprimento."""
+        if origem == destino:
+            return {"nos": [origem], "arestas": [], "custo": 0.0, "comprimento": 0.0}
+        custo, meio, pai = self._busca(origem, destino)
+        if meio is None:
+            return None
+        ida = [meio]
+        while pai[0][ida[-1]] is not None:
+            ida.append(pai[0][ida[-1]])
+        ida.reverse()
+        volta = [meio]
+        while pai[1][volta[-1]] is not None:
+            volta.append(pai[1][volta[-1]])
+        hierarquico = ida + volta[1:]
+
+        nos, arestas = [origem], []
+        for u, v in zip(hierarquico, hierarquico[1:]):
+            self._desempacotar(u, v, nos, arestas)
+        comp = float(self.comp_aresta[arestas].sum()) if arestas else 0.0
+        return {"nos": nos, "arestas": arestas, "custo": custo, "comprimento": comp}
+
+    # ----------------------------------------------------------
+    # persistência
+    # ----------------------------------------------------------
+    def salvar(self, caminho):
+        # grava ao lado e troca de uma vez: quem lê nunca vê um .npz pela
+        # metade; o pid no nome (como em compartilhado.py) evita que dois
+        # processos gravando o mesmo perfil troquem o .tmp um do outro
+        tmp = f"{caminho}.tmp{os.getpid()}"
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, n=self.n, rank=self.rank, eu=self.eu, ev=self.ev, ew=self.ew,
+                         evia=self.evia, earesta=self.earesta, comp_aresta=self.comp_aresta)
+            os.replace(tmp, caminho)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp)
+
+    @classmethod
+    def carregar(cls, caminho):
+        z = np.load(caminho)
+        return cls(int(z["n"]), z["rank"], z["eu"], z["ev"], z["ew"],
+                   z["evia"], z["earesta"], z["comp_aresta"])
+
+
+def hash_grafo(grafo, perfil) -> str:
+    """Identifica topologia + pesos de um perfil (nome do arquivo em disco)."""
+    h = hashlib.sha256()
+    for a in (grafo.indptr, grafo.indices, grafo.aresta, grafo.pesos(perfil)):
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()[:16]
+
+
+def hierarquias(grafo, perfis=tuple(PERFIS), pasta=CH_DIR) -> dict:
+    """
+    ``{perfil: HierarquiaContracao}``, lidas de ``pasta`` quando já
+    pré-processadas para este grafo/pesos, senão construídas e gravadas.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    out = {}
+    for perfil in perfis:
+        nome = f"{perfil}_{hash_grafo(grafo, perfil)}.npz"
+        caminho = os.path.join(pasta, nome)
+        if os.path.exists(caminho):
+            out[perfil] = HierarquiaContracao.carregar(caminho)
+            continue
+        ch = HierarquiaContracao.construir(grafo, perfil)
+        ch.salvar(caminho)
+        # remove pré-processamentos antigos deste perfil (só ``<perfil>_<hash>.npz``,
+        # nunca outro perfil nem o .tmp de quem ainda está gravando)
+        antigo = re.compile(re.escape(f"{perfil}_") + r"[0-9a-f]{16}\.npz")
+        for f in os.listdir(pasta):
+            if f != nome and antigo.fullmatch(f):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(pasta, f))
+        out[perfil] = ch
+    return out
@@ -0,0 +1,157 @@
+# densidade.py
+import threading
+from collections import OrderedDict
+
+import folium
+import numpy as np
+import shapely
+from folium.utilities import image_to_url
+from pyproj import Transformer
+from scipy.ndimage import convolve1d
+
+from emoc_index import chave_filtros, selecao
+
+EPSG_METRIC = 32722      # UTM zona 22 S  (m)
+
+# ---------------------------------------------------------------------------------
+# Mapa de calor pré-calculado no servidor (substitui plugins.HeatMap).
+# KDE gaussiano numa grade regular em EPSG:32722: histograma dos pontos
+# filtrados convoluído por um núcleo 1-D em cada eixo (o gaussiano é
+# separável), reamostrado para Web Mercator e enviado como um PNG
+# (ImageOverlay).  O tamanho do HTML e o custo no navegador não dependem do
+# número de pontos.
+# ---------------------------------------------------------------------------------
+
+CELULA = 20              # m – lado da célula da grade
+BANDA = 100              # m – desvio-padrão do núcleo gaussiano
+MAX_CACHE = 128          # imagens (uma por combinação de filtros) em memória
+
+# gradiente padrão do leaflet.heat: posição ➜ RGB
+GRADIENTE = [(0.0, (0, 0, 255)), (0.4, (0, 0, 255)), (0.6, (0, 255, 255)),
+             (0.7, (0, 255, 0)), (0.8, (255, 255, 0)), (1.0, (255, 0, 0))]
+
+
+def _nucleo(celula, banda):
+    """Pesos gaussianos 1-D entre centros de células, truncados em 3σ."""
+    r = int(3 * banda // celula)
+    d = np.arange(-r, r + 1) * celula
+    return np.exp(-0.5 * (d / banda) ** 2)
+
+
+def _paleta():
+    pos = np.linspace(0, 1, 256)
+    xs = [p for p, _ in GRADIENTE]
+    rgb = np.column_stack([np.interp(pos, xs, [c[i] for _, c in GRADIENTE]) for i in range(3)])
+    return rgb.astype(np.uint8)
+
+
+class DensidadeKDE:
+    """
+    Densidade dos pontos de ``emoc_fato`` por combinação de filtros
+    (mesma semântica de ``emoc_index.filtrar``).  A grade cobre a extensão
+    dos pontos com margem de 3σ; ``camada(filtros)`` devolve um
+    ``folium.raster_layers.ImageOverlay`` com o PNG guardado num cache LRU.
+    """
+
+    def __init__(self, fato, indice=None, celula=CELULA, banda=BANDA, max_cache=MAX_CACHE):
+        self._dados = {"emoc_fato": fato}
+        if indice is not None:
+            self._dados["emoc_indice"] = indice
+        self.celula, self.banda = celula, banda
+        self.max_cache = max_cache
+        self._cache = OrderedDict()
+        self._trava = threading.Lock()      # sessões do Streamlit em threads
+        self.hits = self.misses = 0
+
+        geom = fato.geometry
+        # get_coordinates pula None e vazias: a máscara tem de excluir as duas
+        validos = (fato["cod_emoji"].notna() & geom.notna() & ~geom.is_empty).to_numpy()
+        self._validos = validos
+        xy = shapely.get_coordinates(fato.to_crs(EPSG_METRIC).geometry.values[validos])
+        margem = 3 * banda
+        self.x0, self.y0 = xy.min(axis=0) - margem if len(xy) else (0.0, 0.0)
+        x1, y1 = xy.max(axis=0) + margem if len(xy) else (celula, celula)
+        self.nx = max(2, int(np.ceil((x1 - self.x0) / celula)))
+        self.ny = max(2, int(np.ceil((y1 - self.y0) / celula)))
+        # célula de cada ponto (linha = y, coluna = x), alinhada às linhas de fato
+        cel = np.full(len(fato), -1, dtype=np.int32)
+        ix = np.clip(((xy[:, 0] - self.x0) // celula).astype(np.int64), 0, self.nx - 1)
+        iy = np.clip(((xy[:, 1] - self.y0) // celula).astype(np.int64), 0, self.ny - 1)
+        cel[validos] = iy * self.nx + ix
+        self._cel = cel
+        self._k = _nucleo(celula, banda)
+        self._reamostragem()
+        self._cores = _paleta()
+
+    # ----------------------------------------------------------
+    # grade UTM ➜ raster Web Mercator (pesos bilineares fixos)
+    # ----------------------------------------------------------
+    def _reamostragem(self):
+        para_m = Transformer.from_crs(EPSG_METRIC, 3857, always_xy=True)
+        de_m = Transformer.from_crs(3857, EPSG_METRIC, always_xy=True)
+        x1, y1 = self.x0 + self.nx * self.celula, self.y0 + self.ny * self.celula
+        cx, cy = para_m.transform([self.x0, x1, self.x0, x1], [self.y0, self.y0, y1, y1])
+        mx0, mx1, my0, my1 = min(cx), max(cx), min(cy), max(cy)
+        # raster com ~a mesma resolução da grade; linha 0 = norte
+        lado = (mx1 - mx0) / self.nx
+        w, h = self.nx, int(np.ceil((my1 - my0) / lado))
+        mx = mx0 + (np.arange(w) + 0.5) * lado
+        my = my1 - (np.arange(h) + 0.5) * lado
+        gx, gy = np.meshgrid(mx, my)
+        ux, uy = de_m.transform(gx.ravel(), gy.ravel())
+        fx = (np.asarray(ux) - self.x0) / self.celula - 0.5
+        fy = (np.asarray(uy) - self.y0) / self.celula - 0.5
+        i0 = np.clip(np.floor(fx).astype(np.int64), 0, self.nx - 2)
+        j0 = np.clip(np.floor(fy).astype(np.int64), 0, self.ny - 2)
+        tx, ty = np.clip(fx - i0, 0, 1), np.clip(fy - j0, 0, 1)
+        dentro = (fx >= -0.5) & (fx <= self.nx - 0.5) & (fy >= -0.5) & (fy <= self.ny - 0.5)
+        self._amostra = (j0, i0, tx, ty, dentro, (h, w))
+        # limites do raster em lat/lon (cantos Mercator ➜ geográficas)
+        (lo0, lo1), (la0, la1) = Transformer.from_crs(3857, 4326, always_xy=True).transform(
+            [mx0, mx1], [my0, my1])
+        self.limites = [[la0, lo0], [la1, lo1]]
+
+    def grade(self, **filtros) -> np.ndarray:
+        """Densidade (pontos/m²) na grade UTM, ``ny × nx`` com linha 0 ao sul."""
+        cel = self._cel[selecao(self._dados, **filtros) & self._validos]
+        hist = np.bincount(cel, minlength=self.nx * self.ny).reshape(self.ny, self.nx)
+        dens = convolve1d(hist.astype(float), self._k, axis=0, mode="constant")
+        dens = convolve1d(dens, self._k, axis=1, mode="constant")
+        return dens / (2 * np.pi * self.banda ** 2)
+
+    def imagem(self, **filtros) -> np.ndarray:
+        """RGBA uint8 em Web Mercator, normalizado pelo máximo da seleção."""
+        dens = self.grade(**filtros)
+        j0, i0, tx, ty, dentro, forma = self._amostra
+        v = (dens[j0, i0] * (1 - tx) * (1 - ty) + dens[j0, i0 + 1] * tx * (1 - ty) +
+             dens[j0 + 1, i0] * (1 - tx) * ty + dens[j0 + 1, i0 + 1] * tx * ty)
+        v = np.where(dentro, v, 0.0)
+        topo = v.max()
+        v = v / topo if topo > 0 else v
+        rgba = np.zeros((v.size, 4), dtype=np.uint8)
+        rgba[:, :3] = self._cores[np.clip((v * 255).astype(int), 0, 255)]
+        rgba[:, 3] = np.where(v < 0.02, 0, np.clip(v * 1.5, 0.05, 1.0) * 200).astype(np.uint8)
+        return rgba.reshape(*forma, 4)
+
+    def png(self, **filtros) -> str:
+        """Data URL do PNG da seleção, do cache LRU quando já calculado."""
+        chave = chave_filtros(**filtros)
+        with self._trava:
+            if chave in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(chave)
+                return self._cache[chave]
+            self.misses += 1
+        url = image_to_url(self.imagem(**filtros))
+        with self._trava:
+            self._cache[chave] = url
+            if len(self._cache) > self.max_cache:
+                self._cache.popitem(last=False)
+        return url
+
+    def camada(self, filtros, name=None, opacity=1.0):
+        return folium.raster_layers.ImageOverlay(
+            self.png(**filtros), bounds=self.limites, name=name, opacity=opacity,
+            interactive=False, zindex=1,
+        )
+
@@ -0,0 +1,86 @@
+# emoc_index.py
+import numpy as np
+
+from rastreio import rastrear
+
+# ---------------------------------------------------------------------------------
+# Índice invertido (bitmap) sobre as dimensões da tabela fato ``emoc_fato``.
+# Para cada valor de cada dimensão guarda uma máscara booleana pré-calculada;
+# qualquer combinação de filtros vira uma interseção (&) de máscaras.
+# ---------------------------------------------------------------------------------
+
+DIMENSOES_INDICE = ["emocao", "valencia", "nome", "referencia", "genero", "faixa_etaria"]
+
+
+def indice_emocoes(fato, colunas=DIMENSOES_INDICE) -> dict:
+    """
+    Constrói ``{coluna: {valor: máscara}}`` para as colunas categóricas de
+    ``fato``.  As máscaras são ``np.ndarray`` booleanos alinhados às linhas
+    (posicionais) da tabela.
+    """
+    indice = {"_n": len(fato)}
+    for col in colunas:
+        if col not in fato:
+            continue
+        cat = fato[col].astype("category")
+        codes = cat.cat.codes.to_numpy()
+        indice[col] = {v: codes == i for i, v in enumerate(cat.cat.categories)}
+    return indice
+
+
+def _valores(valor):
+    """
+    Normaliza um filtro em lista de valores; ``None`` se não filtra.  Só
+    ``None`` deixa a coluna livre: ``""`` é um valor como outro qualquer
+    (não casa com nada) e ``[]`` não deixa passar nenhuma linha.
+    """
+    if valor is None:
+        return None
+    return [valor] if isinstance(valor, str) else list(valor)
+
+
+def filtros_ativos(**filtros) -> dict:
+    """``{coluna: [valores]}`` só com os filtros que restringem algo."""
+    return {c: v for c, v in ((c, _valores(v)) for c, v in filtros.items()) if v is not None}
+
+
+def chave_filtros(**filtros) -> tuple:
+    """Chave canônica (hashable) de uma combinação de filtros: ordem e ``None`` não importam."""
+    return tuple(sorted((c, tuple(sorted(map(str, v)))) for c, v in filtros_ativos(**filtros).items()))
+
+
+def mascara(indice, **filtros) -> np.ndarray:
+    """
+    Resolve filtros ``coluna=valor`` ou ``coluna=[valores]`` numa máscara.
+    ``None`` não filtra; listas são OU, colunas diferentes são E.  Quem
+    recebe "todos" como ``""`` ou ``[]`` (selectbox/multiselect) converte
+    para ``None`` antes de chamar.
+    """
+    n = indice["_n"]
+    sel = np.ones(n, dtype=bool)
+    for col, vals in filtros_ativos(**filtros).items():
+        masks = indice[col]
+        m = np.zeros(n, dtype=bool)
+        for v in vals:
+            if v in masks:
+                m |= masks[v]
+        sel &= m
+    return sel
+
+
+def selecao(data, **filtros) -> np.ndarray:
+    """Máscara booleana (posicional) das linhas de ``data['emoc_fato']``."""
+    if "emoc_indice" in data:
+        return mascara(data["emoc_indice"], **filtros)
+    # sem índice: varredura direta (mesma semântica)
+    fato = data["emoc_fato"]
+    sel = np.ones(len(fato), dtype=bool)
+    for col, vals in filtros_ativos(**filtros).items():
+        sel &= fato[col].isin(vals).to_numpy()
+    return sel
+
+
+@rastrear()
+def filtrar(data, **filtros):
+    """Linhas de ``data['emoc_fato']`` que satisfazem os filtros."""
+    return data["emoc_fato"][selecao(data, **filtros)]
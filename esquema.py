@@ -0,0 +1,96 @@
+# esquema.py
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------------
+# Tipos compactos das camadas (entradas de load_entrada e saídas de build_layers).
+# Textos repetidos (valência, emoção, gênero, faixa etária…) viram
+# ``category``; códigos pequenos, int8/int16; contagens, int32; atributos
+# reais com NaN, float32.  As entradas assim compactadas é que vão para o
+# depósito mapeado em memória (compartilhado.py).
+# ---------------------------------------------------------------------------------
+
+VALENCIA = pd.CategoricalDtype(["Negativo", "Neutro", "Positivo"])
+CONTAGEM = "int32"
+COORD_DTYPE = np.float32     # arrays de coordenadas derivados (clusters etc.)
+
+_PONTOS = {"fid": "int32", "cod_emoji": "float32", "cod_cenario": "int8",
+           "cod_part": "category", "cod_modal": "int8"}
+_VALENCIAS = {"Negativo": CONTAGEM, "Neutro": CONTAGEM, "Positivo": CONTAGEM,
+              "vlc_maior": CONTAGEM, "vlc_maior_text": VALENCIA}
+
+ESQUEMAS = {
+    # entradas (load_entrada)
+    "emoji": {"cod_emoji": "int8", "emocao": "category", "valencia": VALENCIA},
+    "modais": {"cod_modal": "int8", "nome": "category"},
+    "cenarios": {"cod_cenario": "int8", "fid": "int16", "referencia": "category"},
+    "pts_cenarios": {"fid": "int16", "cod_cenario": "int8"},
+    "ways": {"osm_id": "int32", "cod_cenario": "int8", "source": "int32", "target": "int32"},
+    "participantes": {"cod_part": "category", "faixa_etaria": "category",
+                      "genero": "category", "amostra": "category", "cod_escala": "int8"},
+    "emoc": _PONTOS,
+    # camadas derivadas (build_layers)
+    "emoc_colec_ruas": {**_PONTOS, "name": "category"},
+    "emoc_colec_hub": {**_PONTOS, "name": "category"},
+    "emoc_fato": {**_PONTOS, "emocao": "category", "valencia": VALENCIA, "nome": "category",
+                  "referencia": "category", "faixa_etaria": "category", "genero": "category"},
+    "contagem_emoji_rua": {"cod_emoji": "float32", "qta_emoji": CONTAGEM},
+    "emoc_count_ways_vlc": _VALENCIAS,
+    # ruas sem emoção ficam com NaN nas contagens (merge left)
+    "emoc_ways_vlc_rua": {"Negativo": "float32", "Neutro": "float32", "Positivo": "float32",
+                          "vlc_maior": "float32", "vlc_maior_text": VALENCIA},
+    "emoc_hex": {"tamanho_hex": "int16", "q": "int32", "r": "int32",
+                 "Negativo": CONTAGEM, "Neutro": CONTAGEM, "Positivo": CONTAGEM,
+                 "total": CONTAGEM, "vlc_maior": CONTAGEM, "vlc_maior_text": VALENCIA},
+}
+
+# tabelas com uma coluna de contagem por cod_emoji (nomes inteiros)
+POR_EMOJI = {"emoc_hex", "contagem_pivot"}
+
+
+def _converter(serie, dtype):
+    """``serie`` em ``dtype``; mantém a original se o valor não couber."""
+    alvo = pd.api.types.pandas_dtype(dtype)
+    if serie.dtype == alvo:
+        return serie
+    if isinstance(alvo, pd.CategoricalDtype):
+        if alvo.categories is not None and not serie.dropna().isin(alvo.categories).all():
+            return serie.astype("category")
+        return serie.astype(alvo)
+    if not pd.api.types.is_numeric_dtype(serie):
+        return serie
+    if alvo.kind in "iu":
+        if serie.isna().any():
+            return serie.astype("float32") if alvo.itemsize < 4 else serie
+        info = np.iinfo(alvo)
+        if len(serie) and (serie.min() < info.min or serie.max() > info.max):
+            return serie
+    return serie.astype(alvo)
+
+
+def compactar(df, nome):
+    """Aplica ``ESQUEMAS[nome]`` às colunas presentes em ``df`` (cópia rasa)."""
+    esquema = dict(ESQUEMAS.get(nome, {}))
+    if nome in POR_EMOJI and df is not None:
+        esquema.update({c: CONTAGEM for c in df.columns if not isinstance(c, str)})
+    if not esquema or df is None:
+        return df
+    novas = {c: _converter(df[c], t) for c, t in esquema.items() if c in df}
+    novas = {c: s for c, s in novas.items() if s.dtype != df[c].dtype}
+    if not novas:
+        return df
+    out = df.copy(deep=False)
+    for c, s in novas.items():
+        out[c] = s
+    return out
+
+
+def compactar_layers(gdfs: dict) -> dict:
+    """:func:`compactar` em todas as tabelas de um dicionário de camadas."""
+    return {k: compactar(v, k) if isinstance(v, pd.DataFrame) else v for k, v in gdfs.items()}
+
+
+def memoria(gdfs: dict) -> dict:
+    """Bytes (``memory_usage(deep=True)``) de cada tabela do dicionário."""
+    return {k: int(v.memory_usage(deep=True).sum()) for k, v in gdfs.items()
+            if isinstance(v, pd.DataFrame)}
@@ -0,0 +1,162 @@
+# geocoder.py
+import bisect
+import re
+import unicodedata
+from collections import defaultdict
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+EPSG_METRIC = 32722      # UTM zona 22 S  (m)
+EPSG_LATLON = 4326       # WGS-84
+EMPATE = 0.05            # diferença de pontuação tratada como empate
+
+# ---------------------------------------------------------------------------------
+# Geocodificador offline (substitui geopy.Nominatim da navegação).
+# Índice de prefixos + trigramas sobre os nomes das ruas (``ways.name``) e os
+# pontos de referência dos cenários; nenhuma chamada de rede.
+# ---------------------------------------------------------------------------------
+
+
+def normalizar(texto) -> str:
+    """minúsculas, sem acentos/pontuação, espaços simples."""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", texto).split())
+
+
+def trigramas(texto) -> set:
+    t = f"  {texto} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+def _pontos_ruas(ways):
+    """Um ponto representativo por nome de rua: meio do trecho mais central."""
+    if "name" not in ways:
+        return pd.DataFrame(columns=["rotulo", "x", "y"])
+    w = ways[ways["name"].notna() & (ways["name"].astype(str).str.strip() != "")]
+    if w.empty:
+        return pd.DataFrame(columns=["rotulo", "x", "y"])
+    meio = shapely.line_interpolate_point(
+        w.to_crs(EPSG_METRIC).geometry.values, 0.5, normalized=True)
+    xy = shapely.get_coordinates(meio)
+    df = pd.DataFrame({"rotulo": w["name"].astype(str).values, "x": xy[:, 0], "y": xy[:, 1]})
+    media = df.groupby("rotulo")[["x", "y"]].transform("mean")
+    df["d2"] = (df["x"] - media["x"]) ** 2 + (df["y"] - media["y"]) ** 2
+    return df.loc[df.groupby("rotulo")["d2"].idxmin(), ["rotulo", "x", "y"]]
+
+
+def _pontos_referencia(pts_cenarios, cenarios=None):
+    """``pt_referencia`` (+ nome do cenário, quando disponível)."""
+    pts = pts_cenarios
+    if cenarios is not None and "referencia" in cenarios:
+        pts = pts.merge(cenarios[["cod_cenario", "referencia"]], on="cod_cenario", how="left")
+        rotulo = np.where(pts["referencia"].notna(),
+                          pts["referencia"].astype(str) + " – " + pts["pt_referencia"].astype(str),
+                          pts["pt_referencia"].astype(str))
+    else:
+        rotulo = pts["pt_referencia"].astype(str).values
+    xy = shapely.get_coordinates(pts.to_crs(EPSG_METRIC).geometry.values)
+    return pd.DataFrame({"rotulo": rotulo, "x": xy[:, 0], "y": xy[:, 1]})
+
+
+class GeocodificadorLocal:
+    """
+    Resolve texto livre em coordenadas.  ``buscar`` combina casamento de
+    prefixo por palavra (bisect numa lista ordenada de tokens) com
+    similaridade de trigramas (Jaccard), tolerando acentos e erros leves.
+    """
+
+    def __init__(self, ways=None, pts_cenarios=None, cenarios=None):
+        partes = []
+        if pts_cenarios is not None and not pts_cenarios.empty:
+            partes.append(_pontos_referencia(pts_cenarios, cenarios).assign(tipo="referência"))
+        if ways is not None and not ways.empty:
+            partes.append(_pontos_ruas(ways).assign(tipo="rua"))
+        tab = pd.concat(partes, ignore_index=True) if partes else \
+            pd.DataFrame(columns=["rotulo", "x", "y", "tipo"])
+        ll = shapely.get_coordinates(gpd.GeoSeries(
+            shapely.points(tab["x"].to_numpy(float), tab["y"].to_numpy(float)),
+            crs=EPSG_METRIC).to_crs(EPSG_LATLON).values)
+        tab["lon"], tab["lat"] = ll[:, 0], ll[:, 1]
+        self.tabela = tab.reset_index(drop=True)
+
+        self._norm = [normalizar(r) for r in self.tabela["rotulo"]]
+        self._tri = [trigramas(n) for n in self._norm]
+        self._por_tri = defaultdict(set)
+        tokens = []
+        for i, (n, tri) in enumerate(zip(self._norm, self._tri)):
+            for t in tri:
+                self._por_tri[t].add(i)
+            tokens.extend((tok, i) for tok in n.split())
+        tokens.sort()
+        self._tokens = [t for t, _ in tokens]
+        self._token_ids = [i for _, i in tokens]
+
+    def _prefixo(self, tok):
+        ini = bisect.bisect_left(self._tokens, tok)
+        fim = bisect.bisect_right(self._tokens, tok + "\uffff")
+        return set(self._token_ids[ini:fim])
+
+    def buscar(self, texto, limite=5, minimo=0.2) -> list:
+        """Até ``limite`` candidatos ``{rotulo, tipo, lon, lat, score}``."""
+        q = normalizar(texto)
+        if not q:
+            return []
+        tri_q = trigramas(q)
+        toks = q.split()
+        cand = set()
+        for t in tri_q:
+            cand |= self._por_tri.get(t, set())
+        prefixos = [self._prefixo(t) for t in toks]
+        for p in prefixos:
+            cand |= p
+
+        res = []
+        for i in cand:
+            jac = len(tri_q & self._tri[i]) / len(tri_q | self._tri[i])
+            pref = sum(i in p for p in prefixos) / len(toks)
+            score = 0.6 * jac + 0.4 * pref
+            if self._norm[i] == q:
+                score = 1.0
+            if score >= minimo:
+                res.append((score, i))
+        res.sort(key=lambda s: (-s[0], self._norm[s[1]]))
+        out = []
+        for score, i in res[:limite]:
+            r = self.tabela.iloc[i]
+            out.append({"rotulo": r["rotulo"], "tipo": r["tipo"],
+                        "lon": float(r["lon"]), "lat": float(r["lat"]), "score": round(score, 3)})
+        return out
+
+    def geocodificar(self, texto):
+        """Melhor candidato ou ``None``."""
+        res = self.buscar(texto, limite=1)
+        return res[0] if res else None
+
+    def candidatos(self, texto, limite=5, empate=EMPATE) -> list:
+        """
+        Candidatos empatados (a menos de ``empate``) com a melhor pontuação.
+        Mais de um quer dizer texto ambíguo (ex.: "praca japao" casa quase
+        igualmente com o Início e o Fim do cenário) e cabe a quem chama
+        perguntar qual.
+        """
+        res = self.buscar(texto, limite=limite)
+        return [r for r in res if r["score"] >= res[0]["score"] - empate]
+
+    @property
+    def tem_ruas(self) -> bool:
+        """``False`` quando ``ways.name`` não trouxe nenhum nome de rua."""
+        return bool((self.tabela["tipo"] == "rua").any())
+
+    def referencias(self) -> list:
+        """Pontos de referência, no mesmo formato dos candidatos de ``buscar``."""
+        ref = self.tabela[self.tabela["tipo"] == "referência"]
+        return [{"rotulo": r.rotulo, "tipo": r.tipo, "lon": float(r.lon), "lat": float(r.lat),
+                 "score": 1.0} for r in ref.itertuples()]
+
+    def vertice(self, candidato, grafo):
+        """Id do vértice do grafo mais próximo de um candidato."""
+        return grafo.vertice_mais_proximo(candidato["lon"], candidato["lat"])
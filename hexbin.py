@@ -0,0 +1,104 @@
+# hexbin.py
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+EPSG_METRIC = 32722      # UTM zona 22 S  (m)
+EPSG_LATLON = 4326       # WGS-84
+
+# ---------------------------------------------------------------------------------
+# Agregação hexagonal multirresolução dos pontos de emoção.
+# Grade de hexágonos "pointy-top" em EPSG:32722 (coordenadas axiais q, r);
+# cada resolução tem o dobro do raio da seguinte, como os níveis do H3.
+# ---------------------------------------------------------------------------------
+
+VALENCIAS = ["Negativo", "Neutro", "Positivo"]
+TAMANHOS = [1600, 800, 400, 200, 100]      # m – raio (centro ➜ vértice) por resolução
+RAIZ3 = np.sqrt(3.0)
+
+
+def hex_ids(x, y, tamanho):
+    """Coordenadas axiais (q, r) do hexágono que contém cada ponto."""
+    qf = (RAIZ3 / 3 * x - y / 3) / tamanho
+    rf = (2 / 3 * y) / tamanho
+    sf = -qf - rf
+    q, r, s = np.round(qf), np.round(rf), np.round(sf)
+    dq, dr, ds = np.abs(q - qf), np.abs(r - rf), np.abs(s - sf)
+    # arredondamento cúbico: corrige a coordenada com maior erro
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    q = np.where(fix_q, -r - s, q)
+    r = np.where(fix_r, -q - s, r)
+    return q.astype(np.int64), r.astype(np.int64)
+
+
+def hex_poligonos(q, r, tamanho):
+    """Polígonos (EPSG:32722) dos hexágonos (q, r)."""
+    cx = tamanho * RAIZ3 * (q + r / 2)
+    cy = tamanho * 1.5 * r
+    ang = np.deg2rad(30 + 60 * np.arange(7))           # 7º vértice fecha o anel
+    xs = cx[:, None] + tamanho * np.cos(ang)[None, :]
+    ys = cy[:, None] + tamanho * np.sin(ang)[None, :]
+    return shapely.polygons(np.stack([xs, ys], axis=-1))
+
+
+def _celulas(cnt, tamanho):
+    """Contagens por (q, r) ➜ GeoDataFrame com valência prevalente."""
+    cnt = cnt.reset_index()
+    for v in VALENCIAS:
+        if v not in cnt:
+            cnt[v] = 0
+    cnt["total"] = cnt[VALENCIAS].sum(axis=1)
+    cnt["vlc_maior"] = cnt[VALENCIAS].max(axis=1)
+    cnt["vlc_maior_text"] = cnt[VALENCIAS].idxmax(axis=1)
+    cnt.insert(0, "tamanho_hex", tamanho)
+    geom = hex_poligonos(cnt["q"].to_numpy(), cnt["r"].to_numpy(), tamanho)
+    return gpd.GeoDataFrame(cnt, geometry=geom, crs=EPSG_METRIC)
+
+
+def agregar_hex(pts, tamanhos=TAMANHOS) -> gpd.GeoDataFrame:
+    """
+    Pontos com ``cod_emoji`` e ``valencia`` (ex.: ``emoc_fato``) ➜ uma linha
+    por hexágono não vazio e por resolução: ``tamanho_hex``, ``q``, ``r``,
+    contagem por valência (``VALENCIAS``), ``total``, ``vlc_maior`` /
+    ``vlc_maior_text`` e uma coluna por ``cod_emoji`` (como contagem_pivot).
+    """
+    pts = pts[pts["cod_emoji"].notna() & pts.geometry.notna() & ~pts.geometry.is_empty]
+    xy = shapely.get_coordinates(pts.to_crs(EPSG_METRIC).geometry.values)
+    cod = pts["cod_emoji"].to_numpy(dtype=int)
+    vlc = pts["valencia"].astype(object).to_numpy()
+    partes = []
+    for tamanho in tamanhos:
+        q, r = hex_ids(xy[:, 0], xy[:, 1], tamanho)
+        df = pd.DataFrame({"q": q, "r": r, "cod_emoji": cod, "valencia": vlc})
+        por_vlc = df.groupby(["q", "r", "valencia"]).size().unstack(fill_value=0)
+        por_emoji = df.groupby(["q", "r", "cod_emoji"]).size().unstack(fill_value=0)
+        cnt = por_vlc.join(por_emoji, how="outer").fillna(0).astype(int)
+        partes.append(_celulas(cnt, tamanho))
+    if not partes:
+        return gpd.GeoDataFrame(columns=["tamanho_hex", "q", "r", "geometry"], crs=EPSG_LATLON)
+    hexes = pd.concat(partes, ignore_index=True)
+    cods = sorted(c for c in hexes.columns if not isinstance(c, str))
+    hexes[cods] = hexes[cods].fillna(0).astype(int)
+    hexes.columns.name = None
+    return hexes.to_crs(EPSG_LATLON)
+
+
+def somar_hex(hexes, delta) -> gpd.GeoDataFrame:
+    """Soma as contagens de ``delta`` (saída de :func:`agregar_hex`) em ``hexes``."""
+    chave = ["tamanho_hex", "q", "r"]
+    cods = [c for c in set(hexes.columns) | set(delta.columns) if not isinstance(c, str)]
+    contagens = VALENCIAS + cods
+    tab = pd.concat([pd.DataFrame(hexes.drop(columns="geometry")),
+                     pd.DataFrame(delta.drop(columns="geometry"))], ignore_index=True)
+    soma = tab.groupby(chave)[contagens].sum().fillna(0).astype(int)
+    partes = [_celulas(g.droplevel(0), t) for t, g in soma.groupby(level=0)]
+    out = pd.concat(partes, ignore_index=True).to_crs(EPSG_LATLON)
+    return out[[c for c in hexes.columns if c in out] + [c for c in out if c not in hexes]]
+
+
+def tamanho_por_zoom(zoom, tamanhos=TAMANHOS, ref_zoom=13, ref_tamanho=200):
+    """Resolução com ~40 px de largura no zoom do Leaflet (200 m em z13)."""
+    alvo = ref_tamanho * 2 ** (ref_zoom - zoom)
+    return min(tamanhos, key=lambda t: abs(np.log2(t / alvo)))
@@ -0,0 +1,96 @@
+# ingestao.py
+"""
+Leitura das camadas de ``dados/`` com preferência por (Geo)Parquet.
+
+Converter a pasta (na raiz do repositório):
+
+    python -m ingestao [--pasta dados]
+
+Cada ``*.geojson`` / ``*.csv`` vira ``dados/parquet/<nome>.<ext>.parquet``
+já em EPSG:4326; a extensão fica no nome porque ``emoji_emoc.csv`` e
+``emoji_emoc.geojson`` são camadas diferentes.  ``ler_camada`` usa o
+Parquet quando ele existe e não é mais antigo que o arquivo de origem;
+senão cai no GeoJSON/CSV.
+"""
+import argparse
+import glob
+import os
+
+import geopandas as gpd
+import pandas as pd
+import pyarrow.parquet as pq
+
+from rastreio import etapa
+
+EPSG_LATLON = 4326
+SUBPASTA = "parquet"
+
+
+def caminho_parquet(origem: str) -> str:
+    pasta, nome = os.path.split(origem)
+    return os.path.join(pasta, SUBPASTA, nome + ".parquet")
+
+
+def ler_geoparquet(caminho: str, coluna="geometry", crs=EPSG_LATLON):
+    """
+    Lê Parquet pelo pyarrow e decodifica a geometria WKB com CRS conhecido,
+    sem reinterpretar o PROJJSON gravado no arquivo (caro por arquivo).
+    """
+    df = pq.read_table(caminho).to_pandas()
+    if coluna is None or coluna not in df:
+        return df
+    df[coluna] = gpd.GeoSeries.from_wkb(df[coluna], index=df.index, crs=crs)
+    return gpd.GeoDataFrame(df, geometry=coluna)
+
+
+def _ler_origem(caminho: str):
+    if caminho.endswith(".csv"):
+        return pd.read_csv(caminho)
+    g = gpd.read_file(caminho)
+    if not g.crs or g.crs.to_epsg() != EPSG_LATLON:
+        g = g.to_crs(EPSG_LATLON)
+    return g
+
+
+def ler_camada(caminho: str):
+    """GeoDataFrame/DataFrame de ``caminho``, via Parquet se disponível."""
+    pq_path = caminho_parquet(caminho)
+    with etapa(f"ler_camada {os.path.basename(caminho)}") as e:
+        if os.path.exists(pq_path) and (
+                not os.path.exists(caminho) or os.path.getmtime(pq_path) >= os.path.getmtime(caminho)):
+            out = ler_geoparquet(pq_path)
+        else:
+            out = _ler_origem(caminho)
+        e.linhas = len(out)
+    return out
+
+
+def converter_pasta(pasta="dados") -> list:
+    """Converte todos os GeoJSON/CSV de ``pasta`` para Parquet (EPSG:4326)."""
+    os.makedirs(os.path.join(pasta, SUBPASTA), exist_ok=True)
+    gerados = []
+    for origem in sorted(glob.glob(os.path.join(pasta, "*.geojson")) +
+                         glob.glob(os.path.join(pasta, "*.csv"))):
+        df = _ler_origem(origem)
+        destino = caminho_parquet(origem)
+        df.to_parquet(destino)
+        gerados.append(destino)
+        # nome usado antes (<nome>.parquet, sem a extensão): .csv e .geojson
+        # de mesmo nome se sobrescreviam, então a cópia antiga não vale
+        antigo = os.path.join(pasta, SUBPASTA, os.path.splitext(os.path.basename(origem))[0]
+                              + ".parquet")
+        if os.path.exists(antigo):
+            os.remove(antigo)
+    return gerados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte dados/ para GeoParquet.")
+    parser.add_argument("--pasta", default="dados")
+    args = parser.parse_args()
+    for p in converter_pasta(args.pasta):
+        print(p)
+
+
+if __name__ == "__main__":
+    main()
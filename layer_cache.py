@@ -0,0 +1,203 @@
+# layer_cache.py
+import hashlib
+import json
+import os
+import shutil
+
+import geopandas as gpd
+import pandas as pd
+
+import build_layers as bl
+import emoc_index
+import esquema
+import hexbin
+import snapping
+from emoc_index import indice_emocoes
+from esquema import compactar
+from ingestao import ler_geoparquet
+from rastreio import rastrear
+from snapping import SnapRuas
+
+# ---------------------------------------------------------------------------------
+# Cache em disco (GeoParquet / Parquet) das camadas derivadas de build_layers.
+# A chave é o hash do conteúdo dos arquivos de entrada + do código que
+# molda as camadas (``CODIGO``); com a chave inalterada nenhum passo
+# espacial é refeito.
+# Se só os pontos coletados ganharam linhas novas, o cache anterior é
+# atualizado incrementalmente (build_layers.atualizar_layers).
+# ---------------------------------------------------------------------------------
+
+CACHE_DIR = "dados/.cache"
+MANIFESTO = "manifesto.json"
+FONTES = "fontes.json"
+
+# módulos cujo código define o conteúdo do cache (passos, tamanhos dos
+# hexágonos, esquema de tipos, formato em disco): mudou um, muda a chave
+CODIGO = {f"__{m.__name__}__": m.__file__
+          for m in (bl, emoc_index, esquema, hexbin, snapping)}
+CODIGO["__layer_cache__"] = __file__
+
+# camadas que não são tabelas – reconstruídas a partir das demais ao ler
+DERIVADAS = {
+    "emoc_indice": lambda gdfs: indice_emocoes(gdfs["emoc_fato"]),
+    "snap_ruas": lambda gdfs: SnapRuas(gdfs["ruas_cenarios"], max_distance=bl.DIST_SNAP),
+}
+
+
+def _hash_arquivo(caminho) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def hashes_fontes(fontes) -> dict:
+    """
+    ``{chave: sha256}`` de cada arquivo de entrada + de cada módulo de ``CODIGO``.
+    ``fontes`` é ``{chave_raw: caminho}`` ou uma lista de caminhos.
+    """
+    if not isinstance(fontes, dict):
+        fontes = {os.path.basename(p): p for p in fontes}
+    hashes = {k: _hash_arquivo(p) for k, p in fontes.items()}
+    hashes.update({k: _hash_arquivo(p) for k, p in CODIGO.items()})
+    return hashes
+
+
+def hash_arquivos(fontes) -> str:
+    """Chave do cache: hash combinado (ordem estável) de :func:`hashes_fontes`."""
+    hashes = fontes if isinstance(fontes, dict) and "__build_layers__" in fontes \
+        else hashes_fontes(fontes)
+    h = hashlib.sha256(json.dumps(hashes, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+def _json_col(c):
+    # nomes de coluna numéricos (ex.: cod_emoji no pivot) voltam ao tipo original
+    return c.item() if hasattr(c, "item") else c
+
+
+@rastrear()
+def salvar(gdfs: dict, pasta: str, hashes=None):
+    """Grava cada camada em ``pasta/<nome>.parquet`` + manifesto."""
+    tmp = pasta + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    manifesto = {}
+    for nome, df in gdfs.items():
+        if nome in DERIVADAS:
+            continue
+        colunas = [_json_col(c) for c in df.columns]
+        nome_colunas = df.columns.name
+        df = df.copy()
+        df.columns = [str(c) for c in df.columns]
+        meta = {"colunas": colunas, "nome_colunas": nome_colunas, "geo": None}
+        if isinstance(df, gpd.GeoDataFrame):
+            crs = df.crs.to_epsg() or df.crs.to_wkt() if df.crs else None
+            meta["geo"] = {"coluna": df.geometry.name, "crs": crs}
+        df.to_parquet(os.path.join(tmp, f"{nome}.parquet"))
+        manifesto[nome] = meta
+    with open(os.path.join(tmp, MANIFESTO), "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False)
+    if hashes is not None:
+        with open(os.path.join(tmp, FONTES), "w", encoding="utf-8") as f:
+            json.dump(hashes, f)
+    # troca atômica: leitores nunca veem um cache pela metade
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.replace(tmp, pasta)
+
+
+@rastrear()
+def carregar(pasta: str) -> dict:
+    """Lê as camadas gravadas por :func:`salvar`."""
+    with open(os.path.join(pasta, MANIFESTO), encoding="utf-8") as f:
+        manifesto = json.load(f)
+    gdfs = {}
+    for nome, meta in manifesto.items():
+        p = os.path.join(pasta, f"{nome}.parquet")
+        geo = meta["geo"] or {"coluna": None, "crs": None}
+        df = ler_geoparquet(p, geo["coluna"], geo["crs"])
+        df.columns = pd.Index(meta["colunas"], name=meta["nome_colunas"])
+        # o Parquet guarda só as categorias presentes: reimpõe o esquema
+        gdfs[nome] = compactar(df, nome)
+    for nome, func in DERIVADAS.items():
+        gdfs[nome] = func(gdfs)
+    return gdfs
+
+
+def _limpar(cache_dir, manter):
+    """Remove caches de versões anteriores das entradas."""
+    for nome in os.listdir(cache_dir):
+        p = os.path.join(cache_dir, nome)
+        if os.path.abspath(p) == os.path.abspath(manter):
+            continue
+        # só pastas de camadas; outros caches (ex.: ch/) ficam
+        if os.path.exists(os.path.join(p, MANIFESTO)) or p.endswith(".tmp"):
+            shutil.rmtree(p, ignore_errors=True)
+
+
+def _anterior(cache_dir):
+    """(pasta, hashes) do cache existente mais recente, se houver."""
+    if not os.path.isdir(cache_dir):
+        return None, None
+    pastas = [os.path.join(cache_dir, n) for n in os.listdir(cache_dir)]
+    pastas = [p for p in pastas if os.path.exists(os.path.join(p, FONTES))]
+    if not pastas:
+        return None, None
+    pasta = max(pastas, key=os.path.getmtime)
+    with open(os.path.join(pasta, FONTES), encoding="utf-8") as f:
+        return pasta, json.load(f)
+
+
+def _so_acrescimos(fato, emoc) -> bool:
+    """True se ``emoc`` só acrescenta fids aos pontos já presentes em ``fato``."""
+    if not fato["fid"].isin(emoc["fid"]).all():
+        return False
+    novo = emoc.set_index("fid").loc[fato["fid"]]
+    velho = fato.set_index("fid")[novo.columns]
+    geom = novo.geometry.name
+    if not (novo[geom].to_wkb() == velho[geom].to_wkb()).all():
+        return False
+    # categorias diferem entre as duas leituras (participantes novos…):
+    # compara os valores, não os códigos
+    a = novo.drop(columns=geom).astype(object)
+    b = velho.drop(columns=geom).astype(object)
+    return bool(((a == b) | (a.isna() & b.isna())).all().all())
+
+
+@rastrear()
+def build_layers_cache(raw: dict, fontes, cache_dir=CACHE_DIR) -> dict:
+    """
+    ``build_layers(raw)`` com cache em disco.  ``fontes`` são os caminhos
+    dos arquivos que originaram ``raw`` (``{chave_raw: caminho}`` ou lista);
+    se o hash deles já tem cache, as camadas são lidas do Parquet, senão
+    são recalculadas e gravadas.
+
+    Quando a única entrada alterada é ``emoc`` e ela apenas acrescenta
+    pontos, o cache anterior é atualizado por ``atualizar_layers``
+    (O(novos pontos)) em vez de reconstruído.
+    """
+    hashes = hashes_fontes(fontes)
+    pasta = os.path.join(cache_dir, hash_arquivos(hashes))
+    if os.path.exists(os.path.join(pasta, MANIFESTO)):
+        return carregar(pasta)
+
+    gdfs = None
+    ant, ant_hashes = _anterior(cache_dir)
+    if ant_hashes is not None and "emoc" in hashes:
+        difere = {k for k in hashes.keys() | ant_hashes.keys()
+                  if hashes.get(k) != ant_hashes.get(k)}
+        if difere == {"emoc"}:
+            velho = carregar(ant)
+            if _so_acrescimos(velho["emoc_fato"], raw["emoc"]):
+                gdfs = bl.atualizar_layers(velho, raw)
+    if gdfs is None:
+        gdfs = bl.build_layers(raw)
+
+    try:
+        salvar(gdfs, pasta, hashes)
+        _limpar(cache_dir, manter=pasta)
+    except OSError:
+        # sem permissão de escrita: segue sem cache
+        pass
+    return gdfs
@@ -1,7 +1,15 @@
 import folium
 from folium import plugins
+from folium.elements import JSCSSMixin
+from folium.template import Template
 import matplotlib
 import branca
+import numpy as np
+
+from emoc_index import filtrar, filtros_ativos
+from hexbin import TAMANHOS, VALENCIAS, agregar_hex, tamanho_por_zoom
+from rastreio import etapa, rastrear
+from sprites import atlas, css_atlas
 
 # ---------------------------------------------------------------------------------
 # Funções de visualização para o aplicativo “Mapas Emocionais”.
@@ -9,28 +17,37 @@ import branca
 # ---------------------------------------------------------------------------------
 
 DEFAULT_ICON_REPO = "dados/Lista_Final_Emojis/"
+ZOOM_MARCADORES = 14     # abaixo deste zoom os pontos viram hexágonos agregados
+CORES_VALENCIA = {"Neutro": "#f6dd1e", "Negativo": "#d7191c", "Positivo": "#1a9641"}
 
 # ---------------------------------------------------------------------------------
 # Cenários – camada de fundo colorida + legenda
 # ---------------------------------------------------------------------------------
 
-def add_cenarios(data, mapa):
-    """Adiciona polígono/linha dos cenários com cores únicas + legenda."""
+def base_estatica(data):
+    """
+    Partes fixas do mapa base, calculadas uma vez e reaproveitadas a cada
+    rerun: centro (média das coordenadas, sem unary_union), GeoJSON dos
+    cenários já com a cor em ``properties`` e o HTML da legenda.
+    """
+    base = {"centro": None, "cenarios": None, "legenda": None}
+
+    emoc = data.get("emoc")
+    if emoc is not None and not emoc.empty:
+        geom = emoc.geometry[~emoc.geometry.is_empty & emoc.geometry.notna()]
+        base["centro"] = [float(geom.y.mean()), float(geom.x.mean())]
+
     if "cenarios" not in data or data["cenarios"].empty:
-        return
+        return base
 
     refs = data["cenarios"].referencia.dropna().unique()
-    cmap = matplotlib.cm.get_cmap("tab10", len(refs))
+    cmap = matplotlib.colormaps["tab10"].resampled(len(refs))
     colordict = {r: matplotlib.colors.rgb2hex(cmap(i)) for i, r in enumerate(refs)}
 
-    def style(f):
-        ref = f["properties"].get("referencia")
-        return {"color": colordict.get(ref, "#666"), "weight": 2, "opacity": 0.7}
-
-    folium.GeoJson(
-        data["cenarios"].__geo_interface__, name="Cenários", style_function=style,
-        tooltip=folium.GeoJsonTooltip(fields=["referencia"]),
-    ).add_to(mapa)
+    gj = data["cenarios"].__geo_interface__
+    for f in gj["features"]:
+        f["properties"]["cor"] = colordict.get(f["properties"].get("referencia"), "#666")
+    base["cenarios"] = gj
 
     # --- legenda ---
     html = """<div style='position: fixed; bottom: 30px; left: 30px; z-index: 9999; \
@@ -40,16 +57,39 @@ def add_cenarios(data, mapa):
         html += f"<i style='background:{col};width:12px;height:12px;display:inline-block;\
                    margin-right:4px;'></i>{ref}<br>"
     html += "</div>"
-    mapa.get_root().html.add_child(branca.element.Element(html))
+    base["legenda"] = html
+    return base
+
+
+def _base(data):
+    return data["base_mapa"] if "base_mapa" in data else base_estatica(data)
+
+
+def _style_cenario(f):
+    return {"color": f["properties"]["cor"], "weight": 2, "opacity": 0.7}
+
+
+def add_cenarios(data, mapa):
+    """Adiciona polígono/linha dos cenários com cores únicas + legenda."""
+    base = _base(data)
+    if base["cenarios"] is None:
+        return
+
+    folium.GeoJson(
+        base["cenarios"], name="Cenários", style_function=_style_cenario,
+        tooltip=folium.GeoJsonTooltip(fields=["referencia"]),
+    ).add_to(mapa)
+    mapa.get_root().html.add_child(branca.element.Element(base["legenda"]))
 
 # ---------------------------------------------------------------------------------
 # Mapa base
 # ---------------------------------------------------------------------------------
 
+@rastrear()
 def make_base_map(data, tiles="CartoDB positron", include_cenarios=True):
-    if not data["emoc"].empty:
-        c = data["emoc"].geometry.unary_union.centroid
-        m = folium.Map([c.y, c.x], zoom_start=14, tiles=tiles)
+    centro = _base(data)["centro"]
+    if centro is not None:
+        m = folium.Map(centro, zoom_start=14, tiles=tiles)
     else:
         m = folium.Map([0, 0], zoom_start=2, tiles=tiles)
 
@@ -62,86 +102,439 @@ def make_base_map(data, tiles="CartoDB positron", include_cenarios=True):
 # Funções de pontos (emoções)
 # ---------------------------------------------------------------------------------
 
-def _add_points(gdf, name, mapa, icon_repo=DEFAULT_ICON_REPO, tooltip_col=None):
-    layer = folium.FeatureGroup(name=name)
-    heat = []
-    for _, r in gdf.iterrows():
-        y, x = r.geometry.y, r.geometry.x
-        icon = folium.features.CustomIcon(f"{icon_repo}{int(r.cod_emoji)}.png", icon_size=(20, 20))
-        folium.Marker([y, x], icon=icon, tooltip=r[tooltip_col] if tooltip_col else None).add_to(layer)
-        heat.append([y, x])
-    layer.add_to(mapa)
+class AtlasEmoji:
+    """Mixin: põe o CSS do atlas de emojis (sprites.py) no ``<head>`` uma vez por mapa."""
+
+    def render(self, **kwargs):
+        if self.atlas is not None:
+            self.get_root().header.add_child(css_atlas(self.atlas), name="emoji_sprite")
+        super().render(**kwargs)
+
+
+class EmojiMarkers(AtlasEmoji, folium.map.Layer):
+    """Camada de marcadores emoji renderizada no navegador a partir de vetores.
+
+    Em vez de um ``folium.Marker`` + ``CustomIcon`` por ponto, envia uma única
+    lista ``[lat, lon, cod_emoji, tooltip]``; o ícone é um ``L.divIcon`` com a
+    classe do emoji no atlas, compartilhado por todos os pontos do mesmo emoji.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var data = {{ this.data|tojson }};
+                var cache = {};
+                var layer = L.featureGroup({{ this.options|tojavascript }});
+                for (var i = 0; i < data.length; i++) {
+                    var row = data[i];
+                    var cod = row[2];
+                    if (!(cod in cache)) {
+                        cache[cod] = L.divIcon({
+                            className: "emoji-sprite emoji-" + cod,
+                            iconSize: {{ this.icon_size|tojson }}
+                        });
+                    }
+                    var marker = L.marker([row[0], row[1]], {icon: cache[cod]});
+                    if (row[3] !== null) {
+                        marker.bindTooltip(String(row[3]), {sticky: true});
+                    }
+                    marker.addTo(layer);
+                }
+                layer.addTo({{ this._parent.get_name() }});
+                return layer;
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, data, atlas, icon_size=(20, 20), name=None,
+                 overlay=True, control=True, show=True):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = "EmojiMarkers"
+        self.data = data
+        self.atlas = atlas
+        self.icon_size = list(icon_size)
+        self.options = {}
+
+
+class TilesVetoriais(AtlasEmoji, JSCSSMixin, folium.map.Layer):
+    """Camada MVT (Leaflet.VectorGrid) filtrada por atributo no navegador.
+
+    ``filtros`` é ``{coluna: [valores]}``: a feição só é desenhada se cada
+    coluna tiver um dos valores.  Com ``atlas`` (sprites.py) os pontos viram
+    o emoji ``cod_emoji`` do atlas; senão as linhas são coloridas por
+    ``cores[props[campo_cor]]``.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var filtros = {{ this.filtros|tojson }};
+                var icones = {{ (this.atlas is not none)|tojson }};
+                var cores = {{ this.cores|tojson }};
+                var dica = {{ this.tooltip|tojson }};
+                var cache = {};
+                function passa(p) {
+                    for (var c in filtros) {
+                        if (filtros[c].indexOf(p[c]) < 0) { return false; }
+                    }
+                    return true;
+                }
+                var estilos = {};
+                estilos[{{ this.camada|tojson }}] = function(p, z) {
+                    if (!passa(p)) { return []; }
+                    if (icones) {
+                        var cod = p.cod_emoji;
+                        if (!(cod in cache)) {
+                            cache[cod] = L.divIcon({
+                                className: "emoji-sprite emoji-" + cod,
+                                iconSize: {{ this.icon_size|tojson }}
+                            });
+                        }
+                        return {icon: cache[cod]};
+                    }
+                    return {color: cores[p[{{ this.campo_cor|tojson }}]] || "#1a9641",
+                            weight: 5, opacity: 0.9};
+                };
+                var layer = L.vectorGrid.protobuf({{ this.url|tojson }}, {
+                    vectorTileLayerStyles: estilos,
+                    minNativeZoom: {{ this.zmin }},
+                    maxNativeZoom: {{ this.zmax }},
+                    interactive: dica !== null
+                });
+                if (dica !== null) {
+                    var tip = L.tooltip({sticky: true});
+                    layer.on("mouseover", function(e) {
+                        var v = e.layer.properties[dica];
+                        if (v === undefined) { return; }
+                        tip.setLatLng(e.latlng).setContent(String(v));
+                        {{ this._parent.get_name() }}.openTooltip(tip);
+                    });
+                    layer.on("mouseout", function() {
+                        {{ this._parent.get_name() }}.closeTooltip(tip);
+                    });
+                }
+                layer.addTo({{ this._parent.get_name() }});
+                return layer;
+            })();
+        {% endmacro %}
+        """
+    )
+
+    default_js = [
+        ("vectorGrid",
+         "https://unpkg.com/leaflet.vectorgrid@1.3.0/dist/Leaflet.VectorGrid.bundled.js"),
+    ]
+
+    def __init__(self, url, camada, filtros=None, atlas=None, cores=None, campo_cor=None,
+                 tooltip=None, zmin=0, zmax=18, icon_size=(20, 20), name=None,
+                 overlay=True, control=True, show=True):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = "TilesVetoriais"
+        self.url = url
+        self.camada = camada
+        self.filtros = filtros or {}
+        self.atlas = atlas
+        self.cores = cores or {}
+        self.campo_cor = campo_cor
+        self.tooltip = tooltip
+        self.zmin, self.zmax = zmin, zmax
+        self.icon_size = list(icon_size)
+
+
+class ClustersEmoji(AtlasEmoji, folium.map.Layer):
+    """Grupos de pontos de um nível de zoom: ícone do emoji dominante + contagem.
+
+    ``data`` é ``[lat, lon, cod_emoji, n, tooltip]``; grupos com ``n == 1``
+    aparecem como o marcador comum do ponto.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var atlas = {{ this.geometria|tojson }};
+                var data = {{ this.data|tojson }};
+                var cache = {};
+                var layer = L.featureGroup();
+                function icone(cod, n) {
+                    var chave = cod + "_" + n;
+                    if (chave in cache) { return cache[chave]; }
+                    if (n === 1) {
+                        cache[chave] = L.divIcon({className: "emoji-sprite emoji-" + cod,
+                                                  iconSize: [atlas.lado, atlas.lado]});
+                    } else {
+                        var lado = Math.round(24 + 8 * Math.log10(n));
+                        var k = lado / atlas.lado;
+                        cache[chave] = L.divIcon({
+                            className: "",
+                            iconSize: [lado, lado],
+                            html: '<div class="emoji-sprite" style="position:relative;width:' + lado +
+                                  'px;height:' + lado + 'px;background-size:' + atlas.largura * k + 'px ' +
+                                  lado + 'px;background-position:-' + atlas.posicoes[cod] * k + 'px 0">' +
+                                  '<span style="position:absolute;right:-6px;bottom:-4px;background:#333;' +
+                                  'color:#fff;border-radius:8px;padding:0 4px;font:bold 10px sans-serif">' +
+                                  n + '</span></div>'
+                        });
+                    }
+                    return cache[chave];
+                }
+                for (var i = 0; i < data.length; i++) {
+                    var row = data[i];
+                    var marker = L.marker([row[0], row[1]], {icon: icone(row[2], row[3])});
+                    if (row[4] !== null) {
+                        marker.bindTooltip(String(row[4]), {sticky: true});
+                    }
+                    marker.addTo(layer);
+                }
+                layer.addTo({{ this._parent.get_name() }});
+                return layer;
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, data, atlas, name=None, overlay=True, control=True, show=True):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = "ClustersEmoji"
+        self.data = data
+        self.atlas = atlas
+        # só o necessário para redimensionar o sprite (a URL já está no CSS)
+        self.geometria = {"lado": atlas["lado"], "largura": atlas["largura"],
+                          "posicoes": atlas["posicoes"]}
+
+
+def _marker_arrays(gdf, tooltip_col=None):
+    """Extrai (lat, lon, cod_emoji, tooltip) de forma vetorizada."""
+    gdf = gdf[gdf["cod_emoji"].notna() & gdf.geometry.notna() & ~gdf.geometry.is_empty]
+    ys = gdf.geometry.y.to_numpy()
+    xs = gdf.geometry.x.to_numpy()
+    cods = gdf["cod_emoji"].to_numpy(dtype=int)
+    if tooltip_col:
+        tips = gdf[tooltip_col].astype(object).where(gdf[tooltip_col].notna(), None).to_numpy()
+    else:
+        tips = np.full(len(gdf), None, dtype=object)
+    return ys, xs, cods, tips
+
+
+def _add_points(gdf, name, mapa, icon_repo=DEFAULT_ICON_REPO, tooltip_col=None, calor=True):
+    ys, xs, cods, tips = _marker_arrays(gdf, tooltip_col)
+    rows = list(zip(ys.tolist(), xs.tolist(), cods.tolist(), tips.tolist()))
+    camada = EmojiMarkers(rows, atlas(icon_repo), icon_size=(20, 20), name=name).add_to(mapa)
+    if calor:
+        _add_heat(ys, xs, name, mapa)
+    return camada
+
+
+def _add_heat(ys, xs, name, mapa):
+    heat = np.column_stack([ys, xs]).tolist()
     plugins.HeatMap(heat, name=f"Heat {name}", radius=20, blur=15).add_to(mapa)
 
 
+def _pontos(data, sel, filtros, name, mapa, icon_repo=DEFAULT_ICON_REPO, tooltip_col=None):
+    """
+    Desenha ``sel``: via tiles vetoriais quando ``data['tiles']`` existe (o
+    navegador aplica ``filtros`` aos tiles da vista), senão com EmojiMarkers.
+    O mapa de calor vem da grade KDE de ``data['densidade']`` quando houver.
+    """
+    tiles = data.get("tiles") or {}
+    with etapa("marcadores", len(sel)):
+        if "pontos" in tiles:
+            marcadores = TilesVetoriais(
+                tiles["pontos"], "pontos", filtros_ativos(**filtros), atlas=tiles["atlas"],
+                tooltip=tooltip_col, zmin=tiles["zmin"], zmax=tiles["zmax"], name=name).add_to(mapa)
+        else:
+            marcadores = _add_points(sel, name, mapa, icon_repo, tooltip_col,
+                                     calor="densidade" not in data)
+    with etapa("clusters") as e:
+        grupos = _clusters(data, filtros, name, mapa, icon_repo, tooltip_col)
+        e.linhas = sum(len(c.data) for c, _, _ in grupos)
+    soltos = max((zmax for _, _, zmax in grupos), default=ZOOM_MARCADORES - 1) + 1
+    with etapa("hexagonos") as e:
+        hexes = _hexagonos(data, sel, filtros, name, mapa)
+        e.linhas = len(hexes)
+    TrocaPorZoom([(marcadores, soltos, 30)] + grupos + hexes).add_to(mapa)
+
+    with etapa("calor"):
+        if "densidade" in data:
+            data["densidade"].camada(filtros, name=f"Heat {name}").add_to(mapa)
+        elif "pontos" in tiles:
+            ys, xs, _, _ = _marker_arrays(sel)
+            _add_heat(ys, xs, name, mapa)
+
+
+# ---------------------------------------------------------------------------------
+# Hexágonos agregados (zoom baixo) ⇄ marcadores (zoom alto)
+# ---------------------------------------------------------------------------------
+
+class TrocaPorZoom(branca.element.MacroElement):
+    """Mostra cada camada só na sua faixa de zoom ``[zmin, zmax]``."""
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            (function(){
+                var mapa = {{ this._parent.get_name() }};
+                var faixas = [
+                    {% for camada, zmin, zmax in this.faixas %}
+                    [{{ camada.get_name() }}, {{ zmin }}, {{ zmax }}],
+                    {% endfor %}
+                ];
+                function atualizar() {
+                    var z = mapa.getZoom();
+                    faixas.forEach(function(f) {
+                        var ligar = z >= f[1] && z <= f[2];
+                        if (ligar && !mapa.hasLayer(f[0])) { mapa.addLayer(f[0]); }
+                        if (!ligar && mapa.hasLayer(f[0])) { mapa.removeLayer(f[0]); }
+                    });
+                }
+                mapa.on("zoomend", atualizar);
+                atualizar();
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, faixas):
+        super().__init__()
+        self._name = "TrocaPorZoom"
+        self.faixas = faixas
+
+
+def _clusters(data, filtros, name, mapa, icon_repo=DEFAULT_ICON_REPO, tooltip_col=None):
+    """
+    Uma camada ClustersEmoji por zoom da hierarquia ``data['emoc_cluster']``
+    (clusters.py), mascarada pelos filtros; ``[]`` se não houver hierarquia.
+    """
+    hier = data.get("emoc_cluster")
+    if hier is None:
+        return []
+    tiles = data.get("tiles") or {}
+    sprite = tiles.get("atlas") or atlas(icon_repo)
+    fato = data["emoc_fato"]
+    out = []
+    for z in range(hier.zmin, hier.zmax + 1):
+        g = hier.grupos(z, **filtros)
+        if not len(g["n"]):
+            continue
+        if tooltip_col:
+            dica = fato[tooltip_col].astype(object).to_numpy()[g["primeiro"]]
+        else:
+            dica = np.full(len(g["n"]), None, dtype=object)
+        dica = np.where(g["n"] > 1, [f"{n} pontos" for n in g["n"]], dica)
+        rows = list(zip(g["lat"].round(6).tolist(), g["lon"].round(6).tolist(),
+                        g["cod"].tolist(), g["n"].tolist(),
+                        [None if d is None or d != d else d for d in dica.tolist()]))
+        camada = ClustersEmoji(rows, sprite, name=f"{name} (z{z})").add_to(mapa)
+        out.append((camada, z, z))
+    return out
+
+
+def _faixas_hex(zoom_max=ZOOM_MARCADORES - 1, tamanhos=TAMANHOS):
+    """``{tamanho: (zmin, zmax)}`` – resolução usada em cada zoom abaixo dos marcadores."""
+    faixas = {}
+    for z in range(0, zoom_max + 1):
+        t = tamanho_por_zoom(z, tamanhos)
+        zmin, _ = faixas.get(t, (z, z))
+        faixas[t] = (zmin, z)
+    return faixas
+
+
+def _hexagonos(data, sel, filtros, name, mapa):
+    """
+    Uma camada GeoJSON por resolução necessária; usa ``data['emoc_hex']``
+    (build_layers) sem filtros e agrega ``sel`` na hora quando filtrado.
+    """
+    faixas = _faixas_hex()
+    if not filtros_ativos(**filtros) and "emoc_hex" in data:
+        hexes = data["emoc_hex"]
+    else:
+        hexes = agregar_hex(sel, tamanhos=list(faixas))
+    if hexes.empty:
+        return []
+    out = []
+    for tamanho, (zmin, zmax) in faixas.items():
+        h = hexes[hexes["tamanho_hex"] == tamanho]
+        if h.empty:
+            continue
+        h = h[["geometry", "total", "vlc_maior_text"] + VALENCIAS].copy()
+        h["opac"] = (0.25 + 0.5 * np.sqrt(h["total"] / h["total"].max())).round(2)
+        camada = folium.GeoJson(
+            h.__geo_interface__, name=f"{name} (hex {tamanho} m)",
+            style_function=_style_hex,
+            tooltip=folium.GeoJsonTooltip(fields=["total"] + VALENCIAS,
+                                          aliases=["Total"] + VALENCIAS),
+        ).add_to(mapa)
+        out.append((camada, zmin, zmax))
+    return out
+
+
+def _style_hex(f):
+    p = f["properties"]
+    return {"fillColor": CORES_VALENCIA.get(p["vlc_maior_text"], "#999"), "fillOpacity": p["opac"],
+            "color": "#555", "weight": 0.5}
+
+
+@rastrear()
 def emoc_indiv(data, emocao, mapa, icon_repo=DEFAULT_ICON_REPO):
-    pts = data["emoc"].merge(data["emoji"][["cod_emoji", "emocao"]], on="cod_emoji")
-    sel = pts[pts["emocao"] == emocao]
+    filtros = dict(emocao=emocao)
+    sel = filtrar(data, **filtros)
     if sel.empty:
         return
-    _add_points(sel, f"Emoção: {emocao}", mapa, icon_repo)
+    _pontos(data, sel, filtros, f"Emoção: {emocao}", mapa, icon_repo)
 
 
+@rastrear()
 def emoc_modal(data, modal, valencias, mapa, icon_repo=DEFAULT_ICON_REPO):
-    pts = (
-        data["emoc"].merge(data["emoji"][["cod_emoji", "valencia"]], on="cod_emoji")
-                      .merge(data["modais"], on="cod_modal")
-    )
-    if modal:
-        pts = pts[pts["nome"] == modal]
-    if valencias:
-        pts = pts[pts["valencia"].isin(valencias)]
+    filtros = dict(nome=modal or None, valencia=valencias or None)
+    pts = filtrar(data, **filtros)
     if pts.empty:
         return
     titulo = f"{modal or 'Todos'} – {', '.join(valencias) if valencias else 'todas'}"
-    _add_points(pts, titulo, mapa, icon_repo, tooltip_col="valencia")
+    _pontos(data, pts, filtros, titulo, mapa, icon_repo, tooltip_col="valencia")
 
 
+@rastrear()
 def emoc_cenario(data, cenario, mapa, icon_repo=DEFAULT_ICON_REPO):
-    pts = (
-        data["emoc"].merge(data["cenarios"][["cod_cenario", "referencia"]], on="cod_cenario")
-                      .merge(data["emoji"][["cod_emoji", "valencia"]], on="cod_emoji")
-    )
-    sel = pts[pts["referencia"] == cenario]
+    filtros = dict(referencia=cenario)
+    sel = filtrar(data, **filtros)
     if sel.empty:
         return
-    _add_points(sel, f"Cenário {cenario}", mapa, icon_repo, tooltip_col="valencia")
+    _pontos(data, sel, filtros, f"Cenário {cenario}", mapa, icon_repo, tooltip_col="valencia")
 
     # Pontos de referência
     if "pts_cenarios" in data:
-        ref = data["pts_cenarios"].merge(
-            data["cenarios"][["cod_cenario", "referencia"]], on="cod_cenario")
-        ref = ref[ref["referencia"] == cenario]
+        cods = data["cenarios"].loc[data["cenarios"]["referencia"] == cenario, "cod_cenario"]
+        ref = data["pts_cenarios"][data["pts_cenarios"]["cod_cenario"].isin(cods)]
         for _, r in ref.iterrows():
             folium.Marker([r.geometry.y, r.geometry.x], icon=folium.Icon(color="gray", icon="ok"),
                           popup=r.get("pt_referencia", "")).add_to(mapa)
 
 
+@rastrear()
 def emoc_faixa(data, faixa, valencias, mapa, icon_repo=DEFAULT_ICON_REPO):
-    pts = (data["emoc"].merge(data["participantes"], on="cod_part")
-                       .merge(data["emoji"], on="cod_emoji"))
-    pts = pts[pts["faixa_etaria"] == faixa]
-    if valencias:
-        pts = pts[pts["valencia"].isin(valencias)]
+    filtros = dict(faixa_etaria=faixa, valencia=valencias or None)
+    pts = filtrar(data, **filtros)
     if pts.empty:
         return
-    _add_points(pts, f"Faixa {faixa}", mapa, icon_repo, tooltip_col="valencia")
+    _pontos(data, pts, filtros, f"Faixa {faixa}", mapa, icon_repo, tooltip_col="valencia")
 
 
+@rastrear()
 def emoc_genero(data, genero, valencias, mapa, icon_repo=DEFAULT_ICON_REPO):
-    pts = (data["emoc"].merge(data["participantes"], on="cod_part")
-                       .merge(data["emoji"], on="cod_emoji"))
-    pts = pts[pts["genero"] == genero]
-    if valencias:
-        pts = pts[pts["valencia"].isin(valencias)]
+    filtros = dict(genero=genero, valencia=valencias or None)
+    pts = filtrar(data, **filtros)
     if pts.empty:
         return
-    _add_points(pts, f"Gênero {genero}", mapa, icon_repo, tooltip_col="valencia")
+    _pontos(data, pts, filtros, f"Gênero {genero}", mapa, icon_repo, tooltip_col="valencia")
 
 # ------------------------------------------------------------------
 # Linhas – valência dominante nas vias
 # ------------------------------------------------------------------
 
+@rastrear()
 def vias_valencia(data, valencias, mapa):
     if "emoc_ways_vlc_rua" not in data:
         return
@@ -150,8 +543,47 @@ def vias_valencia(data, valencias, mapa):
     if sel.empty:
         return
 
+    tiles = data.get("tiles") or {}
+    if "vias" in tiles:
+        TilesVetoriais(tiles["vias"], "vias", {"vlc_maior_text": list(valencias)},
+                       cores=CORES_VALENCIA, campo_cor="vlc_maior_text", tooltip="name",
+                       zmin=tiles["zmin"], zmax=tiles["zmax"], name="Vias").add_to(mapa)
+        return
+
     def style(feat):
-        return {"color": {"Neutro": "#f6dd1e", "Negativo": "#d7191c"}.get(feat["properties"]["vlc_maior_text"], "#1a9641"),
+        return {"color": CORES_VALENCIA.get(feat["properties"]["vlc_maior_text"], "#1a9641"),
                 "weight": 5}
 
-    folium.GeoJson(sel.__geo_interface__, name="Vias", style_function=style).add_to(mapa)
\ No newline at end of file
+    folium.GeoJson(sel.__geo_interface__, name="Vias", style_function=style).add_to(mapa)
+
+# ------------------------------------------------------------------
+# Rotas – navegação emocional
+# ------------------------------------------------------------------
+
+@rastrear()
+def rota_emocional(rota, mapa, origem=None, destino=None, nome="Rota"):
+    """Desenha as ruas da rota (GeoDataFrame) + marcadores de partida/chegada."""
+    if rota is None or rota.empty:
+        return
+    folium.GeoJson(
+        rota[["geometry"]].__geo_interface__, name=nome,
+        style_function=lambda f: {"color": "#2c7bb6", "weight": 7, "opacity": 0.8},
+    ).add_to(mapa)
+    if origem:
+        folium.Marker(origem, popup="Partida", icon=folium.Icon(color="blue", icon="star")).add_to(mapa)
+    if destino:
+        folium.Marker(destino, popup="Chegada", icon=folium.Icon(color="green", icon="star")).add_to(mapa)
+
+
+def paradas_roteiro(paradas, mapa):
+    """Marcadores numerados na ordem de visita: ``[(lat, lon, rotulo), ...]``."""
+    for i, (lat, lon, rotulo) in enumerate(paradas, start=1):
+        folium.Marker(
+            [lat, lon], tooltip=f"{i}. {rotulo}",
+            icon=folium.DivIcon(
+                icon_size=(24, 24), icon_anchor=(12, 12),
+                html=(f'<div style="background:#2c7bb6;color:#fff;border-radius:12px;'
+                      f'width:24px;height:24px;text-align:center;line-height:24px;'
+                      f'font-weight:bold">{i}</div>'),
+            ),
+        ).add_to(mapa)
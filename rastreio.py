@@ -0,0 +1,198 @@
+# rastreio.py
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# ---------------------------------------------------------------------------------
+# Rastreamento leve do caminho de uma consulta (leitura, build_layers,
+# filtros, montagem e serialização do mapa).
+# ``etapa(nome)`` / ``@rastrear`` registram tempo, nº de linhas e bytes
+# alocados de cada trecho no coletor da thread atual (cada sessão do
+# Streamlit roda o script na sua thread); ``marco(nome)`` fecha um passo
+# dentro da etapa corrente sem reindentar funções longas.  Sem
+# ``coletar()`` ativo o custo é um atributo lido de um ``threading.local``.
+# ---------------------------------------------------------------------------------
+
+class _Local(threading.local):
+    coletor = None           # padrão por thread, sem AttributeError na leitura
+
+
+_local = _Local()
+
+
+class _Nulo:
+    """Etapa desligada: aceita tudo e não registra nada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def linhas(self):
+        return None
+
+    @linhas.setter
+    def linhas(self, n):
+        pass
+
+    def marco(self, nome, linhas=None):
+        pass
+
+
+_NULO = _Nulo()
+
+
+class _Etapa:
+    __slots__ = ("coletor", "nome", "linhas", "_t0", "_m0", "_pai", "_marco")
+
+    def __init__(self, coletor, nome, linhas):
+        self.coletor, self.nome, self.linhas = coletor, nome, linhas
+
+    def _memoria(self):
+        return tracemalloc.get_traced_memory()[0] if self.coletor.memoria else None
+
+    def __enter__(self):
+        c = self.coletor
+        self._pai = c._pilha[-1].nome if c._pilha else None
+        c._pilha.append(self)
+        self._m0 = self._memoria()
+        self._t0 = time.perf_counter_ns()
+        self._marco = (self._t0, self._m0)
+        return self
+
+    def _registrar(self, nome, pai, nivel, t0, m0, linhas, erro=None):
+        c = self.coletor
+        m1 = self._memoria()
+        c.eventos.append({
+            "nome": nome,
+            "pai": pai,
+            "nivel": nivel,
+            "inicio_ms": (t0 - c.t0) / 1e6,
+            "duracao_ms": (time.perf_counter_ns() - t0) / 1e6,
+            "linhas": linhas,
+            "bytes": m1 - m0 if m1 is not None else None,
+            "erro": erro,
+        })
+
+    def marco(self, nome, linhas=None):
+        """Passo desde o marco anterior (ou o início da etapa)."""
+        t0, m0 = self._marco
+        self._registrar(f"{self.nome}/{nome}", self.nome, len(self.coletor._pilha), t0, m0, linhas)
+        self._marco = (time.perf_counter_ns(), self._memoria())
+
+    def __exit__(self, *exc):
+        c = self.coletor
+        c._pilha.pop()
+        self._registrar(self.nome, self._pai, len(c._pilha), self._t0, self._m0, self.linhas,
+                        exc[0].__name__ if exc[0] else None)
+        return False
+
+
+def etapa(nome, linhas=None):
+    """Context manager de uma etapa; ``e.linhas = n`` registra o nº de linhas."""
+    c = _local.coletor
+    if c is None:
+        return _NULO
+    return _Etapa(c, nome, linhas)
+
+
+def marco(nome, linhas=None):
+    """Fecha um passo da etapa mais interna da thread (no-op sem coletor)."""
+    c = _local.coletor
+    if c is not None and c._pilha:
+        c._pilha[-1].marco(nome, linhas)
+
+
+def _n_linhas(obj):
+    if isinstance(obj, (str, bytes, dict)) or not hasattr(obj, "__len__"):
+        return None
+    return len(obj)
+
+
+def rastrear(nome=None):
+    """Decorador: a chamada vira uma etapa; ``len`` do retorno vai em ``linhas``."""
+    def deco(func):
+        rotulo = nome or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def envolvida(*args, **kwargs):
+            c = _local.coletor
+            if c is None:
+                return func(*args, **kwargs)
+            with _Etapa(c, rotulo, None) as e:
+                out = func(*args, **kwargs)
+                e.linhas = _n_linhas(out)
+            return out
+        return envolvida
+    return deco
+
+
+class Coletor:
+    """
+    Etapas registradas numa thread entre ``__enter__`` e ``__exit__``.
+    Com ``memoria=True`` liga o ``tracemalloc`` (bytes líquidos por
+    etapa; medição de processo inteiro e bem mais lenta).
+    """
+
+    def __init__(self, memoria=False):
+        self.memoria = memoria
+        self.eventos = []
+        self._pilha = []
+        self._ligou_tracemalloc = False
+        self.t0 = None
+        self.tid = threading.get_ident()
+
+    def __enter__(self):
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._ligou_tracemalloc = True
+        self._anterior = _local.coletor
+        _local.coletor = self
+        if self.t0 is None:         # reentrável: vários blocos no mesmo rerun
+            self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _local.coletor = self._anterior
+        if self._ligou_tracemalloc:
+            tracemalloc.stop()
+        return False
+
+    def resumo(self) -> list:
+        """Uma linha por nome de etapa: chamadas, tempo total/máximo, linhas e bytes."""
+        por_nome = {}
+        for ev in self.eventos:
+            r = por_nome.setdefault(ev["nome"], {"nome": ev["nome"], "chamadas": 0,
+                                                 "total_ms": 0.0, "max_ms": 0.0,
+                                                 "linhas": None, "bytes": None})
+            r["chamadas"] += 1
+            r["total_ms"] += ev["duracao_ms"]
+            r["max_ms"] = max(r["max_ms"], ev["duracao_ms"])
+            for campo in ("linhas", "bytes"):
+                if ev[campo] is not None:
+                    r[campo] = (r[campo] or 0) + ev[campo]
+        return sorted(por_nome.values(), key=lambda r: -r["total_ms"])
+
+    def json(self) -> str:
+        return json.dumps({"eventos": self.eventos, "resumo": self.resumo()},
+                          indent=1, ensure_ascii=False)
+
+    def chrome_trace(self) -> str:
+        """Formato ``chrome://tracing`` / Perfetto (eventos completos, µs)."""
+        eventos = [{
+            "name": ev["nome"], "ph": "X", "pid": os.getpid(), "tid": self.tid,
+            "ts": ev["inicio_ms"] * 1e3, "dur": ev["duracao_ms"] * 1e3,
+            "args": {k: ev[k] for k in ("linhas", "bytes", "erro") if ev[k] is not None},
+        } for ev in self.eventos]
+        return json.dumps({"traceEvents": eventos, "displayTimeUnit": "ms"})
+
+
+def coletar(memoria=False) -> Coletor:
+    """``with coletar() as c:`` – liga o rastreamento na thread atual."""
+    return Coletor(memoria)
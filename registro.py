@@ -0,0 +1,83 @@
+# registro.py
+from collections.abc import Mapping
+
+from rastreio import etapa
+
+# ---------------------------------------------------------------------------------
+# Registro preguiçoso de camadas: cada nome aponta para a função que o
+# carrega, chamada só no primeiro acesso (``registro[nome]``) e memorizada.
+# Uma função pode produzir várias camadas de uma vez (ex.: build_layers);
+# ela roda uma vez e todas as camadas do grupo ficam disponíveis.  Como
+# ``Mapping`` substitui o antigo dicionário ``DATA`` sem mudar quem o lê
+# (``data["emoc_fato"]``, ``data.get("tiles")``, ``"emoc_hex" in data``):
+# como no dicionário, ``in`` só é verdadeiro para camadas que existem de
+# fato, então consultá-lo carrega a camada.  Arquivo ausente conta como
+# camada ausente; qualquer outro erro de carga (arquivo corrompido, bug)
+# sobe, em vez de virar um ``False`` silencioso.
+# ---------------------------------------------------------------------------------
+
+
+class Registro(Mapping):
+    """
+    ``registrar(nome, carregar)`` – ``carregar()`` devolve a camada;
+    ``registrar((n1, n2, …), carregar)`` – devolve um dicionário com elas.
+    ``nome in registro`` carrega a camada e só é verdadeiro se ela existe e
+    não é ``None`` (ex.: tiles desligados); camada ausente do grupo
+    (``KeyError``) ou arquivo ausente (``FileNotFoundError``) dão ``False``,
+    os demais erros sobem.  O erro fica memorizado e ``registro[nome]`` o
+    repete.
+    """
+
+    def __init__(self):
+        self._fontes = {}
+        self._valores = {}
+        self._erros = {}
+
+    def registrar(self, nomes, carregar):
+        grupo = not isinstance(nomes, str)
+        for nome in (nomes if grupo else (nomes,)):
+            self._fontes[nome] = (carregar, grupo)
+        return self
+
+    def __getitem__(self, nome):
+        if nome in self._valores:
+            return self._valores[nome]
+        if nome in self._erros:
+            raise self._erros[nome]
+        carregar, grupo = self._fontes[nome]
+        try:
+            with etapa(f"camada {nome}"):
+                out = carregar()
+        except Exception as e:
+            self._erros[nome] = e
+            raise
+        if grupo:
+            self._valores.update({k: out[k] for k, (f, _) in self._fontes.items()
+                                  if f is carregar and k in out})
+        else:
+            self._valores[nome] = out
+        return self._valores[nome]
+
+    def __contains__(self, nome):
+        if nome not in self._fontes:
+            return False
+        try:
+            return self[nome] is not None
+        except (KeyError, FileNotFoundError):
+            return False
+
+    def __iter__(self):
+        return iter(self._fontes)
+
+    def __len__(self):
+        return len(self._fontes)
+
+    def carregar(self, *nomes):
+        """Carrega de antemão as camadas ``nomes`` (dependências de uma página)."""
+        for nome in nomes:
+            self[nome]
+        return self
+
+    def carregadas(self) -> list:
+        """Nomes já carregados, na ordem de carga."""
+        return list(self._valores)
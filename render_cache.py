@@ -0,0 +1,70 @@
+# render_cache.py
+import threading
+from collections import OrderedDict
+
+from emoc_index import chave_filtros
+from rastreio import etapa
+
+# ---------------------------------------------------------------------------------
+# Cache LRU do HTML final dos mapas folium.
+# A chave é (visualização, parâmetros canônicos): listas de multiselect são
+# ordenadas e ``None`` descartado (emoc_index.chave_filtros), então a mesma
+# consulta feita em outra ordem ou depois de trocar de página é servida sem
+# montar nem renderizar o mapa de novo.  O limite é em bytes de HTML.
+# ---------------------------------------------------------------------------------
+
+MAX_BYTES = 128 * 1024 ** 2      # 128 MB de HTML em memória
+
+
+def chave_mapa(visao, **params) -> tuple:
+    """Chave canônica de um mapa: ``(visao, ((param, (valores…)), …))``."""
+    return (visao, chave_filtros(**params))
+
+
+class CacheMapas:
+    """
+    ``html(chave, construir)`` devolve o HTML guardado para ``chave`` ou
+    chama ``construir()`` (que devolve um ``folium.Map``), renderiza e
+    guarda.  Compartilhado entre sessões: o acesso é protegido por trava.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._trava = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.descartes = 0
+
+    def html(self, chave, construir) -> str:
+        with self._trava:
+            if chave in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(chave)
+                return self._cache[chave][0]
+            self.misses += 1
+        mapa = construir()
+        with etapa("render_cache render HTML") as e:
+            html = mapa.get_root().render()
+            tamanho = e.linhas = len(html.encode())
+        with self._trava:
+            if chave not in self._cache:
+                self._cache[chave] = (html, tamanho)
+                self.bytes += tamanho
+            while self.bytes > self.max_bytes and len(self._cache) > 1:
+                _, (_, velho) = self._cache.popitem(last=False)
+                self.bytes -= velho
+                self.descartes += 1
+        return html
+
+    def limpar(self):
+        with self._trava:
+            self._cache.clear()
+            self.bytes = 0
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            total = self.hits + self.misses
+            return {"entradas": len(self._cache), "bytes": self.bytes,
+                    "max_bytes": self.max_bytes, "hits": self.hits,
+                    "misses": self.misses, "descartes": self.descartes,
+                    "taxa_hit": self.hits / total if total else 0.0}
@@ -0,0 +1,219 @@
+# roteiro.py
+import contextlib
+import hashlib
+import os
+import re
+
+import numpy as np
+import shapely
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from contraction import hash_grafo
+from routing import EPSG_LATLON
+
+# ---------------------------------------------------------------------------------
+# Roteiro com várias paradas pelos pontos de referência dos cenários.
+# A matriz de custos entre os pontos sai de um único Dijkstra muitos-para-
+# muitos (scipy.sparse.csgraph) sobre o GrafoRuas; a ordem de visita é um
+# TSP resolvido pelo OR-Tools com limite de tempo.
+# ---------------------------------------------------------------------------------
+
+TOUR_DIR = "dados/.cache/roteiro"
+ESCALA = 10              # custo inteiro do OR-Tools em decímetros ponderados
+SEM_CAMINHO = 10 ** 9    # penalidade de pares sem caminho na rede
+
+
+def _csr(grafo, perfil):
+    """Matriz esparsa n×n com o menor peso entre cada par (sem laços)."""
+    pesos = grafo.pesos(perfil)
+    src = np.repeat(np.arange(grafo.n), np.diff(grafo.indptr))
+    dst = grafo.indices
+    ok = src != dst
+    src, dst, pesos = src[ok], dst[ok], pesos[ok]
+    # arestas paralelas: csr_matrix somaria os pesos, fica só a mais barata
+    ordem = np.lexsort((pesos, dst, src))
+    src, dst, pesos = src[ordem], dst[ordem], pesos[ordem]
+    prim = np.ones(len(src), dtype=bool)
+    prim[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+    src, dst, pesos = src[prim], dst[prim], pesos[prim]
+    # peso 0 explícito vira "sem aresta" em alguns caminhos do csgraph
+    return csr_matrix((np.maximum(pesos, 1e-9), (src, dst)), shape=(grafo.n, grafo.n))
+
+
+class MatrizCustos:
+    """
+    Custos (``custo``) e comprimentos (``comprimento``, m) entre os nós
+    ``nos`` de um perfil, com os predecessores do Dijkstra para refazer
+    cada trecho.  ``np.inf`` onde não há caminho.
+    """
+
+    def __init__(self, nos, custo, comprimento, pred):
+        self.nos = np.asarray(nos, dtype=np.int64)
+        self.custo = custo
+        self.comprimento = comprimento
+        self.pred = pred
+
+    @classmethod
+    def calcular(cls, grafo, nos, perfil="emocional"):
+        nos = np.asarray(nos, dtype=np.int64)
+        m = _csr(grafo, perfil)
+        fontes, inv = np.unique(nos, return_inverse=True)
+        # um só Dijkstra a partir de todas as fontes
+        dist, pred = dijkstra(m, directed=True, indices=fontes, return_predecessors=True)
+        custo = dist[inv][:, nos]
+        pred = pred[inv].astype(np.int32)
+        # comprimento (m) ao longo do caminho de menor custo, não o mais curto
+        pesos = grafo.pesos(perfil)
+        comprimento = np.full_like(custo, np.inf)
+        for i, j in zip(*np.nonzero(np.isfinite(custo))):
+            arestas = _arestas(grafo, pesos, _caminho(pred[i], int(nos[i]), int(nos[j])))
+            comprimento[i, j] = grafo.comp_aresta[arestas].sum() if arestas else 0.0
+        return cls(nos, custo, comprimento, pred)
+
+    def trecho(self, grafo, i, j, perfil="emocional"):
+        """Rota (formato de ``GrafoRuas.rota``) do ponto ``i`` ao ``j``."""
+        if not np.isfinite(self.custo[i, j]):
+            return None
+        nos = _caminho(self.pred[i], int(self.nos[i]), int(self.nos[j]))
+        arestas = _arestas(grafo, grafo.pesos(perfil), nos)
+        return {"nos": nos, "arestas": arestas,
+                "custo": float(self.custo[i, j]), "comprimento": float(self.comprimento[i, j])}
+
+    def salvar(self, caminho):
+        # como HierarquiaContracao.salvar: grava ao lado (nome por processo) e troca
+        tmp = f"{caminho}.tmp{os.getpid()}"
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, nos=self.nos, custo=self.custo,
+                         comprimento=self.comprimento, pred=self.pred)
+            os.replace(tmp, caminho)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp)
+
+    @classmethod
+    def carregar(cls, caminho):
+        z = np.load(caminho)
+        return cls(z["nos"], z["custo"], z["comprimento"], z["pred"])
+
+
+def _caminho(pred, origem, destino):
+    nos = [destino]
+    while nos[-1] != origem:
+        nos.append(int(pred[nos[-1]]))
+    nos.reverse()
+    return nos
+
+
+def _arestas(grafo, pesos, nos):
+    return [_aresta_min(grafo, pesos, u, v) for u, v in zip(nos, nos[1:])]
+
+
+def _aresta_min(grafo, pesos, u, v):
+    """Rua mais barata entre dois nós vizinhos (a que o Dijkstra usou)."""
+    ks = grafo.indptr[u] + np.flatnonzero(grafo.indices[grafo.indptr[u]:grafo.indptr[u + 1]] == v)
+    return int(grafo.aresta[ks[np.argmin(pesos[ks])]])
+
+
+# ----------------------------------------------------------
+# ordem de visita (OR-Tools)
+# ----------------------------------------------------------
+def ordem_visita(custo, inicio=0, retorno=False, tempo=2):
+    """
+    Sequência de índices de ``custo`` que visita todos os pontos saindo de
+    ``inicio``; com ``retorno`` volta ao início, senão termina onde for
+    mais barato.  Pares sem caminho recebem ``SEM_CAMINHO``.
+    """
+    n = len(custo)
+    if n <= 2:
+        seq = [inicio] + [i for i in range(n) if i != inicio]
+        return seq + [inicio] if retorno and n > 1 else seq
+    mat = np.where(np.isfinite(custo), np.round(custo * ESCALA), SEM_CAMINHO).astype(np.int64)
+    if not retorno:
+        # nó fictício: chegar nele é grátis, então o fim do roteiro fica livre
+        mat = np.pad(mat, ((0, 1), (0, 1)))
+    mat = mat.tolist()
+
+    gerente = pywrapcp.RoutingIndexManager(len(mat), 1, [inicio], [inicio if retorno else n])
+    modelo = pywrapcp.RoutingModel(gerente)
+
+    def custo_cb(a, b):
+        return mat[gerente.IndexToNode(a)][gerente.IndexToNode(b)]
+
+    modelo.SetArcCostEvaluatorOfAllVehicles(modelo.RegisterTransitCallback(custo_cb))
+    params = pywrapcp.DefaultRoutingSearchParameters()
+    params.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    params.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    params.time_limit.FromMilliseconds(int(tempo * 1000))
+    sol = modelo.SolveWithParameters(params)
+    if sol is None:
+        return None
+
+    seq, idx = [], modelo.Start(0)
+    while not modelo.IsEnd(idx):
+        seq.append(gerente.IndexToNode(idx))
+        idx = sol.Value(modelo.NextVar(idx))
+    if retorno:
+        seq.append(inicio)
+    return seq
+
+
+# ----------------------------------------------------------
+# matrizes por perfil sobre pts_cenarios, em disco
+# ----------------------------------------------------------
+def _hash_pontos(lonlat) -> str:
+    return hashlib.sha256(np.round(np.asarray(lonlat, float), 7).tobytes()).hexdigest()[:8]
+
+
+def matriz_pontos(grafo, pts, perfil="emocional", pasta=TOUR_DIR) -> MatrizCustos:
+    """
+    ``MatrizCustos`` entre os pontos ``pts`` (GeoDataFrame) encaixados no
+    grafo, lida de ``pasta`` quando grafo, pesos e pontos não mudaram.
+    A linha/coluna ``i`` corresponde a ``pts.iloc[i]``.
+    """
+    lonlat = shapely.get_coordinates(pts.to_crs(EPSG_LATLON).geometry.values)
+    nome = f"{perfil}_{hash_grafo(grafo, perfil)}_{_hash_pontos(lonlat)}.npz"
+    caminho = os.path.join(pasta, nome)
+    if os.path.exists(caminho):
+        return MatrizCustos.carregar(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    nos = grafo.vertice_mais_proximo(lonlat[:, 0], lonlat[:, 1])
+    mat = MatrizCustos.calcular(grafo, np.atleast_1d(nos), perfil)
+    mat.salvar(caminho)
+    antigo = re.compile(re.escape(f"{perfil}_") + r"[0-9a-f]{16}_[0-9a-f]{8}\.npz")
+    for f in os.listdir(pasta):
+        if f != nome and antigo.fullmatch(f):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(pasta, f))
+    return mat
+
+
+def planejar(grafo, mat, indices, perfil="emocional", retorno=False, tempo=2):
+    """
+    Roteiro pelos pontos ``indices`` (linhas de ``mat``), começando no
+    primeiro.  Devolve ``{'ordem', 'trechos', 'custo', 'comprimento',
+    'sem_caminho'}``; ``sem_caminho`` lista os pares (i, j) da ordem que não
+    se ligam pela rede.
+    """
+    indices = list(indices)
+    sub = mat.custo[np.ix_(indices, indices)]
+    seq = ordem_visita(sub, 0, retorno, tempo)
+    if seq is None:
+        return None
+    ordem = [indices[s] for s in seq]
+    trechos, faltam = [], []
+    for i, j in zip(ordem, ordem[1:]):
+        t = mat.trecho(grafo, i, j, perfil)
+        if t is None:
+            faltam.append((i, j))
+        else:
+            trechos.append(t)
+    return {
+        "ordem": ordem,
+        "trechos": trechos,
+        "custo": float(sum(t["custo"] for t in trechos)),
+        "comprimento": float(sum(t["comprimento"] for t in trechos)),
+        "sem_caminho": faltam,
+    }
@@ -0,0 +1,199 @@
+# routing.py
+import heapq
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from snapping import SnapVertices
+
+EPSG_METRIC = 32722      # UTM zona 22 S  (m)
+EPSG_LATLON = 4326       # WGS-84
+
+# ---------------------------------------------------------------------------------
+# Roteamento emocional offline (substitui pgRouting / OpenRouteService).
+# Grafo CSR montado a partir das ruas (``ways``) e dos vértices
+# ``ways_vertices_pgr``; A* com custo = comprimento × fator de valência.
+# ---------------------------------------------------------------------------------
+
+VALENCIAS = ["Negativo", "Neutro", "Positivo"]
+
+# perfil ➜ (peso da fração negativa, peso da fração positiva) no fator de custo
+PERFIS = {
+    "curta": (0.0, 0.0),
+    "menos_negativa": (1.0, 0.0),
+    "mais_positiva": (0.0, 0.5),
+    "emocional": (1.0, 0.5),
+}
+FATOR_MIN = 0.2          # piso do fator: mantém os custos positivos
+TOL_VERTICE = 2.0        # m – extremidade de rua ➜ vértice pgr existente
+
+
+def fator_valencia(frac_neg, frac_pos, perfil="emocional"):
+    """Multiplicador do comprimento: >1 em ruas negativas, <1 em positivas."""
+    a, b = PERFIS[perfil] if isinstance(perfil, str) else perfil
+    return np.maximum(FATOR_MIN, 1.0 + a * frac_neg - b * frac_pos)
+
+
+class GrafoRuas:
+    """
+    Grafo não direcionado das ruas em CSR (``indptr``/``indices``), com
+    comprimento (m) e frações de valência por aresta.  Os nós são os
+    vértices de ``ways_vertices_pgr`` (na mesma ordem, ids 0..n-1) mais
+    extremidades de rua sem vértice a menos de ``TOL_VERTICE``.
+    ``componente`` rotula o trecho conexo de cada nó: com só as ruas dos
+    cenários a rede se parte em trechos e não há rota entre eles.
+    """
+
+    def __init__(self, ways, vertices=None, vlc=None, tol=TOL_VERTICE):
+        ways = ways[ways.geometry.notna() & ~ways.geometry.is_empty]
+        n_ruas = len(ways)
+        ways = ways.explode(index_parts=False).reset_index(drop=True)
+        self.ways = ways.to_crs(EPSG_LATLON)
+        linhas = ways.to_crs(EPSG_METRIC).geometry.values
+
+        # --- nós: vértices pgr + extremidades órfãs ---
+        if vertices is not None and not vertices.empty:
+            xy = shapely.get_coordinates(vertices.to_crs(EPSG_METRIC).geometry.values)
+        else:
+            xy = np.empty((0, 2))
+        ini = shapely.get_coordinates(shapely.get_point(linhas, 0))
+        fim = shapely.get_coordinates(shapely.get_point(linhas, -1))
+        ext = np.vstack([ini, fim])
+        no_ext = np.full(len(ext), -1)
+        if len(xy) and {"source", "target"} <= set(ways) and len(ways) == n_ruas:
+            # source/target já calculados (ruas.montar_ways) sobre os mesmos vértices
+            no_ext = np.concatenate([ways["source"].to_numpy(), ways["target"].to_numpy()])
+            no_ext = np.where(no_ext < len(xy), no_ext, -1).astype(np.int64)
+        elif len(xy):
+            _, no_ext = SnapVertices(xy).consultar_xy(ext, max_distance=tol)
+        orfas = no_ext < 0
+        if orfas.any():
+            # extremidades iguais (arredondadas ao cm) viram o mesmo nó novo
+            chave = np.round(ext[orfas], 2)
+            uniq, inv = np.unique(chave, axis=0, return_inverse=True)
+            no_ext[orfas] = len(xy) + inv.ravel()
+            xy = np.vstack([xy, uniq])
+        self.xy = xy
+        self._xs, self._ys = xy[:, 0].tolist(), xy[:, 1].tolist()
+        self.lonlat = shapely.get_coordinates(
+            gpd.GeoSeries(shapely.points(xy), crs=EPSG_METRIC).to_crs(EPSG_LATLON).values)
+
+        u, v = no_ext[:len(linhas)], no_ext[len(linhas):]
+        comp = shapely.length(linhas)
+        self.comp_aresta = comp
+        frac_neg, frac_pos = self._fracoes(vlc)
+
+        # --- CSR com as duas direções de cada aresta ---
+        src = np.concatenate([u, v])
+        dst = np.concatenate([v, u])
+        aresta = np.concatenate([np.arange(len(u))] * 2)
+        ordem = np.argsort(src, kind="stable")
+        self.n = len(xy)
+        self.indptr = np.searchsorted(src[ordem], np.arange(self.n + 1))
+        self.indices = dst[ordem]
+        self.aresta = aresta[ordem]
+        self.comp = comp[self.aresta]
+        self.frac_neg = frac_neg[self.aresta]
+        self.frac_pos = frac_pos[self.aresta]
+        self._listas = {}
+        # só nós com arestas: a maioria dos vértices pgr não toca nenhuma rua
+        # carregada, e uma rota que começa num deles nunca sai do lugar
+        self.ativos = np.flatnonzero(np.diff(self.indptr) > 0)
+        self.snap = SnapVertices(self.xy[self.ativos])
+        # trechos sem ligação entre si (só as ruas dos cenários são carregadas):
+        # só há rota entre nós do mesmo componente
+        adj = csr_matrix((np.ones(len(self.indices)), self.indices, self.indptr),
+                         shape=(self.n, self.n))
+        _, self.componente = connected_components(adj, directed=False)
+        self.n_trechos = len(np.unique(self.componente[self.ativos]))
+
+    def _fracoes(self, vlc):
+        """Frações negativa/positiva por rua a partir de emoc_count_ways_vlc."""
+        n = len(self.ways)
+        if vlc is None or "osm_id" not in self.ways:
+            return np.zeros(n), np.zeros(n)
+        tab = pd.DataFrame(vlc).set_index("osm_id").reindex(columns=VALENCIAS).fillna(0)
+        tab = tab[~tab.index.duplicated()]
+        tot = tab.sum(axis=1).replace(0, np.nan)
+        por_rua = pd.DataFrame({"neg": tab["Negativo"] / tot, "pos": tab["Positivo"] / tot})
+        por_rua = por_rua.reindex(self.ways["osm_id"].values).fillna(0)
+        return por_rua["neg"].to_numpy(), por_rua["pos"].to_numpy()
+
+    def pesos(self, perfil="emocional") -> np.ndarray:
+        """Custo de cada entrada CSR para o perfil (nome ou (a, b))."""
+        return self.comp * fator_valencia(self.frac_neg, self.frac_pos, perfil)
+
+    def _adjacencia(self, perfil):
+        # listas Python: indexar numpy escalar a escalar é lento no laço do A*
+        if perfil not in self._listas:
+            pesos = self.pesos(perfil)
+            fmin = float((pesos / np.maximum(self.comp, 1e-9)).min()) if len(pesos) else 1.0
+            self._listas[perfil] = (self.indptr.tolist(), self.indices.tolist(),
+                                    pesos.tolist(), self.aresta.tolist(), fmin)
+        return self._listas[perfil]
+
+    def vertice_mais_proximo(self, lon, lat):
+        """Nó com arestas mais próximo de lon/lat (escalares ou vetores)."""
+        _, i = self.snap.mais_proximo(lon, lat)
+        nos = self.ativos[i]
+        return int(nos) if np.ndim(nos) == 0 else nos
+
+    def trecho(self, lon, lat):
+        """Componente (trecho conexo da rede) do nó mais próximo de lon/lat."""
+        return self.componente[self.vertice_mais_proximo(lon, lat)]
+
+    def mesmo_trecho(self, origem: int, destino: int) -> bool:
+        return bool(self.componente[origem] == self.componente[destino])
+
+    def rota(self, origem: int, destino: int, perfil="emocional"):
+        """
+        A* de ``origem`` a ``destino`` (ids de nó).  Heurística: distância
+        euclidiana × menor fator do perfil (admissível).  Devolve
+        ``{'nos', 'arestas', 'custo', 'comprimento'}`` ou ``None``.
+        """
+        indptr, indices, pesos, aresta, fmin = self._adjacencia(perfil)
+        xs, ys = self._xs, self._ys
+        xd, yd = xs[destino], ys[destino]
+
+        def h(i):
+            return fmin * ((xs[i] - xd) ** 2 + (ys[i] - yd) ** 2) ** 0.5
+
+        dist = {origem: 0.0}
+        pai = {origem: (None, None)}
+        fila = [(h(origem), origem)]
+        fechados = set()
+        while fila:
+            _, u = heapq.heappop(fila)
+            if u in fechados:
+                continue
+            if u == destino:
+                break
+            fechados.add(u)
+            du = dist[u]
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = du + pesos[k]
+                if nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    pai[v] = (u, aresta[k])
+                    heapq.heappush(fila, (nd + h(v), v))
+        if destino not in pai:
+            return None
+
+        nos, arestas = [destino], []
+        while pai[nos[-1]][0] is not None:
+            u, e = pai[nos[-1]]
+            arestas.append(e)
+            nos.append(u)
+        nos.reverse()
+        arestas.reverse()
+        comp = float(self.comp_aresta[arestas].sum()) if arestas else 0.0
+        return {"nos": nos, "arestas": arestas, "custo": dist[destino], "comprimento": comp}
+
+    def geometria(self, rota) -> gpd.GeoDataFrame:
+        """Ruas (EPSG:4326) percorridas pela rota, na ordem."""
+        return self.ways.iloc[rota["arestas"]]
@@ -0,0 +1,149 @@
+# ruas.py
+"""
+Camada ``ways`` (ruas com ``osm_id``, ``name``, ``cod_cenario`` e
+``bool_cenario``) montada a partir dos arquivos que acompanham o
+repositório, sem exportação externa do banco:
+
+* ``ruas_cenarios.geojson`` – geometria das ruas (LineString);
+* ``ways_vertices_pgr.geojson`` – vértices da rede (pgRouting), que dão
+  ``source``/``target`` de cada rua;
+* ``cenarios.geojson`` – percursos dos cenários, para marcar as ruas;
+* ``ruas_nomes.geojson`` (opcional) – extrato do OpenStreetMap com
+  ``name``, casado às ruas pelo mesmo critério dos cenários (com
+  ``TOL_NOME``).
+
+Nenhum arquivo que acompanha o repositório traz nome de rua (as ruas e os
+vértices vêm sem atributos), então sem o extrato ``name`` fica vazio e a
+navegação escolhe partida/chegada entre os pontos de referência.
+
+Uma rua é do cenário quando ao menos ``FRACAO_CENARIO`` do seu comprimento
+fica a até ``TOL_CENARIO`` m do percurso: o percurso foi digitalizado à
+parte e não coincide com o eixo das ruas, então ``intersects`` direto só
+pega os cruzamentos.  A consulta usa STRtree sobre os percursos com buffer.
+
+Conferir a montagem (na raiz do repositório):
+
+    python -m ruas [--pasta dados]
+"""
+import argparse
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from ingestao import ler_camada
+from rastreio import rastrear
+from routing import TOL_VERTICE
+from snapping import SnapVertices
+
+EPSG_METRIC = 32722      # UTM zona 22 S  (m)
+EPSG_LATLON = 4326       # WGS-84
+TOL_CENARIO = 20         # m – distância rua ➜ percurso do cenário
+FRACAO_CENARIO = 0.5     # fração mínima do comprimento da rua junto ao percurso
+TOL_NOME = 10            # m – distância rua ➜ linha nomeada do extrato OSM
+
+RUAS = "ruas_cenarios.geojson"
+VERTICES = "ways_vertices_pgr.geojson"
+CENARIOS = "cenarios.geojson"
+NOMES = "ruas_nomes.geojson"
+
+
+def fontes(pasta="dados") -> dict:
+    """Arquivos dos quais ``ways`` depende (chaves para o hash dos caches)."""
+    arq = {"ways": os.path.join(pasta, RUAS), "vertices": os.path.join(pasta, VERTICES),
+           "cenarios": os.path.join(pasta, CENARIOS), "__ruas__": __file__}
+    if os.path.exists(os.path.join(pasta, NOMES)):
+        arq["nomes"] = os.path.join(pasta, NOMES)
+    return arq
+
+
+def _sobreposicao(linhas, alvos, coluna, tol, fracao):
+    """
+    ``coluna`` do alvo (percurso de cenário, rua nomeada…) que acompanha
+    cada linha em ao menos ``fracao`` do comprimento, a até ``tol`` m; NA
+    sem nenhum.  Consulta com STRtree sobre os alvos com buffer.
+    """
+    buf = shapely.buffer(alvos.geometry.values, tol)
+    i_rua, i_alvo = shapely.STRtree(buf).query(linhas, predicate="intersects")
+    frac = shapely.length(shapely.intersection(linhas[i_rua], buf[i_alvo])) \
+        / np.maximum(shapely.length(linhas[i_rua]), 1e-9)
+    pares = pd.DataFrame({"rua": i_rua, "valor": alvos[coluna].to_numpy()[i_alvo],
+                          "frac": frac})
+    # alvo com a maior sobreposição, se passar do mínimo
+    melhor = pares[pares["frac"] >= fracao].sort_values("frac").drop_duplicates("rua", keep="last")
+    return pd.Series(melhor["valor"].to_numpy(), index=melhor["rua"].to_numpy()) \
+        .reindex(np.arange(len(linhas)))
+
+
+@rastrear()
+def montar_ways(ruas, vertices=None, cenarios=None, nomes=None, tol_cenario=TOL_CENARIO,
+                fracao=FRACAO_CENARIO, tol_vertice=TOL_VERTICE,
+                tol_nome=TOL_NOME) -> gpd.GeoDataFrame:
+    """
+    ``ways`` a partir das geometrias de ``ruas``.  Atributos que já vierem
+    em ``ruas`` (``osm_id``, ``name``…) são mantidos; sem eles, ``osm_id``
+    é a ordem da rua no arquivo (1..n) e ``name`` vem de ``nomes`` (extrato
+    OSM) ou fica vazio.
+    ``source``/``target`` são as posições em ``vertices`` das extremidades
+    (-1 sem vértice a menos de ``tol_vertice`` m).
+    """
+    ruas = ruas[ruas.geometry.notna() & ~ruas.geometry.is_empty]
+    ways = ruas.explode(index_parts=False).reset_index(drop=True)
+    if "osm_id" not in ways:
+        ways.insert(0, "osm_id", np.arange(1, len(ways) + 1, dtype="int32"))
+    linhas = ways.to_crs(EPSG_METRIC).geometry.values
+    if "name" not in ways:
+        # só os casados recebem texto; sem astype(str), que no pandas 2 faz NaN ➜ "nan"
+        nome = np.full(len(ways), None, dtype=object)
+        if nomes is not None and "name" in nomes:
+            nomes = nomes[nomes["name"].notna() & nomes.geometry.notna()]
+            casados = _sobreposicao(linhas, nomes.to_crs(EPSG_METRIC), "name", tol_nome, fracao)
+            casados = casados[casados.notna()]
+            nome[casados.index.to_numpy()] = [str(v) for v in casados]
+        ways.insert(1, "name", pd.Series(nome, index=ways.index))
+
+    if cenarios is not None and not cenarios.empty and "cod_cenario" not in ruas:
+        cod = _sobreposicao(linhas, cenarios.to_crs(EPSG_METRIC), "cod_cenario",
+                            tol_cenario, fracao)
+        ways["cod_cenario"], ways["bool_cenario"] = cod.to_numpy(), cod.notna().to_numpy()
+    elif "bool_cenario" not in ways:
+        ways["bool_cenario"] = ways["cod_cenario"].notna() if "cod_cenario" in ways else True
+
+    ini = shapely.get_coordinates(shapely.get_point(linhas, 0))
+    fim = shapely.get_coordinates(shapely.get_point(linhas, -1))
+    if vertices is not None and not vertices.empty:
+        snap = SnapVertices.de_geometrias(vertices)
+        _, ways["source"] = snap.consultar_xy(ini, max_distance=tol_vertice)
+        _, ways["target"] = snap.consultar_xy(fim, max_distance=tol_vertice)
+
+    # geometria por último, como nas camadas lidas de GeoJSON
+    ordem = [c for c in ways.columns if c != ways.geometry.name] + [ways.geometry.name]
+    return ways[ordem].to_crs(EPSG_LATLON)
+
+
+def ler_ways(pasta="dados") -> gpd.GeoDataFrame:
+    """Lê os arquivos de :func:`fontes` e monta ``ways``."""
+    arq = fontes(pasta)
+    nomes = ler_camada(arq["nomes"]) if "nomes" in arq else None
+    return montar_ways(ler_camada(arq["ways"]), ler_camada(arq["vertices"]),
+                       ler_camada(arq["cenarios"]), nomes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pasta", default="dados")
+    args = parser.parse_args()
+    ways = ler_ways(args.pasta)
+    print(f"{len(ways)} ruas, {int(ways['bool_cenario'].sum())} em cenários, "
+          f"{int(ways['name'].notna().sum())} com nome")
+    print(ways.groupby("cod_cenario", dropna=False).size().to_string())
+    if "source" in ways:
+        orfas = int(((ways["source"] < 0) | (ways["target"] < 0)).sum())
+        print(f"{orfas} ruas com extremidade sem vértice pgr (≤ {TOL_VERTICE} m)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# snapping.py
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import Transformer
+from scipy.spatial import cKDTree
+
+EPSG_METRIC = 32722      # UTM zona 22 S  (m)
+
+# ---------------------------------------------------------------------------------
+# Snapping de pontos na rua mais próxima com STRtree persistente.
+# A árvore é montada uma vez sobre as ruas projetadas; cada novo lote de
+# pontos (ex.: emoções coletadas no dia) é encaixado sem refazer o histórico.
+# ---------------------------------------------------------------------------------
+
+
+class SnapRuas:
+    """
+    Índice espacial (STRtree) das ruas em EPSG:32722.
+
+    ``snap(pts)`` devolve, para cada ponto, a posição da rua mais próxima
+    (``idx_rua``, rótulo do índice de ``ruas``), a distância em metros e a
+    posição ao longo da linha (``pos_rua``, m a partir do início).
+    """
+
+    def __init__(self, ruas, max_distance=100, epsg=EPSG_METRIC):
+        self.epsg = epsg
+        self.max_distance = max_distance
+        self.ruas = ruas.to_crs(epsg)
+        self.linhas = self.ruas.geometry.values
+        self.tree = shapely.STRtree(self.linhas)
+
+    def snap(self, pts) -> pd.DataFrame:
+        """Rua mais próxima (≤ ``max_distance``) de cada ponto de ``pts``."""
+        geoms = pts.to_crs(self.epsg).geometry.values
+        (i_pt, i_rua), dist = self.tree.query_nearest(
+            geoms, max_distance=self.max_distance,
+            return_distance=True, all_matches=False,
+        )
+        n = len(geoms)
+        dist_all = np.full(n, np.nan)
+        pos = np.full(n, np.nan)
+        dist_all[i_pt] = dist
+        pos[i_pt] = shapely.line_locate_point(self.linhas[i_rua], geoms[i_pt])
+        idx = pd.Series(np.nan, index=pts.index, dtype=object)
+        idx.iloc[i_pt] = self.ruas.index.values[i_rua]
+        return pd.DataFrame(
+            {"idx_rua": idx.infer_objects(), "dist": dist_all, "pos_rua": pos},
+            index=pts.index,
+        )
+
+    def sjoin(self, pts, colunas):
+        """
+        Equivalente a ``gpd.sjoin_nearest(pts, ruas[colunas], how='left',
+        distance_col='dist', max_distance=...)`` (com ``index_right`` já
+        renomeado para ``idx_rua``), em EPSG:32722, uma linha por ponto.
+        """
+        snap = self.snap(pts)
+        res = pts.to_crs(self.epsg)
+        attrs = self.ruas[colunas].reindex(snap["idx_rua"].values)
+        attrs.index = res.index
+        comuns = set(colunas) & set(res.columns)
+        res = res.rename(columns={c: f"{c}_left" for c in comuns})
+        attrs = attrs.rename(columns={c: f"{c}_right" for c in comuns})
+        res["idx_rua"] = snap["idx_rua"]
+        for c in attrs.columns:
+            res[c] = attrs[c]
+        res["dist"] = snap["dist"]
+        res["pos_rua"] = snap["pos_rua"]
+        return res
+
+
+# ---------------------------------------------------------------------------------
+# Vértice mais próximo (ponto ➜ ponto) com KD-tree.
+# Usado para encaixar origem/destino de rotas nos vértices do grafo e nas
+# buscas ponto ➜ ponto de build_layers, no lugar de sjoin_nearest.
+# ---------------------------------------------------------------------------------
+
+
+class SnapVertices:
+    """
+    KD-tree (``scipy.spatial.cKDTree``) sobre pontos em EPSG:32722.
+
+    As consultas aceitam um ponto ou lotes, em lon/lat (``mais_proximo``),
+    já projetados (``consultar_xy``) ou como GeoDataFrame
+    (``consultar``); devolvem ``(dist, idx)`` com ``idx == -1`` quando não
+    há vértice a menos de ``max_distance``.  ``idx`` é a posição em ``xy``
+    (ou na linha de ``gdf``): pontos sem coordenada (NaN, geometria vazia
+    ou não pontual) ficam fora da árvore mas não deslocam os demais, e
+    consultar um deles devolve ``-1``.
+    """
+
+    def __init__(self, xy, epsg=EPSG_METRIC):
+        self.epsg = epsg
+        self.xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        self._validos = np.flatnonzero(np.isfinite(self.xy).all(axis=1))
+        self.tree = cKDTree(self.xy[self._validos])
+        self._para_metrico = Transformer.from_crs(4326, epsg, always_xy=True)
+
+    @classmethod
+    def de_geometrias(cls, gdf, epsg=EPSG_METRIC):
+        return cls(_xy(gdf.to_crs(epsg).geometry.values), epsg)
+
+    def consultar_xy(self, xy, k=1, max_distance=np.inf):
+        xy = np.asarray(xy, dtype=float)
+        ok = np.isfinite(xy).all(axis=-1)
+        forma = xy.shape[:-1] + ((k,) if k > 1 else ())
+        dist = np.full(forma, np.inf)
+        idx = np.full(forma, -1, dtype=np.intp)
+        if ok.any():
+            d, i = self.tree.query(xy[ok], k=k, distance_upper_bound=max_distance)
+            achou = np.isfinite(d)
+            dist[ok] = d
+            idx[ok] = np.where(achou, self._validos[np.where(achou, i, 0)], -1)
+        return dist[()], idx[()]
+
+    def mais_proximo(self, lon, lat, k=1, max_distance=np.inf):
+        x, y = self._para_metrico.transform(np.asarray(lon, float), np.asarray(lat, float))
+        return self.consultar_xy(np.column_stack([np.ravel(x), np.ravel(y)]).squeeze(),
+                                 k=k, max_distance=max_distance)
+
+    def consultar(self, gdf, k=1, max_distance=np.inf):
+        xy = _xy(gdf.to_crs(self.epsg).geometry.values)
+        return self.consultar_xy(xy, k=k, max_distance=max_distance)
+
+
+def _xy(geoms) -> np.ndarray:
+    """
+    ``(n, 2)`` com x/y de cada geometria, uma linha por geometria.  Ao
+    contrário de ``shapely.get_coordinates`` (que pula vazias e achata as
+    multipartes) mantém o alinhamento: o que não é ponto vira NaN.
+    """
+    geoms = np.asarray(geoms, dtype=object)
+    xy = np.full((len(geoms), 2), np.nan)
+    pt = (shapely.get_type_id(geoms) == 0) & ~shapely.is_empty(geoms)
+    xy[pt, 0] = shapely.get_x(geoms[pt])
+    xy[pt, 1] = shapely.get_y(geoms[pt])
+    return xy
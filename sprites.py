@@ -0,0 +1,97 @@
+# sprites.py
+import base64
+import functools
+import hashlib
+import io
+import os
+
+import branca
+from PIL import Image
+
+# ---------------------------------------------------------------------------------
+# Atlas (sprite sheet) dos emojis de ``dados/Lista_Final_Emojis``.
+# Os PNGs (320×320, 10–40 KB cada) são reduzidos ao tamanho de exibição e
+# colados numa única faixa horizontal; os marcadores usam ``L.divIcon`` com
+# uma classe CSS que aponta o ``background-position`` do emoji no atlas.
+# O navegador baixa e decodifica uma imagem só, seja qual for o nº de pontos.
+# ---------------------------------------------------------------------------------
+
+LADO = 20                # px – tamanho de exibição do ícone
+ESCALA = 2               # pixels do atlas por px exibido (telas HiDPI)
+MAX_ATLAS = 8            # atlas em memória (repositório × tamanho × URL × versão)
+
+
+def _assinatura(icon_repo):
+    """``[(cod, caminho)]`` dos PNGs + hash de nomes/mtimes (invalida o cache)."""
+    arqs = sorted((int(f[:-4]), os.path.join(icon_repo, f))
+                  for f in os.listdir(icon_repo) if f.endswith(".png") and f[:-4].isdigit())
+    h = hashlib.sha1(repr([(c, os.path.getmtime(p)) for c, p in arqs]).encode())
+    return arqs, h.hexdigest()[:12]
+
+
+def montar_atlas(icon_repo, lado=LADO, escala=ESCALA):
+    """Imagem RGBA com os emojis lado a lado e ``{cod: coluna}``."""
+    arqs, _ = _assinatura(icon_repo)
+    px = lado * escala
+    img = Image.new("RGBA", (px * max(len(arqs), 1), px), (0, 0, 0, 0))
+    colunas = {}
+    for i, (cod, caminho) in enumerate(arqs):
+        with Image.open(caminho) as ic:
+            img.paste(ic.convert("RGBA").resize((px, px), Image.LANCZOS), (i * px, 0))
+        colunas[cod] = i
+    return img, colunas
+
+
+def atlas(icon_repo, lado=LADO, escala=ESCALA, url=None) -> dict:
+    """
+    ``{'url', 'lado', 'largura', 'posicoes'}``: ``posicoes[cod]`` é o
+    deslocamento horizontal (px exibidos) do emoji no atlas.  Sem ``url``
+    o PNG vai embutido em base64; o resultado fica em memória até algum
+    ícone do repositório mudar (os ``MAX_ATLAS`` mais recentes).
+    """
+    _, versao = _assinatura(icon_repo)
+    return _atlas(os.path.abspath(icon_repo), lado, escala, url, versao)
+
+
+@functools.lru_cache(maxsize=MAX_ATLAS)
+def _atlas(icon_repo, lado, escala, url, versao):
+    img, colunas = montar_atlas(icon_repo, lado, escala)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    if url is None:
+        url = "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+    return {
+        "url": url,
+        "lado": lado,
+        "largura": lado * len(colunas),
+        "posicoes": {c: i * lado for c, i in colunas.items()},
+        "png": buf.getvalue(),
+    }
+
+
+def salvar_atlas(icon_repo, pasta, url_base, lado=LADO, escala=ESCALA) -> dict:
+    """Grava ``sprite.png`` em ``pasta`` (servido como estático) e devolve o atlas com essa URL."""
+    _, versao = _assinatura(icon_repo)
+    url = f"{url_base}/sprite.png?v={versao}"
+    at = atlas(icon_repo, lado, escala, url=url)
+    os.makedirs(pasta, exist_ok=True)
+    destino = os.path.join(pasta, "sprite.png")
+    atual = None
+    if os.path.exists(destino):
+        with open(destino, "rb") as f:
+            atual = f.read()
+    if atual != at["png"]:
+        with open(destino, "wb") as f:
+            f.write(at["png"])
+    return at
+
+
+def css_atlas(at) -> branca.element.Element:
+    """Classes ``.emoji-sprite`` e ``.emoji-<cod>`` para o ``<head>`` do mapa."""
+    regras = [
+        f".emoji-sprite{{width:{at['lado']}px;height:{at['lado']}px;"
+        f"background-image:url('{at['url']}');background-repeat:no-repeat;"
+        f"background-size:{at['largura']}px {at['lado']}px;}}"
+    ]
+    regras += [f".emoji-{c}{{background-position:-{x}px 0;}}" for c, x in at["posicoes"].items()]
+    return branca.element.Element("<style>" + "".join(regras) + "</style>")
@@ -1,9 +1,15 @@
+import contextlib
+import functools
+import os
+
 import streamlit as st
-import geopandas as gpd
-import pandas as pd
+import streamlit.components.v1 as components
 from streamlit_folium import st_folium
-from build_layers import build_layers
+from build_layers import CAMADAS
+from ingestao import ler_camada
+from layer_cache import build_layers_cache, hash_arquivos
 from map_functions import (
+    base_estatica,
     make_base_map,
     emoc_indiv,
     emoc_modal,
@@ -11,43 +17,152 @@ from map_functions import (
     emoc_faixa,
     emoc_genero,
     vias_valencia,
+    rota_emocional,
+    paradas_roteiro,
 )
+from clusters import ClustersEmoji
+from compartilhado import STORE_DIR, deposito
+from contraction import hierarquias
+from densidade import DensidadeKDE
+from esquema import compactar
+from geocoder import GeocodificadorLocal
+from rastreio import coletar, etapa
+from registro import Registro
+from render_cache import CacheMapas, chave_mapa
+from roteiro import matriz_pontos, planejar
+from routing import GrafoRuas
+from ruas import fontes as fontes_ways, ler_ways
+from vector_tiles import gerar_tiles
 
 DATA_PATH = "dados"  # pasta com GeoJSON/CSV
 ICON_REPO = f"{DATA_PATH}/Lista_Final_Emojis/"
 
 st.set_page_config(page_title="Mapas Emocionais – Mobilidade Urbana", layout="wide", page_icon="🗺️")
 
+# Painel de perfil (admin): EMOC_ADMIN=1 no ambiente ou ?admin=1 na URL.
+# Desligado, as etapas de rastreio.py não registram nada.
+ADMIN = os.environ.get("EMOC_ADMIN") == "1" or st.query_params.get("admin") == "1"
+PERFIL = (coletar(memoria=st.session_state.get("perfil_memoria", False)) if ADMIN
+          else contextlib.nullcontext())
+
 # ────────────────────────── CARREGAMENTO DE DADOS ──────────────────────────
-@st.cache_data(show_spinner="Lendo camadas …")
-def load_data():
-    files = {
-        "emoji": "emoji_emoc.csv",
-        "modais": "modais.csv",
-        "cenarios": "cenarios.geojson",
-        "participantes": "participantes.csv",
-        "emoc": "emocoes_coletadas.geojson",
-        "pts_cenarios": "pts_cenarios.geojson",
-        "ways": "ways.geojson",
-    }
-    gdfs = {}
-    for k, f in files.items():
-        p = f"{DATA_PATH}/{f}"
-        if f.endswith(".csv"):
-            gdfs[k] = pd.read_csv(p)
-        else:
-            g = gpd.read_file(p)
-            if not g.crs or g.crs.to_epsg() != 4326:
-                g = g.to_crs(4326)
-            gdfs[k] = g
-    return gdfs
-
-DATA = load_data()
-DATA.update(build_layers({
-    "ways": DATA["ways"],
-    "emoc": DATA["emoc"],
-    "emoji": DATA["emoji"],
-}))
+FILES = {
+    "emoji": "emoji_emoc.csv",
+    "modais": "modais.csv",
+    "cenarios": "cenarios.geojson",
+    "participantes": "participantes.csv",
+    "emoc": "emocoes_coletadas.geojson",
+    "pts_cenarios": "pts_cenarios.geojson",
+    "ways": "ruas_cenarios.geojson",   # + vértices e cenários: montada em ruas.py
+    "vertices": "ways_vertices_pgr.geojson",
+}
+
+def _fontes(nome):
+    """Arquivos de origem de uma entrada (``ways`` depende de três)."""
+    return fontes_ways(DATA_PATH) if nome == "ways" else {nome: f"{DATA_PATH}/{FILES[nome]}"}
+
+def _ler(nome):
+    # GeoParquet de dados/parquet/ quando existir (python -m ingestao)
+    camada = ler_ways(DATA_PATH) if nome == "ways" else ler_camada(f"{DATA_PATH}/{FILES[nome]}")
+    return {nome: compactar(camada, nome)}
+
+# Cada entrada num depósito Arrow mapeado em memória (compartilhado.py):
+# uma cópia nas páginas do SO para todas as sessões e processos do
+# servidor.  Lida só quando alguma página ou camada derivada pede.
+@st.cache_resource(show_spinner="Lendo camadas …")
+def load_entrada(nome):
+    chave = hash_arquivos({**_fontes(nome), "__esquema__": "esquema.py"})
+    return deposito(chave, lambda: _ler(nome), raiz=f"{STORE_DIR}/{nome}")[nome]
+
+def entradas():
+    """Registro só das entradas (lidas sob demanda)."""
+    reg = Registro()
+    for nome in FILES:
+        reg.registrar(nome, functools.partial(load_entrada, nome))
+    return reg
+
+LAYER_INPUTS = ("ways", "emoc", "emoji", "modais", "cenarios", "participantes")
+
+# Camadas derivadas: uma vez por processo (cache_resource) e, entre
+# reinícios, lidas do cache em disco enquanto as entradas não mudarem
+# (com o cache válido as entradas nem são lidas).
+@st.cache_resource(show_spinner="Construindo camadas …")
+def load_layers():
+    fontes = {k: p for nome in LAYER_INPUTS for k, p in _fontes(nome).items()}
+    return build_layers_cache(entradas(), fontes)
+
+# centro, GeoJSON e legenda dos cenários – fixos entre reruns
+@st.cache_resource
+def load_base_mapa():
+    return base_estatica(entradas())
+
+# mapas de calor: KDE em grade UTM, PNG em cache por combinação de filtros
+@st.cache_resource
+def load_densidade():
+    layers = load_layers()
+    return DensidadeKDE(layers["emoc_fato"], layers.get("emoc_indice"))
+
+# hierarquia de clusters dos marcadores (z14–16), mascarada por filtro
+@st.cache_resource
+def load_clusters():
+    layers = load_layers()
+    return ClustersEmoji(layers["emoc_fato"], layers.get("emoc_indice"))
+
+# pontos e vias como tiles vetoriais em static/tiles (sem isso, GeoJSON no HTML)
+@st.cache_resource(show_spinner="Gerando tiles …")
+def load_tiles():
+    if not st.get_option("server.enableStaticServing"):
+        return None
+    return gerar_tiles(load_layers(), ICON_REPO)
+
+# Grafo de roteamento (CSR) das ruas + vértices pgr, um por processo
+@st.cache_resource(show_spinner="Montando grafo de ruas …")
+def load_grafo():
+    return GrafoRuas(load_entrada("ways"), load_entrada("vertices"),
+                     load_layers()["emoc_count_ways_vlc"])
+
+# Geocodificador offline: nomes de ruas + pontos de referência dos cenários
+@st.cache_resource(show_spinner="Indexando endereços …")
+def load_geocoder():
+    return GeocodificadorLocal(load_entrada("ways"), load_entrada("pts_cenarios"),
+                               load_entrada("cenarios"))
+
+# Contraction Hierarchies por perfil, pré-processadas em dados/.cache/ch
+@st.cache_resource(show_spinner="Pré-processando rotas …")
+def load_hierarquias():
+    return hierarquias(load_grafo())
+
+# Matriz de custos entre os pontos de referência dos cenários, por perfil
+# (Dijkstra muitos-para-muitos, gravada em dados/.cache/roteiro)
+@st.cache_resource(show_spinner="Calculando matriz do roteiro …")
+def load_matriz_roteiro(perfil):
+    return matriz_pontos(load_grafo(), load_entrada("pts_cenarios"), perfil)
+
+# HTML final dos mapas por (visualização, filtros), compartilhado entre sessões
+@st.cache_resource
+def load_cache_mapas():
+    return CacheMapas()
+
+# Camadas sob demanda: nada é lido nem construído até uma página pedir.
+# As funções de carga são cache_resource; o registro só evita repetir a
+# busca dentro do rerun.
+DATA = entradas()
+DATA.registrar(CAMADAS, load_layers)
+DATA.registrar("base_mapa", load_base_mapa)
+DATA.registrar("densidade", load_densidade)
+DATA.registrar("emoc_cluster", load_clusters)
+DATA.registrar("tiles", load_tiles)
+
+# Dependências de cada página, carregadas antes de desenhá-la; camadas só
+# de alguns mapas (densidade, clusters, tiles) vêm no primeiro uso.
+PAGINAS = {
+    "Explorar Mapas": ("emoji", "modais", "cenarios", "base_mapa", "emoc_fato", "emoc_indice",
+                       "emoc_ways_vlc_rua"),
+    "Realizar Consultas": ("emoji", "participantes", "base_mapa", "emoc_fato", "emoc_indice",
+                           "emoc_ways_vlc_rua"),
+    "Navegação": ("cenarios", "pts_cenarios", "base_mapa", "emoc_ways_vlc_rua"),
+    "Sobre": (),
+}
 
 # ────────────────────────── LISTAS AUXILIARES ──────────────────────────
 
@@ -72,8 +187,43 @@ def lista_faixa():
 def lista_val_vias():
     return [""] + sorted(DATA["emoc_ways_vlc_rua"].vlc_maior_text.dropna().unique())
 
+PERFIS_NAV = {
+    "Equilibrada": "emocional",
+    "Mais curta": "curta",
+    "Menos negativa": "menos_negativa",
+    "Mais positiva": "mais_positiva",
+}
+
 # ────────────────────────── INTERFACE ──────────────────────────
 
+def exibir_mapa(visao, params, desenhar, height=700):
+    """Mapa base + ``desenhar(m)``, renderizado uma vez por (visão, params) canônicos."""
+    def construir():
+        m = make_base_map(DATA)
+        desenhar(m)
+        return m
+    html = load_cache_mapas().html(chave_mapa(visao, **params), construir)
+    with etapa("iframe", len(html)):
+        if hasattr(st, "iframe"):       # components.v1.html está obsoleto nas versões novas
+            st.iframe(html, height=height)
+        else:
+            components.html(html, height=height)
+
+
+def painel_perfil(coletor):
+    """Etapas do rerun atual (tempo, linhas, bytes) + exportação JSON / Chrome trace."""
+    with st.sidebar.expander("Perfil da execução", expanded=True):
+        st.checkbox("Medir memória (tracemalloc, mais lento)", key="perfil_memoria")
+        resumo = coletor.resumo()
+        total = sum(ev["duracao_ms"] for ev in coletor.eventos if ev["pai"] is None)
+        st.caption(f"{len(coletor.eventos)} etapas · {total:.0f} ms nas etapas de topo")
+        st.caption("Camadas carregadas: " + (", ".join(DATA.carregadas()) or "nenhuma"))
+        st.dataframe(resumo, hide_index=True)
+        st.download_button("Baixar JSON", coletor.json(), "perfil.json", "application/json")
+        st.download_button("Baixar Chrome trace", coletor.chrome_trace(), "perfil.trace.json",
+                           "application/json")
+
+
 def page_explorar():
     st.header("Explorar Mapas")
     view = st.selectbox(
@@ -84,88 +234,32 @@ def page_explorar():
             "Valência nas vias",
         ), key="view_exp")
 
-    m = make_base_map(DATA)
-
     if view == "Emoção individual":
         e = st.selectbox("Emoção", lista_emoc(), key="emo_sel")
-        if e:
-            emoc_indiv(DATA, e, m, ICON_REPO)
+        exibir_mapa(view, {"emocao": e},
+                    lambda m: e and emoc_indiv(DATA, e, m, ICON_REPO))
 
     elif view == "Modal + Valência":
         mdl = st.selectbox("Modal", lista_mdl(), key="mdl_sel")
         val = st.multiselect("Valências", lista_valencia(), key="val_modal")
-        emoc_modal(DATA, mdl, val, m, ICON_REPO)
+        exibir_mapa(view, {"nome": mdl, "valencia": val},
+                    lambda m: emoc_modal(DATA, mdl, val, m, ICON_REPO))
 
     elif view == "Cenário":
         c = st.selectbox("Cenário", lista_cenarios(), key="cnr_sel")
-        if c:
-            emoc_cenario(DATA, c, m, ICON_REPO)
+        exibir_mapa(view, {"referencia": c},
+                    lambda m: c and emoc_cenario(DATA, c, m, ICON_REPO))
 
     else:  # Valência nas vias
         vlc = st.multiselect("Valências", lista_val_vias(), key="val_via")
-        if vlc:
-            vias_valencia(DATA, vlc, m)
-
-    st_folium(m, use_container_width=True, height=700)
+        exibir_mapa(view, {"vlc_maior_text": vlc},
+                    lambda m: vlc and vias_valencia(DATA, vlc, m))
 
 
 def page_consultas():
     st.header("Realizar Consultas")
     tab_pt, tab_ln = st.tabs(["Por Pontos", "Por Linhas"])
 
-    with tab_pt:
-        col1, col2 = st.columns(2)
-        with col1:
-            faixa = st.selectbox("Faixa etária", lista_faixa(), key="faixa_q")
-            val = st.multiselect("Valências", lista_valencia(), key="val_pt1")
-            if st.button("Filtrar pontos", key="btn_pt1") and faixa:
-                m = make_base_map(DATA)
-                emoc_faixa(DATA, faixa, val, m, ICON_REPO)
-                st_folium(m, use_container_width=True, height=600)
-        with col2:
-            gen = st.selectbox("Gênero", lista_genero(), key="gen_q")
-            val2 = st.multiselect("Valências", lista_valencia(), key="val_pt2")
-            if st.button("Filtrar por gênero", key="btn_pt2") and gen:
-                m = make_base_map(DATA)
-                emoc_genero(DATA, gen, val2, m, ICON_REPO)
-                st_folium(m, use_container_width=True, height=600)
-
-    with tab_ln:
-        vlc = st.multiselect("Valência das vias", lista_val_vias(), key="val_ln")
-        if st.button("Filtrar vias", key="btn_ln") and vlc:
-            m = make_base_map(DATA)
-            vias_valencia(DATA, vlc, m)
-            st_folium(m, use_container_width=True, height=600)
-
-
-def page_nav():
-    st.header("Navegação – rotas sugeridas")
-    st.info("Funcionalidade em desenvolvimento.")
-
-
-def page_sobre():
-    st.header("Sobre o Projeto")
-    st.markdown(
-        """
-        **Mapas Emocionais no Contexto da Mobilidade Urbana** investiga a percepção
-        emocional de diferentes públicos em trajetos urbanos.
-
-        Dados coletados via questionário, integrados ao OpenStreetMap.
-        """
-    )
-
-# ────────────────────────── MENU LATERAL ──────────────────────────
-
-st.sidebar.markdown("## 🗺️ Mapas Emocionais\n### Mobilidade Urbana")
-choice = st.sidebar.radio("Menu", ["Explorar Mapas", "Realizar Consultas", "Sobre"], index=0)
-
-if choice == "Explorar Mapas":
-    page_explorar()
-# ───────── Página: Realizar Consultas ─────────
-elif choice == "Realizar Consultas":
-    st.header("Realizar Consultas")
-    tab_pt, tab_ln = st.tabs(["Por Pontos", "Por Linhas"])
-
     # ---------- POR PONTOS ----------
     with tab_pt:
         col1, col2 = st.columns(2)
@@ -181,14 +275,14 @@ elif choice == "Realizar Consultas":
             with st.form(key="form_faixa"):
                 submit_faixa = st.form_submit_button("Filtrar pontos")
 
-            if submit_faixa:
+            if submit_faixa and faixa:
                 st.session_state["faixa_result"] = (faixa, val)
 
             if "faixa_result" in st.session_state:
                 faixa_sel, val_sel = st.session_state["faixa_result"]
-                m = make_base_map(DATA)
-                emoc_faixa(DATA, faixa_sel, val_sel, m, ICON_REPO)
-                st_folium(m, height=600, use_container_width=True)
+                exibir_mapa("Faixa etária", {"faixa_etaria": faixa_sel, "valencia": val_sel},
+                            lambda m: emoc_faixa(DATA, faixa_sel, val_sel, m, ICON_REPO),
+                            height=600)
 
         # --- Gênero ---
         with col2:
@@ -200,14 +294,14 @@ elif choice == "Realizar Consultas":
             with st.form(key="form_genero"):
                 submit_gen = st.form_submit_button("Filtrar por gênero")
 
-            if submit_gen:
+            if submit_gen and gen:
                 st.session_state["gen_result"] = (gen, val2)
 
             if "gen_result" in st.session_state:
                 gen_sel, val2_sel = st.session_state["gen_result"]
-                m = make_base_map(DATA)
-                emoc_genero(DATA, gen_sel, val2_sel, m, ICON_REPO)
-                st_folium(m, height=600, use_container_width=True)
+                exibir_mapa("Gênero", {"genero": gen_sel, "valencia": val2_sel},
+                            lambda m: emoc_genero(DATA, gen_sel, val2_sel, m, ICON_REPO),
+                            height=600)
 
     # ---------- POR LINHAS ----------
     with tab_ln:
@@ -218,9 +312,176 @@ elif choice == "Realizar Consultas":
 
         if "vias_result" in st.session_state:
             vlc_sel = st.session_state["vias_result"]
-            m = make_base_map(DATA)
-            vias_valencia(DATA, vlc_sel, m)
-            st_folium(m, height=600)
+            exibir_mapa("Valência nas vias", {"vlc_maior_text": vlc_sel},
+                        lambda m: vias_valencia(DATA, vlc_sel, m), height=600)
+
+
+def page_nav():
+    st.header("Navegação – rotas sugeridas")
+    perfil = st.radio("Perfil da rota", list(PERFIS_NAV), horizontal=True, key="nav_perfil")
+    tab_rota, tab_roteiro = st.tabs(["Rota", "Roteiro pelos cenários"])
+    with tab_rota:
+        nav_rota(PERFIS_NAV[perfil])
+    with tab_roteiro:
+        nav_roteiro(PERFIS_NAV[perfil])
+
+
+def nav_rota(perfil):
+    grafo = load_grafo()
+    geo = load_geocoder()
+    col1, col2 = st.columns(2)
+    if geo.tem_ruas:
+        with col1:
+            loc_1 = endereco(geo, "Partida", "nav_orig")
+        with col2:
+            loc_2 = endereco(geo, "Chegada", "nav_dest")
+    else:
+        # sem nomes de ruas nos dados (ways.name vazio) o texto livre só acharia
+        # os pontos de referência: escolhe-se direto entre eles, e a chegada
+        # fica restrita ao trecho da rede da partida
+        st.caption("Os dados não trazem nomes de ruas: partida e chegada são pontos de "
+                   "referência dos cenários, e a chegada lista só os ligados à partida.")
+        refs = {r["rotulo"]: r for r in geo.referencias()}
+        trecho = dict(zip(refs, grafo.trecho([r["lon"] for r in refs.values()],
+                                             [r["lat"] for r in refs.values()]).tolist()))
+        with col1:
+            loc_1 = refs[st.selectbox("Partida", list(refs), key="nav_orig_ref")]
+        chegadas = [r for r in refs
+                    if r != loc_1["rotulo"] and trecho[r] == trecho[loc_1["rotulo"]]]
+        with col2:
+            loc_2 = refs[st.selectbox("Chegada", chegadas, key="nav_dest_ref")] \
+                if chegadas else None
+        if not chegadas:
+            st.warning("Nenhum outro ponto de referência está ligado a esta partida pela rede "
+                       f"de ruas carregada ({grafo.n_trechos} trechos sem ligação entre si).")
 
-else:
-    page_sobre()
+    m = make_base_map(DATA)
+    vias_valencia(DATA, lista_val_vias()[1:], m)
+    if loc_1 is not None and loc_2 is not None:
+        o, d = geo.vertice(loc_1, grafo), geo.vertice(loc_2, grafo)
+        st.caption(f"Partida: {loc_1['rotulo']} · Chegada: {loc_2['rotulo']}")
+        mesmo_trecho = grafo.mesmo_trecho(o, d)
+        rota = load_hierarquias()[perfil].rota(o, d) if mesmo_trecho else None
+        if rota is not None:
+            st.caption(f"Extensão da rota: {rota['comprimento']:.0f} m")
+            rota_emocional(grafo.geometria(rota), m,
+                           origem=[loc_1["lat"], loc_1["lon"]],
+                           destino=[loc_2["lat"], loc_2["lon"]])
+        elif mesmo_trecho:
+            st.warning("Não há caminho na rede de ruas entre os pontos escolhidos.")
+        else:
+            aviso_trechos(grafo, geo, o, loc_1["rotulo"])
+    with etapa("st_folium"):
+        st_folium(m, use_container_width=True, height=700, key="mapa_rota")
+
+
+def endereco(geo, rotulo, key):
+    """Texto livre ➜ candidato do geocodificador; pergunta qual quando os melhores empatam."""
+    texto = st.text_input(rotulo, placeholder="rua ou ponto de referência", key=key)
+    if not texto:
+        return None
+    cands = geo.candidatos(texto)
+    if not cands:
+        st.warning(f"Endereço não encontrado: {texto}")
+        return None
+    if len(cands) > 1:
+        i = st.selectbox(f"Mais de um resultado para “{texto}”", range(len(cands)),
+                         format_func=lambda i: cands[i]["rotulo"], key=f"{key}_qual")
+        return cands[i]
+    return cands[0]
+
+
+def aviso_trechos(grafo, geo, origem, rotulo):
+    """Explica por que não há rota e lista as chegadas no trecho da partida."""
+    ref = geo.tabela[geo.tabela["tipo"] == "referência"]
+    no_trecho = grafo.trecho(ref["lon"].to_numpy(), ref["lat"].to_numpy()) \
+        == grafo.componente[origem]
+    alcance = [r for r in ref["rotulo"][no_trecho] if r != rotulo]
+    st.warning(
+        "Partida e chegada ficam em trechos da rede sem ligação entre si: só as ruas "
+        f"dos cenários estão carregadas e elas formam {grafo.n_trechos} trechos "
+        "separados. " + ("Chegadas possíveis a partir desta partida: " + "; ".join(alcance)
+                         if alcance else "Nenhum outro ponto de referência fica neste trecho."))
+
+
+def nav_roteiro(perfil):
+    pts = DATA["pts_cenarios"].merge(
+        DATA["cenarios"][["cod_cenario", "referencia"]], on="cod_cenario", how="left")
+    rotulos = (pts["referencia"].astype(str) + " – " + pts["pt_referencia"].astype(str)).tolist()
+    # a rede só tem as ruas dos cenários e se parte em trechos sem ligação:
+    # o roteiro escolhe pontos de um mesmo trecho (com ao menos dois pontos)
+    grafo = load_grafo()
+    trecho = grafo.trecho(pts.geometry.x.to_numpy(), pts.geometry.y.to_numpy())
+    trechos = {}
+    for t in dict.fromkeys(trecho.tolist()):
+        no_trecho = trecho == t
+        if no_trecho.sum() >= 2:
+            nome = " / ".join(pts.loc[no_trecho, "referencia"].astype(str).unique())
+            trechos[nome] = [r for r, ok in zip(rotulos, no_trecho) if ok]
+    st.caption(f"Só as ruas dos cenários estão carregadas e elas formam {grafo.n_trechos} "
+               "trechos sem ligação entre si; um roteiro visita pontos de um mesmo trecho.")
+    nome_trecho = st.selectbox("Trecho da rede", list(trechos), key="rot_trecho")
+    sel = st.multiselect("Pontos a visitar", trechos.get(nome_trecho, []),
+                         key=f"rot_pontos_{nome_trecho}")
+    col1, col2 = st.columns(2)
+    with col1:
+        inicio = st.selectbox("Começar em", sel, key="rot_inicio") if sel else None
+    with col2:
+        retorno = st.checkbox("Voltar ao início", key="rot_retorno")
+
+    m = make_base_map(DATA)
+    vias_valencia(DATA, lista_val_vias()[1:], m)
+    if len(sel) >= 2:
+        idx = [rotulos.index(inicio)] + [rotulos.index(r) for r in sel if r != inicio]
+        rot = planejar(grafo, load_matriz_roteiro(perfil), idx, perfil, retorno=retorno, tempo=1)
+        if rot is None:
+            st.warning("O otimizador não encontrou um roteiro.")
+        else:
+            st.caption(f"Extensão do roteiro: {rot['comprimento']:.0f} m")
+            if rot["sem_caminho"]:
+                st.warning("Sem caminho na rede de ruas entre: " + "; ".join(
+                    f"{rotulos[i]} → {rotulos[j]}" for i, j in rot["sem_caminho"]))
+            arestas = [a for t in rot["trechos"] for a in t["arestas"]]
+            rota_emocional(grafo.geometria({"arestas": arestas}), m, nome="Roteiro")
+            ordem = rot["ordem"][:-1] if retorno else rot["ordem"]
+            paradas_roteiro([(pts.geometry.iloc[i].y, pts.geometry.iloc[i].x, rotulos[i])
+                             for i in ordem], m)
+    with etapa("st_folium"):
+        st_folium(m, use_container_width=True, height=700, key="mapa_roteiro")
+
+
+def page_sobre():
+    st.header("Sobre o Projeto")
+    st.markdown(
+        """
+        **Mapas Emocionais no Contexto da Mobilidade Urbana** investiga a percepção
+        emocional de diferentes públicos em trajetos urbanos.
+
+        Dados coletados via questionário, integrados ao OpenStreetMap.
+        """
+    )
+
+# ────────────────────────── MENU LATERAL ──────────────────────────
+
+st.sidebar.markdown("## 🗺️ Mapas Emocionais\n### Mobilidade Urbana")
+choice = st.sidebar.radio("Menu", list(PAGINAS), index=0)
+
+with PERFIL:
+    DATA.carregar(*PAGINAS[choice])
+    if choice == "Explorar Mapas":
+        page_explorar()
+    elif choice == "Realizar Consultas":
+        page_consultas()
+    elif choice == "Navegação":
+        page_nav()
+    else:
+        page_sobre()
+
+with st.sidebar.expander("Cache de mapas"):
+    est = load_cache_mapas().estatisticas()
+    st.caption(f"{est['entradas']} mapas · {est['bytes'] / 1024 ** 2:.1f} de "
+               f"{est['max_bytes'] / 1024 ** 2:.0f} MB · {est['hits']} hits / {est['misses']} misses "
+               f"({est['taxa_hit']:.0%}) · {est['descartes']} descartados")
+
+if ADMIN:
+    painel_perfil(PERFIL)
\ No newline at end of file
@@ -0,0 +1,64 @@
+# tests/conftest.py
+"""
+Entradas de ``dados/`` lidas como no app (``ingestao.ler_camada`` +
+``esquema.compactar``), compartilhadas pelos testes da sessão.
+
+Uso (na raiz do repositório):
+
+    python -m pytest -q
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from build_layers import build_layers  # noqa: E402
+from esquema import compactar  # noqa: E402
+from ingestao import ler_camada  # noqa: E402
+from routing import GrafoRuas  # noqa: E402
+from ruas import ler_ways  # noqa: E402
+
+DATA_PATH = os.path.join(RAIZ, "dados")
+FILES = {
+    "emoji": "emoji_emoc.csv",
+    "modais": "modais.csv",
+    "cenarios": "cenarios.geojson",
+    "participantes": "participantes.csv",
+    "emoc": "emocoes_coletadas.geojson",
+    "pts_cenarios": "pts_cenarios.geojson",
+    "vertices": "ways_vertices_pgr.geojson",
+}
+
+
+@pytest.fixture(scope="session")
+def raw():
+    entradas = {k: compactar(ler_camada(os.path.join(DATA_PATH, f)), k) for k, f in FILES.items()}
+    entradas["ways"] = compactar(ler_ways(DATA_PATH), "ways")
+    return entradas
+
+
+@pytest.fixture(scope="session")
+def layers(raw):
+    return build_layers(raw)
+
+
+@pytest.fixture(scope="session")
+def grafo(raw, layers):
+    return GrafoRuas(raw["ways"], raw["vertices"], layers["emoc_count_ways_vlc"])
+
+
+def dijkstra_ref(grafo, perfil, origens):
+    """Distâncias de referência (scipy) com os pesos do grafo."""
+    # arestas paralelas: fica a mais barata (csr_matrix somaria as duplicatas)
+    arestas = pd.DataFrame({"u": np.repeat(np.arange(grafo.n), np.diff(grafo.indptr)),
+                            "v": grafo.indices, "w": grafo.pesos(perfil)})
+    arestas = arestas.groupby(["u", "v"], as_index=False)["w"].min()
+    adj = csr_matrix((arestas["w"], (arestas["u"], arestas["v"])), shape=(grafo.n, grafo.n))
+    return dijkstra(adj, directed=True, indices=origens)
@@ -0,0 +1,73 @@
+# tests/test_build_layers.py
+import pandas as pd
+import pytest
+
+from build_layers import atualizar_layers, build_layers
+
+# camadas tabulares comparadas linha a linha (snap_ruas é o índice e
+# emoc_indice é derivado da fato)
+TABELAS = ["emoc_colec_ruas", "knn", "emoc_colec_hub", "contagem_emoji_rua",
+           "contagem_pivot", "emoc_count_ways_vlc", "emoc_ways_vlc_rua", "emoc_fato", "emoc_hex"]
+CHAVES = {"contagem_emoji_rua": ["osm_id", "cod_emoji"], "contagem_pivot": ["osm_id"],
+          "emoc_count_ways_vlc": ["osm_id"], "emoc_ways_vlc_rua": ["osm_id"],
+          "emoc_hex": ["tamanho_hex", "q", "r"]}
+
+
+def _canonica(df, nome):
+    df = pd.DataFrame(df).copy()
+    df.columns = [str(c) for c in df.columns]
+    chave = CHAVES.get(nome, ["fid"])
+    df = df.sort_values(chave).reset_index(drop=True)
+    if "geometry" in df:
+        df["geometry"] = df["geometry"].astype(str)       # WKT
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype(object)
+    return df[sorted(df.columns)]
+
+
+@pytest.fixture(scope="module")
+def incremental(raw):
+    corte = 900
+    antes = build_layers({**raw, "emoc": raw["emoc"].iloc[:corte]})
+    return atualizar_layers(antes, raw)
+
+
+@pytest.mark.parametrize("nome", TABELAS)
+def test_incremental_igual_a_reconstrucao(incremental, layers, nome):
+    pd.testing.assert_frame_equal(_canonica(incremental[nome], nome),
+                                  _canonica(layers[nome], nome), check_dtype=False)
+
+
+def test_indice_cobre_a_fato_inteira(incremental, layers):
+    assert incremental["emoc_indice"]["_n"] == layers["emoc_indice"]["_n"] == \
+        len(layers["emoc_fato"])
+
+
+def test_sem_pontos_novos_nao_muda_nada(layers, raw):
+    assert atualizar_layers(layers, raw) is layers
+
+
+# ----------------------------------------------------------
+# emoc_fato: chave sem par numa dimensão tira o ponto de toda consulta
+# ----------------------------------------------------------
+def test_chave_sem_par_sai_da_fato_inteira(raw):
+    from build_layers import emoc_fato
+    from emoc_index import filtrar, indice_emocoes
+
+    emoc = raw["emoc"].copy()
+    emoc["cod_modal"] = emoc["cod_modal"].astype("int16")
+    emoc.loc[0, "cod_modal"] = 99                     # modal inexistente
+    emoc["cod_part"] = emoc["cod_part"].astype(object)
+    emoc.loc[1, "cod_part"] = "ninguém"               # participante inexistente
+    fato = emoc_fato({**raw, "emoc": emoc})
+    fids = set(emoc.loc[[0, 1], "fid"])
+    assert not fids & set(fato["fid"])
+    assert len(fato) == len(emoc_fato(raw)) - 2
+
+    # some também de consultas que não filtram modal nem participante
+    dados = {"emoc_fato": fato, "emoc_indice": indice_emocoes(fato)}
+    cod = emoc.loc[0, "cod_emoji"]
+    por_emocao = filtrar(dados, emocao=fato.loc[fato["cod_emoji"] == cod, "emocao"].iloc[0])
+    assert not fids & set(por_emocao["fid"])
+    assert not fids & set(filtrar(dados)["fid"])
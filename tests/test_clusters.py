@@ -0,0 +1,51 @@
+# tests/test_clusters.py
+import numpy as np
+import pytest
+import shapely
+
+from clusters import ClustersEmoji
+from emoc_index import selecao
+
+
+def _sem_geometria(fato):
+    """Cópia com a 1ª linha sem geometria (None) e a 2ª com ponto vazio."""
+    fato = fato.copy()
+    geom = fato.geometry.values.copy()
+    geom[0], geom[1] = None, shapely.Point()
+    return fato.set_geometry(geom)
+
+
+@pytest.fixture(scope="module")
+def clusters(layers):
+    return ClustersEmoji(layers["emoc_fato"], layers["emoc_indice"])
+
+
+def test_geometria_ausente_fica_fora(layers):
+    fato = _sem_geometria(layers["emoc_fato"])
+    cl = ClustersEmoji(fato)
+    assert not cl._validos[:2].any() and cl._validos[2:].all()
+    for z, r in cl.rotulos.items():
+        assert (r[:2] == -1).all() and (r[2:] >= 0).all()
+        assert cl.grupos(z)["n"].sum() == len(fato) - 2
+    # as demais linhas continuam com as próprias coordenadas
+    np.testing.assert_allclose(cl.lon[2:], fato.geometry.x[2:], atol=1e-5)
+    np.testing.assert_allclose(cl.lat[2:], fato.geometry.y[2:], atol=1e-5)
+
+
+@pytest.mark.parametrize("filtros", [{}, {"valencia": ["Positivo"]}, {"genero": "Feminino"}])
+def test_grupos_somam_a_selecao(clusters, layers, filtros):
+    n = (selecao(layers, **filtros) & clusters._validos).sum()
+    for z in range(clusters.zmin, clusters.zmax + 1):
+        g = clusters.grupos(z, **filtros)
+        assert g["n"].sum() == g["contagens"].sum() == n
+        assert (g["n"] > 0).all()
+
+
+def test_hierarquia_aninhada(clusters):
+    # quem está junto num zoom continua junto no zoom de baixo
+    for z in range(clusters.zmin, clusters.zmax):
+        cima, baixo = clusters.rotulos[z + 1], clusters.rotulos[z]
+        validos = cima >= 0
+        pares = np.unique(np.column_stack([cima[validos], baixo[validos]]), axis=0)
+        assert len(np.unique(pares[:, 0])) == len(pares)
+        assert len(np.unique(baixo[validos])) <= len(np.unique(cima[validos]))
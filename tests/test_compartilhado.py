@@ -0,0 +1,86 @@
+# tests/test_compartilhado.py
+import os
+import subprocess
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+from geopandas.testing import assert_geodataframe_equal
+
+from compartilhado import MANIFESTO, abrir, deposito
+from conftest import RAIZ
+
+NOMES = ("emoc", "participantes", "emoji", "ways", "cenarios")
+
+
+@pytest.fixture
+def entradas(raw):
+    return {k: raw[k] for k in NOMES}
+
+
+def _contando(entradas):
+    n = {"chamadas": 0}
+
+    def carregar():
+        n["chamadas"] += 1
+        return entradas
+    return carregar, n
+
+
+def test_ida_e_volta(entradas, tmp_path):
+    carregar, n = _contando(entradas)
+    lidas = deposito("k1", carregar, raiz=str(tmp_path))
+    assert n["chamadas"] == 1
+    for nome, df in entradas.items():
+        if isinstance(df, gpd.GeoDataFrame):
+            assert_geodataframe_equal(lidas[nome], df)
+        else:
+            pd.testing.assert_frame_equal(lidas[nome], df)
+
+
+def test_segunda_abertura_so_mapeia(entradas, tmp_path):
+    carregar, n = _contando(entradas)
+    deposito("k1", carregar, raiz=str(tmp_path))
+    lidas = deposito("k1", carregar, raiz=str(tmp_path))
+    assert n["chamadas"] == 1
+    # colunas numéricas sem nulos apontam para o arquivo: somente leitura
+    assert not lidas["emoc"]["fid"].to_numpy().flags.writeable
+
+
+def test_geometrias_mistas_vazias_e_ausentes(tmp_path):
+    gdf = gpd.GeoDataFrame({"v": [1, 2, 3, 4]}, geometry=[
+        shapely.Point(1, 2), None, shapely.LineString([(0, 0), (1, 1)]), shapely.Point()],
+        crs=4326)
+    pts = gpd.GeoDataFrame({"v": [1, 2]}, geometry=shapely.points([(1, 2), (3, 4)]), crs=32722)
+    lidas = deposito("k", lambda: {"mista": gdf, "pontos": pts}, raiz=str(tmp_path))
+    assert_geodataframe_equal(lidas["mista"], gdf)
+    assert_geodataframe_equal(lidas["pontos"], pts)
+
+
+def test_chave_nova_substitui_a_antiga(entradas, tmp_path):
+    raiz = str(tmp_path)
+    deposito("velha", lambda: entradas, raiz=raiz)
+    os.makedirs(os.path.join(raiz, "nova.tmp123"))       # publicação em curso de outro processo
+    deposito("nova", lambda: entradas, raiz=raiz)
+    assert sorted(os.listdir(raiz)) == ["nova", "nova.tmp123"]
+
+
+def test_sem_escrita_devolve_o_carregado(entradas, tmp_path):
+    raiz = tmp_path / "arquivo"
+    raiz.write_text("não é pasta")
+    assert deposito("k", lambda: entradas, raiz=str(raiz)) is entradas
+
+
+def test_outro_processo_le_o_mesmo_deposito(entradas, tmp_path):
+    deposito("k1", lambda: entradas, raiz=str(tmp_path))
+    pasta = os.path.join(tmp_path, "k1")
+    assert os.path.exists(os.path.join(pasta, MANIFESTO))
+    codigo = ("import sys; from compartilhado import abrir; "
+              "d = abrir(sys.argv[1]); print(int(d['emoc']['fid'].sum()), len(d['ways']))")
+    saida = subprocess.run([sys.executable, "-c", codigo, pasta], cwd=RAIZ, check=True,
+                           capture_output=True, text=True).stdout.split()
+    assert [int(x) for x in saida] == [int(entradas["emoc"]["fid"].sum()), len(entradas["ways"])]
+    assert np.array_equal(abrir(pasta)["emoc"]["fid"], entradas["emoc"]["fid"])
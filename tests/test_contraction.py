@@ -0,0 +1,53 @@
+# tests/test_contraction.py
+import os
+
+import numpy as np
+import pytest
+
+from conftest import dijkstra_ref
+from contraction import hierarquias
+from routing import PERFIS, fator_valencia
+
+
+@pytest.fixture(scope="module")
+def chs(grafo, tmp_path_factory):
+    pasta = str(tmp_path_factory.mktemp("ch"))
+    return pasta, hierarquias(grafo, pasta=pasta)
+
+
+def _pares(grafo, n=60, seed=1):
+    # metade dentro do maior trecho (rota existe), metade ao acaso
+    rng = np.random.default_rng(seed)
+    comp = grafo.componente[grafo.ativos]
+    maior = grafo.ativos[comp == np.bincount(comp).argmax()]
+    return np.vstack([rng.choice(maior, size=(n // 2, 2)),
+                      rng.choice(grafo.ativos, size=(n - n // 2, 2))])
+
+
+@pytest.mark.parametrize("perfil", list(PERFIS))
+def test_ch_igual_a_dijkstra(grafo, chs, perfil):
+    _, ch = chs
+    pares = _pares(grafo)
+    ref = dijkstra_ref(grafo, perfil, pares[:, 0])
+    fator = fator_valencia(grafo.frac_neg, grafo.frac_pos, perfil)
+    custo_aresta = dict(zip(grafo.aresta.tolist(), (grafo.comp * fator).tolist()))
+    for k, (o, d) in enumerate(pares):
+        rota = ch[perfil].rota(int(o), int(d))
+        if np.isinf(ref[k, d]):
+            assert rota is None
+            continue
+        assert rota["custo"] == pytest.approx(ref[k, d])
+        # o caminho desempacotado liga o par e soma o mesmo custo
+        assert rota["nos"][0] == o and rota["nos"][-1] == d
+        assert sum(custo_aresta[a] for a in rota["arestas"]) == pytest.approx(rota["custo"])
+
+
+def test_releitura_do_disco(grafo, chs):
+    pasta, ch = chs
+    arquivos = sorted(os.listdir(pasta))
+    assert len(arquivos) == len(PERFIS) and all(f.endswith(".npz") for f in arquivos)
+    lidas = hierarquias(grafo, pasta=pasta)
+    o, d = _pares(grafo)[0]
+    for perfil in PERFIS:
+        assert lidas[perfil].rota(int(o), int(d)) == ch[perfil].rota(int(o), int(d))
+    assert sorted(os.listdir(pasta)) == arquivos
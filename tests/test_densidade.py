@@ -0,0 +1,45 @@
+# tests/test_densidade.py
+import numpy as np
+import pytest
+
+from densidade import DensidadeKDE
+from emoc_index import selecao
+
+
+@pytest.fixture(scope="module")
+def kde(layers):
+    return DensidadeKDE(layers["emoc_fato"], layers["emoc_indice"])
+
+
+@pytest.mark.parametrize("filtros", [
+    {}, {"valencia": ["Positivo"]}, {"genero": "Feminino", "valencia": ["Neutro", "Negativo"]},
+])
+def test_massa_igual_ao_numero_de_pontos(kde, layers, filtros):
+    # núcleo truncado em 3σ nos dois eixos: perde ~0,5% da massa
+    n = (selecao(layers, **filtros) & kde._validos).sum()
+    assert n > 0
+    massa = kde.grade(**filtros).sum() * kde.celula ** 2
+    assert massa == pytest.approx(n, rel=0.01)
+    assert massa <= n
+
+
+def test_filtro_vazio_da_grade_zerada(kde):
+    assert not kde.grade(valencia=[]).any()
+
+
+def test_separavel_igual_a_convolucao_2d(kde):
+    from scipy.signal import fftconvolve
+    cel = kde._cel[kde._validos]
+    hist = np.bincount(cel, minlength=kde.nx * kde.ny).reshape(kde.ny, kde.nx).astype(float)
+    denso = fftconvolve(hist, np.outer(kde._k, kde._k), mode="same") / (2 * np.pi * kde.banda ** 2)
+    np.testing.assert_allclose(kde.grade(), denso, atol=1e-12)
+
+
+def test_geometria_ausente_fica_fora(layers):
+    fato = layers["emoc_fato"].copy()
+    geom = fato.geometry.values.copy()
+    geom[0] = None
+    fato = fato.set_geometry(geom)
+    kde = DensidadeKDE(fato)
+    assert not kde._validos[0] and kde._cel[0] == -1
+    assert kde.grade().sum() * kde.celula ** 2 == pytest.approx(kde._validos.sum(), rel=0.01)
@@ -0,0 +1,58 @@
+# tests/test_emoc_index.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from emoc_index import chave_filtros, filtrar, indice_emocoes, mascara, selecao
+
+FATO = pd.DataFrame({
+    "genero": ["F", "M", "F", "M", "F"],
+    "valencia": ["Positivo", "Negativo", "Neutro", "Positivo", "Negativo"],
+})
+
+
+@pytest.fixture
+def indice():
+    return indice_emocoes(FATO, ["genero", "valencia"])
+
+
+def test_none_nao_filtra(indice):
+    assert mascara(indice, genero=None, valencia=None).all()
+
+
+def test_texto_vazio_e_lista_vazia_nao_casam(indice):
+    # "" não é curinga: é o valor em branco do selectbox e não casa com nada
+    assert not mascara(indice, genero="").any()
+    assert not mascara(indice, valencia=[]).any()
+
+
+def test_lista_e_ou_colunas_sao_e(indice):
+    sel = mascara(indice, genero="F", valencia=["Positivo", "Negativo"])
+    np.testing.assert_array_equal(sel, [True, False, False, False, True])
+
+
+def test_valor_ausente_nao_casa(indice):
+    assert not mascara(indice, genero="X").any()
+
+
+@pytest.mark.parametrize("filtros", [
+    {}, {"genero": "M"}, {"genero": ""}, {"valencia": []},
+    {"genero": ["F", "M"], "valencia": "Neutro"}, {"genero": None, "valencia": ["Positivo"]},
+])
+def test_indice_igual_a_varredura(indice, filtros):
+    com = selecao({"emoc_fato": FATO, "emoc_indice": indice}, **filtros)
+    sem = selecao({"emoc_fato": FATO}, **filtros)
+    np.testing.assert_array_equal(com, sem)
+
+
+def test_chave_ignora_ordem_e_none():
+    assert chave_filtros(valencia=["Neutro", "Positivo"], genero=None) == \
+        chave_filtros(valencia=["Positivo", "Neutro"])
+    assert chave_filtros(genero="") != chave_filtros()
+
+
+def test_filtrar_fato_real(layers):
+    fato = layers["emoc_fato"]
+    sel = filtrar(layers, valencia="Negativo", genero=fato["genero"].dropna().iloc[0])
+    esperado = fato[(fato["valencia"] == "Negativo") & (fato["genero"] == sel["genero"].iloc[0])]
+    assert len(sel) == len(esperado) > 0
@@ -0,0 +1,70 @@
+# tests/test_esquema.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import layer_cache
+from conftest import DATA_PATH, FILES
+from esquema import ESQUEMAS, VALENCIA, compactar, memoria
+from ingestao import ler_camada
+
+
+def _tipos(df):
+    return {str(c): t for c, t in df.dtypes.items()}
+
+
+@pytest.mark.parametrize("nome", ["emoc", "emoji", "participantes", "cenarios", "ways"])
+def test_entradas_no_esquema(raw, nome):
+    df = raw[nome]
+    for col, tipo in ESQUEMAS[nome].items():
+        if col not in df:
+            continue
+        alvo = pd.api.types.pandas_dtype(tipo)
+        if isinstance(alvo, pd.CategoricalDtype) and alvo.categories is None:
+            assert isinstance(df[col].dtype, pd.CategoricalDtype), (nome, col)
+        else:
+            assert df[col].dtype == alvo, (nome, col)
+
+
+def test_camadas_derivadas_no_esquema(layers):
+    fato = layers["emoc_fato"]
+    assert fato["valencia"].dtype == VALENCIA
+    for col in ("emocao", "nome", "referencia", "faixa_etaria", "genero", "cod_part"):
+        assert isinstance(fato[col].dtype, pd.CategoricalDtype), col
+    assert fato["fid"].dtype == np.int32 and fato["cod_cenario"].dtype == np.int8
+    hexes = layers["emoc_hex"]
+    cods = [c for c in hexes.columns if not isinstance(c, str)]
+    assert all(hexes[c].dtype == np.int32 for c in cods + ["total"])
+
+
+def test_valor_que_nao_cabe_mantem_o_tipo():
+    df = pd.DataFrame({"cod_emoji": [1, 2], "cod_cenario": [1, 300],
+                       "cod_modal": [1.0, np.nan], "valencia": ["Positivo", "Ótimo"]})
+    out = compactar(df, "emoc_fato")
+    assert out["cod_cenario"].dtype == df["cod_cenario"].dtype      # 300 não cabe em int8
+    assert out["cod_modal"].dtype == np.float32                     # NaN: int8 ➜ float32
+    assert isinstance(out["valencia"].dtype, pd.CategoricalDtype)   # fora de VALENCIA
+    assert out["valencia"].dtype != VALENCIA
+    assert df["cod_cenario"].dtype == np.int64                      # entrada intacta
+
+
+def test_compactar_reduz_memoria():
+    original = ler_camada(f"{DATA_PATH}/{FILES['emoc']}")
+    assert memoria({"e": compactar(original, "emoc")})["e"] < memoria({"e": original})["e"]
+
+
+def test_esquema_sobrevive_ao_cache_em_parquet(layers, tmp_path):
+    pasta = str(tmp_path / "cache")
+    layer_cache.salvar(layers, pasta)
+    lidas = layer_cache.carregar(pasta)
+    for nome, df in layers.items():
+        if isinstance(df, pd.DataFrame):
+            assert _tipos(lidas[nome]) == _tipos(df), nome
+    # categorias fixas (valência) continuam completas mesmo sem todos os valores
+    so_positivo = {"emoc_fato": layers["emoc_fato"][layers["emoc_fato"]["valencia"] == "Positivo"]}
+    layer_cache.salvar(so_positivo, pasta)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(layer_cache, "DERIVADAS", {})
+        lida = layer_cache.carregar(pasta)["emoc_fato"]
+    assert lida["valencia"].dtype == VALENCIA
+
@@ -0,0 +1,48 @@
+# tests/test_geocoder.py
+import geopandas as gpd
+import pytest
+import shapely
+
+from geocoder import GeocodificadorLocal, normalizar
+
+
+@pytest.fixture(scope="module")
+def geo(raw):
+    return GeocodificadorLocal(raw["ways"], raw["pts_cenarios"], raw["cenarios"])
+
+
+def test_normalizar():
+    assert normalizar("  Praça  do Japão! ") == "praca do japao"
+
+
+def test_sem_nomes_de_rua(geo, raw):
+    # os arquivos do repositório não trazem name: só pontos de referência
+    assert not geo.tem_ruas
+    assert len(geo.referencias()) == len(raw["pts_cenarios"])
+
+
+def test_empate_devolve_os_candidatos(geo):
+    cands = [c["rotulo"] for c in geo.candidatos("praca japao")]
+    assert len(cands) == 2
+    assert all("Praça do Japão" in c for c in cands)
+
+
+def test_texto_especifico_resolve_um(geo):
+    cands = geo.candidatos("praca japao inicio")
+    assert len(cands) == 1 and cands[0]["rotulo"].endswith("Início")
+
+
+def test_nada_encontrado(geo):
+    assert geo.candidatos("xyzzy qqq") == []
+
+
+def test_ruas_nomeadas():
+    ways = gpd.GeoDataFrame(
+        {"name": ["Rua XV de Novembro", "Rua XV de Novembro", None]},
+        geometry=[shapely.LineString([(-49.27, -25.43), (-49.26, -25.43)]),
+                  shapely.LineString([(-49.26, -25.43), (-49.25, -25.43)]),
+                  shapely.LineString([(-49.25, -25.44), (-49.24, -25.44)])], crs=4326)
+    geo = GeocodificadorLocal(ways)
+    assert geo.tem_ruas
+    r = geo.geocodificar("rua xv novembro")
+    assert r["tipo"] == "rua" and r["rotulo"] == "Rua XV de Novembro"
@@ -0,0 +1,57 @@
+# tests/test_hexbin.py
+import pandas as pd
+import pytest
+import shapely
+
+from hexbin import EPSG_METRIC, TAMANHOS, VALENCIAS, agregar_hex, hex_ids, hex_poligonos, somar_hex
+
+
+@pytest.fixture(scope="module")
+def fato(layers):
+    return layers["emoc_fato"]
+
+
+@pytest.fixture(scope="module")
+def hexes(layers):
+    return layers["emoc_hex"]
+
+
+def _validos(fato):
+    return fato[fato["cod_emoji"].notna() & fato.geometry.notna() & ~fato.geometry.is_empty]
+
+
+def test_total_por_resolucao(fato, hexes):
+    validos = _validos(fato)
+    n = len(validos)
+    cods = [c for c in hexes.columns if not isinstance(c, str)]
+    for tamanho in TAMANHOS:
+        h = hexes[hexes["tamanho_hex"] == tamanho]
+        assert h["total"].sum() == n
+        assert (h["total"] > 0).all()
+        assert (h[VALENCIAS].sum(axis=1) == h["total"]).all()
+        assert (h[cods].sum(axis=1) == h["total"]).all()
+        por_vlc = h[VALENCIAS].sum()
+        assert por_vlc.to_dict() == validos["valencia"].value_counts().reindex(VALENCIAS, fill_value=0).to_dict()
+
+
+@pytest.mark.parametrize("tamanho", TAMANHOS)
+def test_ponto_dentro_do_seu_hexagono(fato, tamanho):
+    xy = shapely.get_coordinates(_validos(fato).to_crs(EPSG_METRIC).geometry.values)
+    q, r = hex_ids(xy[:, 0], xy[:, 1], tamanho)
+    poligonos = hex_poligonos(q, r, tamanho)
+    # tolerância de 1 mm para pontos exatamente na aresta
+    assert shapely.dwithin(poligonos, shapely.points(xy), 1e-3).all()
+
+
+def _ordenar(h):
+    h = pd.DataFrame(h.drop(columns="geometry"))
+    return h.sort_values(["tamanho_hex", "q", "r"]).reset_index(drop=True)
+
+
+def test_somar_igual_a_agregar_tudo(fato):
+    validos = _validos(fato)
+    a, b = validos.iloc[:700], validos.iloc[700:]
+    soma = somar_hex(agregar_hex(a), agregar_hex(b))
+    tudo = agregar_hex(validos)
+    pd.testing.assert_frame_equal(_ordenar(soma)[tudo.columns.drop("geometry")], _ordenar(tudo),
+                                  check_dtype=False)
@@ -0,0 +1,53 @@
+# tests/test_ingestao.py
+import os
+import shutil
+
+import geopandas as gpd
+import pandas as pd
+import pytest
+from geopandas.testing import assert_geoseries_equal
+
+from conftest import DATA_PATH
+from ingestao import _ler_origem, caminho_parquet, converter_pasta, ler_camada
+
+ARQUIVOS = ["emoji_emoc.csv", "emoji_emoc.geojson", "pts_cenarios.geojson"]
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    for nome in ARQUIVOS:
+        shutil.copy(os.path.join(DATA_PATH, nome), tmp_path / nome)
+    return tmp_path
+
+
+def test_parquet_igual_a_origem(pasta):
+    gerados = converter_pasta(str(pasta))
+    # .csv e .geojson de mesmo nome não se sobrescrevem
+    assert sorted(map(os.path.basename, gerados)) == sorted(f"{n}.parquet" for n in ARQUIVOS)
+    for nome in ARQUIVOS:
+        origem = str(pasta / nome)
+        lido, ref = ler_camada(origem), _ler_origem(origem)
+        assert type(lido) is type(ref)
+        if isinstance(ref, gpd.GeoDataFrame):
+            assert lido.crs.to_epsg() == 4326
+            assert_geoseries_equal(lido.geometry, ref.geometry)
+            lido, ref = lido.drop(columns="geometry"), ref.drop(columns="geometry")
+        pd.testing.assert_frame_equal(pd.DataFrame(lido), pd.DataFrame(ref), check_dtype=False)
+
+
+def test_parquet_mais_antigo_que_a_origem_e_ignorado(pasta):
+    converter_pasta(str(pasta))
+    origem = str(pasta / "emoji_emoc.csv")
+    # Parquet "adulterado" para saber de onde veio a leitura
+    pq = caminho_parquet(origem)
+    pd.read_csv(origem).head(1).to_parquet(pq)
+    os.utime(pq, (1, 1))
+    assert len(ler_camada(origem)) == len(pd.read_csv(origem))
+    os.utime(pq, None)
+    assert len(ler_camada(origem)) == 1
+
+
+def test_sem_parquet_le_a_origem(pasta):
+    origem = str(pasta / "pts_cenarios.geojson")
+    assert not os.path.exists(caminho_parquet(origem))
+    assert len(ler_camada(origem)) == len(gpd.read_file(origem))
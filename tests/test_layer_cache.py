@@ -0,0 +1,85 @@
+# tests/test_layer_cache.py
+import os
+
+import pytest
+
+import build_layers as bl
+import layer_cache
+from conftest import DATA_PATH, FILES
+from esquema import compactar
+from test_build_layers import TABELAS, _canonica
+
+
+def _fontes(tmp_path, emoc):
+    """Caminhos reais das entradas, com ``emoc`` trocado por um arquivo marcador."""
+    fontes = {k: os.path.join(DATA_PATH, f) for k, f in FILES.items() if k != "emoc"}
+    marca = tmp_path / "emoc.marca"
+    marca.write_text(emoc)
+    fontes["emoc"] = str(marca)
+    return fontes
+
+
+@pytest.fixture
+def chamadas(monkeypatch):
+    """Conta as chamadas a build_layers / atualizar_layers feitas pelo cache."""
+    n = {"build": 0, "atualizar": 0}
+    build, atualizar = bl.build_layers, bl.atualizar_layers
+
+    def _build(raw):
+        n["build"] += 1
+        return build(raw)
+
+    def _atualizar(gdfs, raw):
+        n["atualizar"] += 1
+        return atualizar(gdfs, raw)
+
+    monkeypatch.setattr(bl, "build_layers", _build)
+    monkeypatch.setattr(bl, "atualizar_layers", _atualizar)
+    return n
+
+
+def test_acrescimo_de_pontos_atualiza_o_cache(raw, layers, tmp_path, chamadas):
+    cache = str(tmp_path / "cache")
+    # como se o arquivo tivesse só 900 pontos: categorias só dos presentes
+    parcial = {**raw, "emoc": compactar(raw["emoc"].iloc[:900].astype({"cod_part": object}),
+                                        "emoc")}
+    layer_cache.build_layers_cache(parcial, _fontes(tmp_path, "900"), cache)
+    # participantes novos nos pontos acrescentados: categorias de cod_part diferem
+    gdfs = layer_cache.build_layers_cache(raw, _fontes(tmp_path, "todos"), cache)
+    assert chamadas == {"build": 1, "atualizar": 1}
+    for nome in TABELAS:
+        assert _canonica(gdfs[nome], nome).equals(_canonica(layers[nome], nome)), nome
+    assert len(os.listdir(cache)) == 1
+
+
+def test_acerto_falha_e_invalidacao_por_codigo(raw, tmp_path, chamadas, monkeypatch):
+    cache = str(tmp_path / "cache")
+    fontes = _fontes(tmp_path, "v1")
+    primeira = layer_cache.build_layers_cache(raw, fontes, cache)
+    assert chamadas["build"] == 1
+
+    # mesmas entradas: lê do disco
+    segunda = layer_cache.build_layers_cache(raw, fontes, cache)
+    assert chamadas["build"] == 1
+    assert set(segunda) == set(primeira)
+    for nome in TABELAS:
+        assert _canonica(segunda[nome], nome).equals(_canonica(primeira[nome], nome)), nome
+
+    # um módulo que molda as camadas mudou (ex.: TAMANHOS em hexbin.py)
+    hexbin_py = tmp_path / "hexbin.py"
+    hexbin_py.write_text("TAMANHOS = [1000]\n")
+    monkeypatch.setitem(layer_cache.CODIGO, "__hexbin__", str(hexbin_py))
+    layer_cache.build_layers_cache(raw, fontes, cache)
+    assert chamadas["build"] == 2
+
+    # código e pontos mudaram juntos: reconstrói, não atualiza
+    hexbin_py.write_text("TAMANHOS = [2000]\n")
+    layer_cache.build_layers_cache(raw, _fontes(tmp_path, "v2"), cache)
+    assert chamadas == {"build": 3, "atualizar": 0}
+    assert len(os.listdir(cache)) == 1
+
+
+def test_chave_cobre_os_modulos_das_camadas():
+    chaves = layer_cache.hashes_fontes({})
+    assert {"__build_layers__", "__hexbin__", "__snapping__", "__emoc_index__",
+            "__esquema__", "__layer_cache__"} <= set(chaves)
@@ -0,0 +1,77 @@
+# tests/test_map_functions.py
+import json
+import re
+
+import folium
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from map_functions import _add_points, _marker_arrays
+
+PONTOS = gpd.GeoDataFrame(
+    {"cod_emoji": [3.0, np.nan, 7.0, 5.0, 9.0],
+     "valencia": ["Positivo", "Neutro", None, "Negativo", "Neutro"]},
+    geometry=[shapely.Point(-49.27, -25.44), shapely.Point(-49.28, -25.45), None,
+              shapely.Point(), shapely.Point(-49.26, -25.43)], crs=4326)
+
+
+def _linhas_iterrows(gdf, tooltip_col):
+    """Referência: o laço por linha que a versão vetorizada substituiu."""
+    out = []
+    for _, row in gdf.iterrows():
+        if np.isnan(row["cod_emoji"]) or row.geometry is None or row.geometry.is_empty:
+            continue
+        tip = row[tooltip_col] if tooltip_col else None
+        out.append([row.geometry.y, row.geometry.x, int(row["cod_emoji"]), tip])
+    return out
+
+
+def test_vetores_iguais_ao_laco_por_linha():
+    for col in (None, "valencia"):
+        ys, xs, cods, tips = _marker_arrays(PONTOS, col)
+        assert [list(r) for r in zip(ys, xs, cods, tips)] == _linhas_iterrows(PONTOS, col)
+
+
+def test_uma_camada_com_todos_os_pontos():
+    mapa = folium.Map([-25.44, -49.27], zoom_start=14)
+    camada = _add_points(PONTOS, "teste", mapa, tooltip_col="valencia", calor=False)
+    assert [list(r) for r in camada.data] == _linhas_iterrows(PONTOS, "valencia")
+    html = mapa.get_root().render()
+    # nenhum folium.Marker por ponto: os dados vão numa lista só
+    assert "L.marker([row[0], row[1]]" in html and html.count("L.marker(") == 1
+    dados = json.loads(re.search(r"var data = (\[.*?\]);", html).group(1))
+    assert dados == [list(r) for r in camada.data]
+
+
+# ----------------------------------------------------------
+# mapa base: partes fixas calculadas uma vez (base_estatica)
+# ----------------------------------------------------------
+def test_base_estatica(raw):
+    from map_functions import base_estatica
+    base = base_estatica(raw)
+    geom = raw["emoc"].geometry
+    geom = geom[geom.notna() & ~geom.is_empty]
+    np.testing.assert_allclose(base["centro"], [geom.y.mean(), geom.x.mean()])
+    cores = {}
+    for f in base["cenarios"]["features"]:
+        cores.setdefault(f["properties"]["referencia"], set()).add(f["properties"]["cor"])
+    # uma cor por cenário, distintas entre si, todas na legenda
+    assert all(len(c) == 1 for c in cores.values())
+    assert len({c for cs in cores.values() for c in cs}) == len(cores)
+    for ref, (cor,) in cores.items():
+        assert cor in base["legenda"] and str(ref) in base["legenda"]
+
+
+def test_mapa_base_usa_as_partes_em_cache(raw):
+    from map_functions import base_estatica, make_base_map
+    base = base_estatica(raw)
+    base["centro"] = [-1.0, -2.0]          # marcador: só viria do cache
+    # sem "emoc"/"cenarios": nada pode ser recalculado a partir das camadas
+    mapa = make_base_map({"base_mapa": base})
+    assert list(mapa.location) == [-1.0, -2.0]
+    camadas = [c for c in mapa._children.values() if isinstance(c, folium.GeoJson)]
+    assert len(camadas) == 1
+    assert [f["properties"]["cor"] for f in camadas[0].data["features"]] == \
+        [f["properties"]["cor"] for f in base["cenarios"]["features"]]
+    assert base["legenda"] in mapa.get_root().render()
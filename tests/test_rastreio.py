@@ -0,0 +1,87 @@
+# tests/test_rastreio.py
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from rastreio import coletar, etapa, marco, rastrear
+
+
+@rastrear()
+def _lista(n):
+    with etapa("dentro", n):
+        marco("passo")
+    return list(range(n))
+
+
+def test_sem_coletor_nada_e_registrado():
+    with etapa("solta") as e:
+        e.linhas = 3
+        marco("x")
+    assert _lista(4) == [0, 1, 2, 3]
+
+
+def test_etapas_aninhadas_marcos_e_linhas():
+    with coletar() as c:
+        with etapa("consulta") as e:
+            _lista(5)
+            marco("depois")
+            e.linhas = 7
+    por_nome = {ev["nome"]: ev for ev in c.eventos}
+    fn = f"{__name__}._lista"
+    assert por_nome["consulta"]["pai"] is None and por_nome["consulta"]["nivel"] == 0
+    assert por_nome["consulta"]["linhas"] == 7
+    assert por_nome[fn]["pai"] == "consulta" and por_nome[fn]["linhas"] == 5
+    assert por_nome["dentro"]["pai"] == fn and por_nome["dentro"]["nivel"] == 2
+    assert por_nome["dentro/passo"]["pai"] == "dentro"
+    assert por_nome["consulta/depois"]["pai"] == "consulta"
+    # o pai dura pelo menos o que os filhos duram
+    assert por_nome["consulta"]["duracao_ms"] >= por_nome[fn]["duracao_ms"]
+
+
+def test_erro_sobe_e_fica_registrado():
+    with coletar() as c:
+        with pytest.raises(ZeroDivisionError):
+            with etapa("conta"):
+                1 / 0
+    (ev,) = c.eventos
+    assert ev["erro"] == "ZeroDivisionError"
+    assert c._pilha == []
+
+
+def test_coletor_por_thread():
+    vistos = {}
+
+    def sessao(nome):
+        with coletar() as c:
+            with etapa(nome):
+                barreira.wait()
+        vistos[nome] = [ev["nome"] for ev in c.eventos]
+
+    barreira = threading.Barrier(2)
+    ts = [threading.Thread(target=sessao, args=(n,)) for n in ("a", "b")]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert vistos == {"a": ["a"], "b": ["b"]}
+
+
+def test_memoria_e_exportacoes():
+    assert not tracemalloc.is_tracing()
+    with coletar(memoria=True) as c:
+        with etapa("aloca"):
+            dados = [bytes(1000) for _ in range(100)]
+        _lista(2)
+        _lista(3)
+    assert not tracemalloc.is_tracing()
+    assert len(dados) == 100
+    aloca = next(ev for ev in c.eventos if ev["nome"] == "aloca")
+    assert aloca["bytes"] >= 100 * 1000
+    resumo = {r["nome"]: r for r in c.resumo()}
+    assert resumo[f"{__name__}._lista"]["chamadas"] == 2
+    assert resumo[f"{__name__}._lista"]["linhas"] == 5
+    trace = json.loads(c.chrome_trace())["traceEvents"]
+    assert len(trace) == len(c.eventos) and {e["ph"] for e in trace} == {"X"}
+    assert json.loads(c.json())["resumo"]
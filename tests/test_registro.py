@@ -0,0 +1,54 @@
+# tests/test_registro.py
+import pytest
+
+from registro import Registro
+
+
+def _contador(valor):
+    n = {"chamadas": 0}
+
+    def carregar():
+        n["chamadas"] += 1
+        if isinstance(valor, Exception):
+            raise valor
+        return valor
+    return carregar, n
+
+
+def test_carrega_uma_vez_e_so_quando_pedida():
+    carregar, n = _contador(42)
+    reg = Registro().registrar("a", carregar)
+    assert n["chamadas"] == 0 and reg.carregadas() == []
+    assert reg["a"] == reg["a"] == 42
+    assert n["chamadas"] == 1 and reg.carregadas() == ["a"]
+
+
+def test_grupo_roda_uma_vez_para_todas_as_camadas():
+    carregar, n = _contador({"x": 1, "y": 2})
+    reg = Registro().registrar(("x", "y", "z"), carregar)
+    assert reg["y"] == 2 and reg["x"] == 1
+    assert n["chamadas"] == 1
+    # camada que o grupo não produziu: ausente, como num dicionário
+    assert "z" not in reg
+    with pytest.raises(KeyError):
+        reg["z"]
+
+
+def test_in_como_no_dicionario():
+    reg = (Registro().registrar("ok", lambda: 0).registrar("nada", lambda: None)
+           .registrar("sem_arquivo", _contador(FileNotFoundError("x.parquet"))[0]))
+    assert "ok" in reg
+    assert "nada" not in reg
+    assert "sem_arquivo" not in reg
+    assert "nunca_registrada" not in reg
+    assert reg.get("nada", "padrão") is None
+
+
+def test_erro_de_carga_sobe_e_fica_memorizado():
+    carregar, n = _contador(ValueError("arquivo corrompido"))
+    reg = Registro().registrar("ruim", carregar)
+    with pytest.raises(ValueError):
+        "ruim" in reg
+    with pytest.raises(ValueError):
+        reg["ruim"]
+    assert n["chamadas"] == 1
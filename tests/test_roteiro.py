@@ -0,0 +1,87 @@
+# tests/test_roteiro.py
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+from conftest import dijkstra_ref
+from roteiro import MatrizCustos, matriz_pontos, ordem_visita, planejar
+
+
+def _custo(mat, seq):
+    return sum(mat[a, b] for a, b in zip(seq, seq[1:]))
+
+
+def _forca_bruta(mat, inicio, retorno):
+    resto = [i for i in range(len(mat)) if i != inicio]
+    return min(_custo(mat, [inicio, *p] + ([inicio] if retorno else []))
+               for p in itertools.permutations(resto))
+
+
+@pytest.mark.parametrize("retorno", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_ordem_otima_em_matriz_pequena(seed, retorno):
+    rng = np.random.default_rng(seed)
+    mat = rng.uniform(1, 100, (7, 7))          # assimétrica, como custos emocionais
+    np.fill_diagonal(mat, 0)
+    inicio = seed % 7
+    seq = ordem_visita(mat, inicio, retorno, tempo=0.2)
+    assert seq[0] == inicio and sorted(set(seq)) == list(range(7))
+    assert len(seq) == 8 if retorno else len(seq) == 7
+    if retorno:
+        assert seq[-1] == inicio
+    # custos inteiros em décimos (ESCALA): ótimo até o arredondamento
+    assert _custo(mat, seq) == pytest.approx(_forca_bruta(mat, inicio, retorno), abs=0.1 * 7)
+
+
+def test_par_sem_caminho_fica_por_ultimo():
+    mat = np.array([[0, 1, 5], [1, 0, np.inf], [5, 2, 0]], dtype=float)
+    # 0 ➜ 1 ➜ 2 não existe; 0 ➜ 2 ➜ 1 custa 7
+    assert ordem_visita(mat, 0, tempo=0.2) == [0, 2, 1]
+
+
+def test_poucos_pontos():
+    assert ordem_visita(np.zeros((1, 1))) == [0]
+    assert ordem_visita(np.zeros((2, 2)), inicio=1, retorno=True) == [1, 0, 1]
+
+
+def test_salvar_e_carregar(tmp_path):
+    rng = np.random.default_rng(0)
+    mat = MatrizCustos([3, 1, 4], rng.random((3, 3)), rng.random((3, 3)),
+                       rng.integers(-9999, 5, (3, 10)).astype(np.int32))
+    caminho = str(tmp_path / "m.npz")
+    mat.salvar(caminho)
+    lida = MatrizCustos.carregar(caminho)
+    for campo in ("nos", "custo", "comprimento", "pred"):
+        np.testing.assert_array_equal(getattr(lida, campo), getattr(mat, campo))
+    assert os.listdir(tmp_path) == ["m.npz"]
+
+
+@pytest.fixture(scope="module")
+def matriz(grafo, raw, tmp_path_factory):
+    pasta = str(tmp_path_factory.mktemp("roteiro"))
+    return matriz_pontos(grafo, raw["pts_cenarios"], pasta=pasta), pasta
+
+
+def test_matriz_igual_a_dijkstra_e_lida_do_disco(grafo, raw, matriz):
+    mat, pasta = matriz
+    ref = dijkstra_ref(grafo, "emocional", mat.nos)[:, mat.nos]
+    np.testing.assert_allclose(mat.custo, ref, rtol=1e-9)
+    (arquivo,) = os.listdir(pasta)
+    lida = matriz_pontos(grafo, raw["pts_cenarios"], pasta=pasta)
+    np.testing.assert_array_equal(lida.custo, mat.custo)
+    assert os.listdir(pasta) == [arquivo]
+
+
+def test_planejar_encadeia_os_trechos(grafo, matriz):
+    mat, _ = matriz
+    # pontos do mesmo trecho da rede, para todos os pares terem caminho
+    comp = grafo.componente[mat.nos]
+    indices = list(np.flatnonzero(comp == np.bincount(comp).argmax())[:5])
+    plano = planejar(grafo, mat, indices, tempo=0.2)
+    assert plano["ordem"][0] == indices[0] and sorted(plano["ordem"]) == sorted(indices)
+    assert not plano["sem_caminho"]
+    for t, (i, j) in zip(plano["trechos"], zip(plano["ordem"], plano["ordem"][1:])):
+        assert t["nos"][0] == mat.nos[i] and t["nos"][-1] == mat.nos[j]
+    assert plano["custo"] == pytest.approx(_custo(mat.custo, plano["ordem"]))
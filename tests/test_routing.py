@@ -0,0 +1,36 @@
+# tests/test_routing.py
+import numpy as np
+import pytest
+
+from conftest import dijkstra_ref
+from routing import PERFIS
+
+
+def pares(grafo, n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.choice(grafo.ativos, size=(n, 2))
+
+
+@pytest.mark.parametrize("perfil", list(PERFIS))
+def test_astar_igual_a_dijkstra(grafo, perfil):
+    pp = pares(grafo)
+    ref = dijkstra_ref(grafo, perfil, pp[:, 0])
+    for k, (o, d) in enumerate(pp):
+        rota = grafo.rota(int(o), int(d), perfil)
+        if np.isinf(ref[k, d]):
+            assert rota is None
+        else:
+            assert rota["custo"] == pytest.approx(ref[k, d])
+
+
+def test_sem_rota_entre_trechos(grafo):
+    assert grafo.n_trechos > 1
+    pp = pares(grafo, n=200)
+    for o, d in pp:
+        assert grafo.mesmo_trecho(o, d) == (grafo.rota(int(o), int(d), "curta") is not None)
+
+
+def test_vertice_mais_proximo_tem_arestas(grafo, raw):
+    pts = raw["pts_cenarios"]
+    nos = grafo.vertice_mais_proximo(pts.geometry.x.to_numpy(), pts.geometry.y.to_numpy())
+    assert (np.diff(grafo.indptr)[nos] > 0).all()
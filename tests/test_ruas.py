@@ -0,0 +1,46 @@
+# tests/test_ruas.py
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+from ruas import EPSG_METRIC, TOL_NOME, montar_ways
+
+X0, Y0 = 675000, 7184000      # Curitiba em UTM 22S
+
+
+def _gdf(linhas, **cols):
+    return gpd.GeoDataFrame(cols, geometry=[shapely.LineString(l) for l in linhas],
+                            crs=EPSG_METRIC).to_crs(4326)
+
+
+def test_nome_vem_do_extrato():
+    ruas = _gdf([[(X0, Y0), (X0 + 200, Y0)],                       # sob a rua nomeada
+                 [(X0, Y0 + 3 * TOL_NOME), (X0 + 200, Y0 + 3 * TOL_NOME)],   # paralela, longe
+                 [(X0 + 100, Y0 - 100), (X0 + 100, Y0 + 100)]])    # cruza: sobreposição pequena
+    nomes = _gdf([[(X0 - 50, Y0 + 2), (X0 + 250, Y0 + 2)],
+                  [(X0 + 400, Y0), (X0 + 500, Y0)]],
+                 name=["Rua XV de Novembro", "Rua Longe"])
+    ways = montar_ways(ruas, nomes=nomes)
+    assert ways["osm_id"].tolist() == [1, 2, 3]
+    assert ways["name"].iloc[0] == "Rua XV de Novembro"
+    assert ways["name"].iloc[1:].isna().all()
+
+
+def test_sem_extrato_nome_vazio_e_atributos_mantidos():
+    ruas = _gdf([[(X0, Y0), (X0 + 100, Y0)]])
+    assert montar_ways(ruas)["name"].isna().all()
+    com_nome = _gdf([[(X0, Y0), (X0 + 100, Y0)]], osm_id=[42], name=["Av. Sete de Setembro"])
+    nomes = _gdf([[(X0, Y0), (X0 + 100, Y0)]], name=["Outra"])
+    ways = montar_ways(com_nome, nomes=nomes)
+    assert ways[["osm_id", "name"]].to_dict("records") == [
+        {"osm_id": 42, "name": "Av. Sete de Setembro"}]
+    assert not pd.isna(ways["bool_cenario"]).any()
+
+
+def test_rua_sem_par_fica_na_e_nao_texto():
+    ruas = _gdf([[(X0, Y0), (X0 + 100, Y0)], [(X0, Y0 + 500), (X0 + 100, Y0 + 500)]])
+    nomes = _gdf([[(X0, Y0), (X0 + 100, Y0)]], name=["Rua Única"])
+    nome = montar_ways(ruas, nomes=nomes)["name"]
+    assert nome.iloc[0] == "Rua Única"
+    assert nome.isna().iloc[1]
+    assert "nan" not in nome.dropna().tolist()
@@ -0,0 +1,84 @@
+# tests/test_snapping.py
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from snapping import EPSG_METRIC, SnapVertices
+
+
+def _gdf(geoms):
+    return gpd.GeoDataFrame(geometry=geoms, crs=32722)
+
+
+def test_indices_alinhados_com_vazias_e_multipartes():
+    base = _gdf([shapely.Point(0, 0), shapely.Point(), None,
+                 shapely.MultiPoint([(5, 5), (6, 6)]), shapely.Point(10, 0)])
+    snap = SnapVertices.de_geometrias(base)
+    # o vértice em (10, 0) continua sendo a linha 4, não a 1
+    _, idx = snap.consultar_xy([9.0, 0.0])
+    assert idx == 4
+    dist, idx = snap.consultar(base)
+    np.testing.assert_array_equal(idx, [0, -1, -1, -1, 4])
+    np.testing.assert_array_equal(dist[[0, 4]], [0.0, 0.0])
+
+
+def test_max_distance_e_k():
+    snap = SnapVertices([[0, 0], [10, 0], [20, 0]])
+    _, idx = snap.consultar_xy([[9, 0], [100, 0]], max_distance=5)
+    np.testing.assert_array_equal(idx, [1, -1])
+    _, idx = snap.consultar_xy([[9, 0]], k=2)
+    np.testing.assert_array_equal(idx, [[1, 0]])
+
+
+def test_hub_igual_a_sjoin_nearest(layers):
+    # _knn_hub (build_layers) usa de_geometrias/consultar
+    from build_layers import DIST_HUB, EPSG_METRIC
+    pts = layers["emoc_colec_ruas"].to_crs(EPSG_METRIC)
+    hubs = layers["ponto_medio"].to_crs(EPSG_METRIC).reset_index(drop=True)
+    dist, idx = SnapVertices.de_geometrias(hubs).consultar(pts, max_distance=DIST_HUB)
+    ref = gpd.sjoin_nearest(pts[["geometry"]], hubs[["geometry"]], max_distance=DIST_HUB,
+                            distance_col="d")
+    ref = ref[~ref.index.duplicated()]
+    achou = idx >= 0
+    assert achou.sum() == len(ref)
+    np.testing.assert_allclose(dist[achou], ref["d"].reindex(pts.index[achou]).to_numpy())
+
+
+# ----------------------------------------------------------
+# SnapRuas (ponto ➜ rua)
+# ----------------------------------------------------------
+@pytest.fixture(scope="module")
+def snap_ruas(layers):
+    return layers["snap_ruas"]
+
+
+def test_snap_igual_a_sjoin_nearest(snap_ruas, raw):
+    from build_layers import DIST_SNAP
+    pts = raw["emoc"][["geometry"]].to_crs(EPSG_METRIC)
+    ref = gpd.sjoin_nearest(pts, snap_ruas.ruas[["geometry"]], how="left",
+                            distance_col="dist", max_distance=DIST_SNAP)
+    # empates (mais de uma rua à mesma distância) repetem o ponto: compara a distância
+    ref = ref.groupby(level=0).agg(dist=("dist", "first"), ruas=("index_right", set))
+    snap = snap_ruas.snap(pts)
+    np.testing.assert_allclose(snap["dist"], ref["dist"].reindex(snap.index), atol=1e-6)
+    dentro = snap["idx_rua"].notna()
+    assert dentro.sum() > 0
+    assert all(i in r for i, r in zip(snap["idx_rua"][dentro], ref["ruas"][dentro]))
+
+
+def test_pos_rua_reproduz_a_distancia(snap_ruas, raw):
+    pts = raw["emoc"].iloc[:200]
+    snap = snap_ruas.snap(pts).dropna()
+    linhas = snap_ruas.ruas.geometry.loc[snap["idx_rua"]].values
+    proj = shapely.line_interpolate_point(linhas, snap["pos_rua"].to_numpy())
+    geoms = pts.to_crs(EPSG_METRIC).geometry.loc[snap.index].values
+    np.testing.assert_allclose(shapely.distance(proj, geoms), snap["dist"], atol=1e-6)
+
+
+def test_lotes_iguais_ao_conjunto(snap_ruas, raw):
+    # o índice é persistente: encaixar em lotes dá o mesmo que tudo de uma vez
+    pts = raw["emoc"]
+    lotes = pd.concat([snap_ruas.snap(pts.iloc[:500]), snap_ruas.snap(pts.iloc[500:])])
+    pd.testing.assert_frame_equal(lotes, snap_ruas.snap(pts))
@@ -0,0 +1,62 @@
+# tests/test_sprites.py
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from sprites import MAX_ATLAS, _atlas, atlas, css_atlas, montar_atlas, salvar_atlas
+
+CORES = {1: (255, 0, 0, 255), 2: (0, 255, 0, 255), 10: (0, 0, 255, 255)}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    pasta = tmp_path / "emojis"
+    pasta.mkdir()
+    for cod, cor in CORES.items():
+        Image.new("RGBA", (64, 64), cor).save(pasta / f"{cod}.png")
+    (pasta / "leiame.txt").write_text("ignorado")
+    return str(pasta)
+
+
+def test_atlas_uma_coluna_por_emoji_em_ordem_numerica(repo):
+    img, colunas = montar_atlas(repo, lado=10, escala=2)
+    assert colunas == {1: 0, 2: 1, 10: 2}           # 10 depois de 2, não depois de 1
+    assert img.size == (3 * 20, 20)
+    for cod, col in colunas.items():
+        assert img.getpixel((col * 20 + 10, 10)) == CORES[cod]
+
+
+def test_atlas_embutido_e_css(repo):
+    at = atlas(repo, lado=10, escala=2)
+    assert at["posicoes"] == {1: 0, 2: 10, 10: 20} and at["largura"] == 30
+    png = base64.b64decode(at["url"].split(",", 1)[1])
+    assert Image.open(io.BytesIO(png)).size == (60, 20)
+    css = css_atlas(at).render()
+    assert ".emoji-10{background-position:-20px 0;}" in css
+    assert "background-size:30px 10px" in css
+
+
+def test_cache_em_memoria_ate_um_icone_mudar(repo):
+    _atlas.cache_clear()
+    a = atlas(repo)
+    assert atlas(repo) is a
+    caminho = os.path.join(repo, "2.png")
+    Image.new("RGBA", (64, 64), (9, 9, 9, 255)).save(caminho)
+    os.utime(caminho, (os.path.getmtime(caminho) + 10,) * 2)
+    assert atlas(repo) is not a
+    assert _atlas.cache_info().maxsize == MAX_ATLAS
+
+
+def test_salvar_atlas_so_regrava_quando_muda(repo, tmp_path):
+    pasta = str(tmp_path / "static")
+    at = salvar_atlas(repo, pasta, "/app/static")
+    destino = os.path.join(pasta, "sprite.png")
+    assert at["url"].startswith("/app/static/sprite.png?v=")
+    with open(destino, "rb") as f:
+        assert f.read() == at["png"]
+    os.utime(destino, (1, 1))
+    assert salvar_atlas(repo, pasta, "/app/static")["url"] == at["url"]
+    assert os.path.getmtime(destino) == 1
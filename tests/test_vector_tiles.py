@@ -0,0 +1,183 @@
+# tests/test_vector_tiles.py
+import glob
+import os
+import struct
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from vector_tiles import BUFFER, EXTENT, ORIGEM, gerar_camada
+
+Z = 15
+
+
+# ----------------------------------------------------------
+# decodificador MVT mínimo (só o que vector_tiles.py escreve)
+# ----------------------------------------------------------
+def _varint(buf, i):
+    n = shift = 0
+    while True:
+        b = buf[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        shift += 7
+        if not b & 0x80:
+            return n, i
+
+
+def _campos(buf):
+    i = 0
+    while i < len(buf):
+        chave, i = _varint(buf, i)
+        num, wire = chave >> 3, chave & 7
+        if wire == 0:
+            v, i = _varint(buf, i)
+        elif wire == 1:
+            v, i = buf[i:i + 8], i + 8
+        else:
+            n, i = _varint(buf, i)
+            v, i = buf[i:i + n], i + n
+        yield num, v
+
+
+def _empacotados(buf):
+    out, i = [], 0
+    while i < len(buf):
+        v, i = _varint(buf, i)
+        out.append(v)
+    return out
+
+
+def _dezigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def _valor(buf):
+    for num, v in _campos(buf):
+        if num == 1:
+            return v.decode("utf-8")
+        if num == 3:
+            return struct.unpack("<d", v)[0]
+        if num == 6:
+            return _dezigzag(v)
+        if num == 7:
+            return bool(v)
+
+
+def _geometria(cmds):
+    partes, x, y, i = [], 0, 0, 0
+    while i < len(cmds):
+        ident, n = cmds[i] & 7, cmds[i] >> 3
+        i += 1
+        if ident == 1:
+            partes.append([])
+        for _ in range(n):
+            x, y = x + _dezigzag(cmds[i]), y + _dezigzag(cmds[i + 1])
+            i += 2
+            partes[-1].append((x, y))
+    return partes
+
+
+def decodificar(dados):
+    """``{camada: (extent, [(id, tipo, partes, props)])}``."""
+    out = {}
+    for num, camada in _campos(dados):
+        assert num == 3
+        nome, extent, feats, chaves, valores = None, None, [], [], []
+        for n, v in _campos(camada):
+            if n == 1:
+                nome = v.decode("utf-8")
+            elif n == 2:
+                feats.append(v)
+            elif n == 3:
+                chaves.append(v.decode("utf-8"))
+            elif n == 4:
+                valores.append(_valor(v))
+            elif n == 5:
+                extent = v
+        lista = []
+        for f in feats:
+            campos = dict(_campos(f))
+            tags = _empacotados(campos.get(2, b""))
+            props = {chaves[k]: valores[v] for k, v in zip(tags[::2], tags[1::2])}
+            lista.append((campos[1], campos[3], _geometria(_empacotados(campos[4])), props))
+        out[nome] = (extent, lista)
+    return out
+
+
+def _tiles(pasta, nome):
+    for caminho in glob.glob(os.path.join(pasta, nome, "*", "*", "*.pbf")):
+        z, x, y = (int(p) for p in os.path.relpath(caminho, os.path.join(pasta, nome))
+                   [:-4].split(os.sep))
+        with open(caminho, "rb") as f:
+            yield z, x, y, decodificar(f.read())[nome]
+
+
+def _mercator(z, x, y, px, py):
+    lado = 2 * ORIGEM / 2 ** z
+    return -ORIGEM + (x + px / EXTENT) * lado, ORIGEM - (y + py / EXTENT) * lado
+
+
+# ----------------------------------------------------------
+# testes
+# ----------------------------------------------------------
+@pytest.fixture(scope="module")
+def pontos():
+    lado = 2 * ORIGEM / 2 ** Z
+    x0, y0 = -ORIGEM + 11920 * lado, ORIGEM - 18870 * lado     # canto de um tile em Curitiba
+    xy = [(x0 + lado / 2, y0 - lado / 2),                       # meio do tile
+          (x0 + lado * (1 - 5 / EXTENT), y0 - lado / 2),        # junto à borda leste
+          (x0 + lado * 3 / EXTENT, y0 - lado * 3 / EXTENT)]     # junto ao canto NO
+    return gpd.GeoDataFrame(
+        {"texto": ["a", "b", None], "inteiro": [1, -2, 3], "real": [0.5, 1.5, 2.5],
+         "logico": [True, False, True]},
+        geometry=shapely.points(xy), crs=3857).to_crs(4326)
+
+
+def test_pontos_ida_e_volta(pontos, tmp_path):
+    gerar_camada(pontos, "p", ["texto", "inteiro", "real", "logico"], str(tmp_path), Z, Z)
+    merc = shapely.get_coordinates(pontos.to_crs(3857).geometry.values)
+    lado = 2 * ORIGEM / 2 ** Z
+    vistos = {}
+    for z, x, y, (extent, feats) in _tiles(tmp_path, "p"):
+        assert extent == EXTENT
+        for fid, tipo, partes, props in feats:
+            assert tipo == 1
+            (px, py), = partes[0]
+            assert -BUFFER <= px <= EXTENT + BUFFER and -BUFFER <= py <= EXTENT + BUFFER
+            i = fid - 1
+            np.testing.assert_allclose(_mercator(z, x, y, px, py), merc[i], atol=lado / EXTENT)
+            esperado = {k: v for k, v in pontos.drop(columns="geometry").iloc[i].items()
+                        if pd.notna(v)}
+            assert props == esperado
+            vistos.setdefault(i, set()).add((x, y))
+    # o do meio fica num tile só; o da borda entra no vizinho; o do canto em quatro
+    assert [len(vistos[i]) for i in range(3)] == [1, 2, 4]
+
+
+def test_linhas_ida_e_volta(tmp_path):
+    linha = shapely.LineString([(-49.30, -25.45), (-49.25, -25.43), (-49.20, -25.44)])
+    gdf = gpd.GeoDataFrame({"osm_id": [7], "vlc": ["Positivo"]}, geometry=[linha], crs=4326)
+    gerar_camada(gdf, "v", ["osm_id", "vlc"], str(tmp_path), 12, 13)
+    merc = gdf.to_crs(3857).geometry.iloc[0]
+    for z, x, y, (_, feats) in _tiles(tmp_path, "v"):
+        lado = 2 * ORIGEM / 2 ** z
+        (fid, tipo, partes, props), = feats
+        assert (fid, tipo, props) == (1, 2, {"osm_id": 7, "vlc": "Positivo"})
+        for parte in partes:
+            assert len(parte) >= 2
+            for px, py in parte:
+                assert -BUFFER <= px <= EXTENT + BUFFER and -BUFFER <= py <= EXTENT + BUFFER
+                # simplificação + arredondamento: ~2 unidades do tile
+                assert merc.distance(shapely.Point(_mercator(z, x, y, px, py))) <= 2 * lado / EXTENT
+
+
+def test_versao_so_muda_com_os_dados(pontos, tmp_path):
+    v1 = gerar_camada(pontos, "p", ["texto"], str(tmp_path), Z, Z)
+    assert gerar_camada(pontos, "p", ["texto"], str(tmp_path), Z, Z) == v1
+    outra = pontos.assign(texto=["a", "b", "c"])
+    assert gerar_camada(outra, "p", ["texto"], str(tmp_path), Z, Z) != v1
+    assert not glob.glob(os.path.join(tmp_path, "*.tmp"))
@@ -0,0 +1,302 @@
+# vector_tiles.py
+import hashlib
+import json
+import math
+import os
+import shutil
+import struct
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from sprites import salvar_atlas
+
+# ---------------------------------------------------------------------------------
+# Pirâmide de Mapbox Vector Tiles (MVT 2.1) pré-gerada em disco.
+# Cada camada vira ``<pasta>/<camada>/{z}/{x}/{y}.pbf``, servida como arquivo
+# estático pelo Streamlit (``server.enableStaticServing``); o navegador
+# (Leaflet.VectorGrid) baixa só os tiles da vista e filtra por atributo.
+# O codificador protobuf é escrito aqui para não exigir dependência nova.
+# ---------------------------------------------------------------------------------
+
+TILES_DIR = "static/tiles"           # servido em /app/static/tiles
+TILES_URL = "/app/static/tiles"
+MANIFESTO = "tiles.json"
+EXTENT = 4096
+BUFFER = 64                          # margem (unidades do tile) contra cortes na borda
+ZMIN, ZMAX = 10, 16
+R_MERC = 6378137.0
+ORIGEM = math.pi * R_MERC            # 20037508.34 m
+
+
+# ----------------------------------------------------------
+# protobuf mínimo (wire format)
+# ----------------------------------------------------------
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _campo(num, wire, dado) -> bytes:
+    chave = _varint((num << 3) | wire)
+    if wire == 0:
+        return chave + _varint(dado)
+    if wire == 1:
+        return chave + dado
+    return chave + _varint(len(dado)) + dado           # wire 2: bytes/mensagem
+
+
+def _empacotado(num, ints) -> bytes:
+    return _campo(num, 2, b"".join(_varint(i) for i in ints))
+
+
+def _valor(v) -> bytes:
+    """Mensagem ``Value`` do MVT."""
+    if isinstance(v, (bool, np.bool_)):
+        return _campo(7, 0, int(v))
+    if isinstance(v, (int, np.integer)):
+        return _campo(6, 0, _zigzag(int(v)))           # sint_value
+    if isinstance(v, (float, np.floating)):
+        return _campo(3, 1, struct.pack("<d", float(v)))
+    return _campo(1, 2, str(v).encode("utf-8"))
+
+
+# ----------------------------------------------------------
+# geometria ➜ comandos MVT
+# ----------------------------------------------------------
+def _cmd(ident, n):
+    return (ident & 0x7) | (n << 3)
+
+
+def _geom_pontos(xy):
+    cmds, cx, cy = [_cmd(1, len(xy))], 0, 0
+    for x, y in xy:
+        cmds += [_zigzag(x - cx), _zigzag(y - cy)]
+        cx, cy = x, y
+    return cmds
+
+
+def _geom_linhas(partes):
+    cmds, cx, cy = [], 0, 0
+    for xy in partes:
+        # vértices repetidos após o arredondamento saem
+        manter = np.ones(len(xy), dtype=bool)
+        manter[1:] = np.any(xy[1:] != xy[:-1], axis=1)
+        xy = xy[manter]
+        if len(xy) < 2:
+            continue
+        x0, y0 = xy[0]
+        cmds += [_cmd(1, 1), _zigzag(x0 - cx), _zigzag(y0 - cy), _cmd(2, len(xy) - 1)]
+        cx, cy = x0, y0
+        for x, y in xy[1:]:
+            cmds += [_zigzag(x - cx), _zigzag(y - cy)]
+            cx, cy = x, y
+    return cmds
+
+
+def _para_tile(coords, z, x, y):
+    """Coordenadas Web Mercator ➜ inteiros do tile (origem no canto NO)."""
+    lado = 2 * ORIGEM / 2 ** z
+    tx = (coords[:, 0] - (-ORIGEM + x * lado)) / lado * EXTENT
+    ty = ((ORIGEM - y * lado) - coords[:, 1]) / lado * EXTENT
+    return np.column_stack([np.round(tx), np.round(ty)]).astype(np.int64)
+
+
+def _limites_tile(z, x, y, margem=0.0):
+    lado = 2 * ORIGEM / 2 ** z
+    m = lado * margem
+    return (-ORIGEM + x * lado - m, ORIGEM - (y + 1) * lado - m,
+            -ORIGEM + (x + 1) * lado + m, ORIGEM - y * lado + m)
+
+
+def _tile_xy(mx, my, z):
+    lado = 2 * ORIGEM / 2 ** z
+    n = 2 ** z
+    tx = np.clip(np.floor((mx + ORIGEM) / lado), 0, n - 1).astype(np.int64)
+    ty = np.clip(np.floor((ORIGEM - my) / lado), 0, n - 1).astype(np.int64)
+    return tx, ty
+
+
+# ----------------------------------------------------------
+# camada ➜ mensagem Layer
+# ----------------------------------------------------------
+class _Camada:
+    """Acumula features de um tile com chaves/valores deduplicados."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.features = []
+        self.chaves, self.valores = {}, {}
+
+    def _tags(self, props):
+        tags = []
+        for k, v in props.items():
+            if v is None or (isinstance(v, float) and math.isnan(v)):
+                continue
+            ik = self.chaves.setdefault(k, len(self.chaves))
+            iv = self.valores.setdefault((type(v).__name__, v), len(self.valores))
+            tags += [ik, iv]
+        return tags
+
+    def adicionar(self, fid, tipo, geom, props):
+        if not geom:
+            return
+        corpo = _campo(1, 0, int(fid)) + _empacotado(2, self._tags(props)) + \
+            _campo(3, 0, tipo) + _empacotado(4, geom)
+        self.features.append(_campo(2, 2, corpo))
+
+    def bytes(self) -> bytes:
+        corpo = _campo(15, 0, 2) + _campo(1, 2, self.nome.encode("utf-8"))
+        corpo += b"".join(self.features)
+        corpo += b"".join(_campo(3, 2, k.encode("utf-8")) for k in self.chaves)
+        corpo += b"".join(_campo(4, 2, _valor(v)) for (_, v) in self.valores)
+        corpo += _campo(5, 0, EXTENT)
+        return _campo(3, 2, corpo)                      # Tile.layers
+
+
+def _props(df, colunas):
+    """Lista de dicts com tipos Python (categorias viram str)."""
+    cols = {}
+    for c in colunas:
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.astype(object)
+        cols[c] = s.astype(object).where(s.notna(), None).tolist()
+    return [dict(zip(cols, vals)) for vals in zip(*cols.values())] if cols else [{}] * len(df)
+
+
+def _tiles_pontos(gdf, nome, colunas, zooms):
+    merc = gdf.to_crs(3857)
+    xy = shapely.get_coordinates(merc.geometry.values)
+    props = _props(gdf, colunas)
+    ids = np.arange(len(xy))
+    for z in zooms:
+        # além do próprio tile, o ponto entra nos vizinhos cuja margem (a mesma
+        # BUFFER das linhas) o alcança: o ícone na borda não sai cortado ao meio
+        m = 2 * ORIGEM / 2 ** z * BUFFER / EXTENT
+        cantos = [_tile_xy(xy[:, 0] + dx, xy[:, 1] + dy, z) for dx in (-m, m) for dy in (-m, m)]
+        pares = pd.DataFrame({"i": np.tile(ids, len(cantos)),
+                              "tx": np.concatenate([tx for tx, _ in cantos]),
+                              "ty": np.concatenate([ty for _, ty in cantos])}).drop_duplicates()
+        for (x, y), pos in pares.groupby(["tx", "ty"]).indices.items():
+            idx = np.sort(pares["i"].to_numpy()[pos])
+            camada = _Camada(nome)
+            pix = _para_tile(xy[idx], z, x, y)
+            for i, p in zip(idx, pix):
+                camada.adicionar(i + 1, 1, _geom_pontos([p]), props[i])
+            yield z, int(x), int(y), camada
+
+
+def _tiles_linhas(gdf, nome, colunas, zooms):
+    merc = gdf.to_crs(3857).geometry.values
+    props = _props(gdf, colunas)
+    xmin, ymin, xmax, ymax = shapely.total_bounds(merc)
+    for z in zooms:
+        lado = 2 * ORIGEM / 2 ** z
+        # simplificação de ~1 unidade do tile neste zoom
+        geoms = shapely.simplify(merc, lado / EXTENT, preserve_topology=False)
+        arvore = shapely.STRtree(geoms)
+        x0, y0 = _tile_xy(np.array([xmin]), np.array([ymax]), z)
+        x1, y1 = _tile_xy(np.array([xmax]), np.array([ymin]), z)
+        for x in range(int(x0[0]), int(x1[0]) + 1):
+            for y in range(int(y0[0]), int(y1[0]) + 1):
+                lim = _limites_tile(z, x, y, BUFFER / EXTENT)
+                idx = arvore.query(shapely.box(*lim), predicate="intersects")
+                if not len(idx):
+                    continue
+                idx.sort()
+                cortes = shapely.clip_by_rect(geoms[idx], *lim)
+                camada = _Camada(nome)
+                for i, g in zip(idx, cortes):
+                    partes = [_para_tile(shapely.get_coordinates(p), z, x, y)
+                              for p in shapely.get_parts(g) if not p.is_empty]
+                    camada.adicionar(i + 1, 2, _geom_linhas(partes), props[i])
+                if camada.features:
+                    yield z, x, y, camada
+
+
+# ----------------------------------------------------------
+# pirâmide em disco
+# ----------------------------------------------------------
+def hash_camada(gdf, colunas) -> str:
+    h = hashlib.sha256()
+    h.update(b"".join(shapely.to_wkb(gdf.to_crs(4326).geometry.values)))
+    for c in colunas:
+        h.update(pd.util.hash_pandas_object(gdf[c].astype(object), index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def gerar_camada(gdf, nome, colunas, pasta=TILES_DIR, zmin=ZMIN, zmax=ZMAX) -> str:
+    """
+    Grava a pirâmide ``<pasta>/<nome>/{z}/{x}/{y}.pbf`` de ``gdf`` (pontos
+    ou linhas) com os atributos ``colunas``; refaz só quando geometria ou
+    atributos mudaram.  Devolve o hash (versão) da camada.
+    """
+    colunas = [c for c in colunas if c in gdf]
+    gdf = gdf[gdf.geometry.notna() & ~gdf.geometry.is_empty]
+    versao = hash_camada(gdf, colunas)
+    man_path = os.path.join(pasta, MANIFESTO)
+    manifesto = {}
+    if os.path.exists(man_path):
+        with open(man_path) as f:
+            manifesto = json.load(f)
+    destino = os.path.join(pasta, nome)
+    if manifesto.get(nome, {}).get("versao") == versao and os.path.isdir(destino):
+        return versao
+
+    tmp = destino + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    pontual = bool(shapely.get_type_id(gdf.geometry.values).max(initial=0) == 0) if len(gdf) else True
+    gerador = _tiles_pontos if pontual else _tiles_linhas
+    n = 0
+    for z, x, y, camada in gerador(gdf, nome, colunas, range(zmin, zmax + 1)):
+        os.makedirs(os.path.join(tmp, str(z), str(x)), exist_ok=True)
+        with open(os.path.join(tmp, str(z), str(x), f"{y}.pbf"), "wb") as f:
+            f.write(camada.bytes())
+        n += 1
+    shutil.rmtree(destino, ignore_errors=True)
+    if n:
+        os.replace(tmp, destino)
+    manifesto[nome] = {"versao": versao, "tiles": n, "zmin": zmin, "zmax": zmax,
+                       "colunas": colunas}
+    os.makedirs(pasta, exist_ok=True)
+    with open(man_path, "w") as f:
+        json.dump(manifesto, f, indent=1)
+    return versao
+
+
+def gerar_tiles(layers, icon_repo, pasta=TILES_DIR, url=TILES_URL) -> dict:
+    """
+    Pontos (``emoc_fato``) e vias (``emoc_ways_vlc_rua``) em MVT.  Devolve
+    ``{'pontos', 'vias'}`` (URLs), ``zmin``/``zmax`` e o ``atlas`` dos
+    emojis (sprites.py) gravado ao lado dos tiles; o ``?v=`` invalida o
+    cache do navegador quando a camada muda.
+    """
+    tiles = {"zmin": ZMIN, "zmax": ZMAX, "atlas": salvar_atlas(icon_repo, pasta, url)}
+    fontes = {
+        "pontos": ("emoc_fato", ["cod_emoji", "emocao", "valencia", "nome",
+                                 "referencia", "faixa_etaria", "genero"]),
+        "vias": ("emoc_ways_vlc_rua", ["osm_id", "name", "vlc_maior_text"]),
+    }
+    for nome, (chave, colunas) in fontes.items():
+        if chave not in layers:
+            continue
+        gdf = layers[chave]
+        if nome == "pontos":
+            gdf = gdf[gdf["cod_emoji"].notna()]
+            gdf = gdf.assign(cod_emoji=gdf["cod_emoji"].astype(int))
+        versao = gerar_camada(gdf, nome, colunas, pasta)
+        tiles[nome] = f"{url}/{nome}/{{z}}/{{x}}/{{y}}.pbf?v={versao}"
+    return tiles